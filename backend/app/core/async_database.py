@@ -0,0 +1,164 @@
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.pools import MeteredAsyncQueuePool, attach_metrics, workload_pool_args
+from app.core.replica import recent_writes, request_device_id
+from app.core.sqlite import set_pragmas
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+# Request workloads served from async pools; ingestion uses the sync engine.
+# Each also gets a replica pool when READ_REPLICA_URL is set.
+ASYNC_WORKLOADS = ('lookup', 'sync', 'admin')
+
+
+def async_database_url(database_url: str) -> URL:
+    """
+    Return the asyncio-driver URL for a DATABASE_URL.
+
+    postgresql:// URLs use asyncpg and sqlite:/// URLs use aiosqlite. asyncpg
+    takes ssl= instead of libpq's sslmode=.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == 'postgresql' and 'sslmode' in url.query:
+        query = dict(url.query)
+        query['ssl'] = query.pop('sslmode')
+        url = url.set(query=query)
+    return url
+
+
+def create_async_db_engine(database_url: str, workload: str, pool_name: Optional[str] = None) -> AsyncEngine:
+    """
+    Create the async engine for one request workload, with that workload's own pool.
+
+    The pool's metrics are reported under pool_name, which defaults to the
+    workload (replica pools use e.g. 'lookup_replica').
+
+    SQLite connections get the same pragmas as the embedded mode; writes from
+    these engines are not queued on the in-process writer lock (waiting on it
+    would block the event loop) and rely on SQLite's busy timeout instead.
+
+    Raises:
+        ValueError: An in-memory SQLite URL, which would give each engine its
+            own empty database
+    """
+    url = async_database_url(database_url)
+
+    if url.get_backend_name() == 'sqlite':
+        if not url.database or url.database == ':memory:':
+            raise ValueError(
+                "In-memory SQLite databases are not supported by the FastAPI server: the sync "
+                "and async engines would each open their own empty database. Point DATABASE_URL "
+                "(and READ_REPLICA_URL) at a file, e.g. sqlite:///./data/skechers_inventory.db"
+            )
+        engine = create_async_engine(
+            url,
+            poolclass=MeteredAsyncQueuePool,
+            connect_args={'timeout': settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            echo=settings.DEBUG,
+            **workload_pool_args(workload)
+        )
+        set_pragmas(engine.sync_engine, False)
+        attach_metrics(engine.pool, pool_name or workload)
+        return engine
+
+    engine = create_async_engine(
+        url,
+        poolclass=MeteredAsyncQueuePool,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        **workload_pool_args(workload)
+    )
+    attach_metrics(engine.pool, pool_name or workload)
+    return engine
+
+
+async_engines = {
+    workload: create_async_db_engine(settings.DATABASE_URL, workload)
+    for workload in ASYNC_WORKLOADS
+}
+
+# Objects stay readable after commit, since responses are built from them
+async_sessions = {
+    workload: async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    for workload, engine in async_engines.items()
+}
+
+replica_engines = {
+    workload: create_async_db_engine(settings.READ_REPLICA_URL, workload, f'{workload}_replica')
+    for workload in ASYNC_WORKLOADS
+} if settings.READ_REPLICA_URL else {}
+
+replica_sessions = {
+    workload: async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    for workload, engine in replica_engines.items()
+}
+
+
+def read_sessionmaker(workload: str, device_id: Optional[str] = None) -> async_sessionmaker:
+    """
+    Session factory for a read-only request: the replica when one is configured,
+    or the primary for a device that wrote within READ_YOUR_WRITES_SECONDS.
+    """
+    if workload in replica_sessions and not recent_writes.wrote_recently(device_id):
+        return replica_sessions[workload]
+    return async_sessions[workload]
+
+
+def is_replica(db: AsyncSession) -> bool:
+    """Whether a session reads from the replica rather than the primary."""
+    return db.bind in replica_engines.values()
+
+
+async def get_lookup_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a read-only session for lookups, routed to the replica when possible."""
+    async with read_sessionmaker('lookup', request_device_id(request))() as db:
+        yield db
+
+
+async def get_sync_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a read-only session for syncs, routed to the replica when possible."""
+    async with read_sessionmaker('sync', request_device_id(request))() as db:
+        yield db
+
+
+async def get_admin_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a read-only session for the dashboard, routed to the replica when possible."""
+    async with read_sessionmaker('admin', request_device_id(request))() as db:
+        yield db
+
+
+async def get_lookup_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a request-scoped session from the lookup pool."""
+    async with async_sessions['lookup']() as db:
+        yield db
+
+
+async def get_sync_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a request-scoped session from the sync pool."""
+    async with async_sessions['sync']() as db:
+        yield db
+
+
+async def get_admin_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a request-scoped session from the admin pool."""
+    async with async_sessions['admin']() as db:
+        yield db
+
+
+async def close_async_db():
+    """Dispose of the async engines' connection pools"""
+    for engine in [*async_engines.values(), *replica_engines.values()]:
+        await engine.dispose()
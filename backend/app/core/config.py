@@ -7,6 +7,23 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv('DATABASE_URL', 'postgresql://localhost/skechers_inventory')
+    READ_REPLICA_URL: Optional[str] = os.getenv('READ_REPLICA_URL', None)
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv('READ_YOUR_WRITES_SECONDS', 10))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE: int = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))
+    SQLITE_SERIALIZE_WRITES: bool = os.getenv('SQLITE_SERIALIZE_WRITES', 'True').lower() == 'true'
+    LOOKUP_POOL_SIZE: int = int(os.getenv('LOOKUP_POOL_SIZE', 10))
+    LOOKUP_POOL_MAX_OVERFLOW: int = int(os.getenv('LOOKUP_POOL_MAX_OVERFLOW', 10))
+    LOOKUP_POOL_TIMEOUT: float = float(os.getenv('LOOKUP_POOL_TIMEOUT', 5))
+    SYNC_POOL_SIZE: int = int(os.getenv('SYNC_POOL_SIZE', 5))
+    SYNC_POOL_MAX_OVERFLOW: int = int(os.getenv('SYNC_POOL_MAX_OVERFLOW', 5))
+    SYNC_POOL_TIMEOUT: float = float(os.getenv('SYNC_POOL_TIMEOUT', 30))
+    ADMIN_POOL_SIZE: int = int(os.getenv('ADMIN_POOL_SIZE', 3))
+    ADMIN_POOL_MAX_OVERFLOW: int = int(os.getenv('ADMIN_POOL_MAX_OVERFLOW', 2))
+    ADMIN_POOL_TIMEOUT: float = float(os.getenv('ADMIN_POOL_TIMEOUT', 10))
+    INGEST_POOL_SIZE: int = int(os.getenv('INGEST_POOL_SIZE', 5))
+    INGEST_POOL_MAX_OVERFLOW: int = int(os.getenv('INGEST_POOL_MAX_OVERFLOW', 5))
+    INGEST_POOL_TIMEOUT: float = float(os.getenv('INGEST_POOL_TIMEOUT', 60))
     SECRET_KEY: str = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     DEBUG: bool = os.getenv('DEBUG', 'False').lower() == 'true'
     FLASK_ENV: str = os.getenv('FLASK_ENV', 'production')
@@ -15,6 +32,32 @@ class Settings(BaseSettings):
     TESSERACT_PATH: Optional[str] = os.getenv('TESSERACT_PATH', None)
     AUTO_DROP_ENABLED: bool = os.getenv('AUTO_DROP_ENABLED', 'True').lower() == 'true'
     DEFAULT_SYNC_INTERVAL_SECONDS: int = int(os.getenv('DEFAULT_SYNC_INTERVAL_SECONDS', 60))
+    PARSE_WORKERS: int = int(os.getenv('PARSE_WORKERS', os.cpu_count() or 1))
+    INGEST_CHUNK_SIZE: int = int(os.getenv('INGEST_CHUNK_SIZE', 5000))
+    COPY_LOAD_MIN_ROWS: int = int(os.getenv('COPY_LOAD_MIN_ROWS', 1000))
+    PARSE_CACHE_FOLDER: str = os.getenv('PARSE_CACHE_FOLDER', './uploads/parse_cache')
+    INGEST_RESUME_AFTER_SECONDS: float = float(os.getenv('INGEST_RESUME_AFTER_SECONDS', 300))
+    PDF_WORKERS: int = int(os.getenv('PDF_WORKERS', os.cpu_count() or 1))
+    PDF_PAGES_PER_TASK: int = int(os.getenv('PDF_PAGES_PER_TASK', 10))
+    PDF_OCR_ENABLED: bool = os.getenv('PDF_OCR_ENABLED', 'True').lower() == 'true'
+    PDF_OCR_DPI: int = int(os.getenv('PDF_OCR_DPI', 300))
+    PDF_OCR_WORKERS: int = int(os.getenv('PDF_OCR_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    HOT_FOLDER_PATH: Optional[str] = os.getenv('HOT_FOLDER_PATH', None)
+    HOT_FOLDER_CATEGORY: Optional[str] = os.getenv('HOT_FOLDER_CATEGORY', None)
+    HOT_FOLDER_SETTLE_SECONDS: float = float(os.getenv('HOT_FOLDER_SETTLE_SECONDS', 5))
+    AUDIT_BATCH_SIZE: int = int(os.getenv('AUDIT_BATCH_SIZE', 100))
+    AUDIT_FLUSH_SECONDS: float = float(os.getenv('AUDIT_FLUSH_SECONDS', 1))
+    AUDIT_MAX_PENDING: int = int(os.getenv('AUDIT_MAX_PENDING', 10000))
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv('ARCHIVE_AFTER_DAYS', 30))
+    ARCHIVE_INTERVAL_SECONDS: float = float(os.getenv('ARCHIVE_INTERVAL_SECONDS', 3600))
+    LOG_RETENTION_DAYS: int = int(os.getenv('LOG_RETENTION_DAYS', 90))
+    LOG_MAINTENANCE_INTERVAL_SECONDS: float = float(os.getenv('LOG_MAINTENANCE_INTERVAL_SECONDS', 3600))
+    STYLE_INDEX_ENABLED: bool = os.getenv('STYLE_INDEX_ENABLED', 'True').lower() == 'true'
+    STYLE_INDEX_REFRESH_SECONDS: float = float(os.getenv('STYLE_INDEX_REFRESH_SECONDS', 600))
+    RESPONSE_CACHE_SIZE: int = int(os.getenv('RESPONSE_CACHE_SIZE', 10000))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 300))
+    ANALYTICS_PATH: str = os.getenv('ANALYTICS_PATH', './analytics')
+    ANALYTICS_EXPORT_INTERVAL_SECONDS: float = float(os.getenv('ANALYTICS_EXPORT_INTERVAL_SECONDS', 3600))
     
     class Config:
         case_sensitive = True
@@ -1,20 +1,36 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import QueuePool
 from app.core.config import settings
+from app.core.migrations import run_migrations
+from app.core.pools import MeteredQueuePool, attach_metrics, workload_pool_args
+from app.core.sqlite import create_sqlite_engine
 from app.models.database_models import Base
 import logging
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
-)
+def create_db_engine(database_url: str):
+    """
+    Create the sync engine for a database URL; sqlite:/// URLs use the embedded mode.
+
+    Its pool is the ingestion workload's bulkhead: uploads, the hot folder and
+    resumed ingestions run on it, apart from the request handlers' async pools.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite':
+        return create_sqlite_engine(url)
+    engine = create_engine(
+        url,
+        poolclass=MeteredQueuePool,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        **workload_pool_args('ingestion')
+    )
+    attach_metrics(engine.pool, 'ingestion')
+    return engine
+
+engine = create_db_engine(settings.DATABASE_URL)
 
 SessionLocal = scoped_session(
     sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,6 +40,7 @@ def init_db():
     """Initialize database tables"""
     try:
         Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {str(e)}")
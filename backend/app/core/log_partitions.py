@@ -0,0 +1,206 @@
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+
+from app.models.database_models import AuditLog, SyncLog
+
+logger = logging.getLogger(__name__)
+
+# Append-only log tables and the timestamp column they are partitioned on.
+# Partitions are monthly and named <table>_pYYYY_MM; a partition holds rows
+# older than the first of the following month, so it can be dropped whole
+# once that date falls outside the retention window.
+LOG_TABLES = {
+    'sync_log': (SyncLog.__table__, 'last_sync_timestamp'),
+    'audit_log': (AuditLog.__table__, 'timestamp'),
+}
+
+# Months of PostgreSQL partitions created ahead of the current one
+PARTITIONS_AHEAD = 2
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_month(moment: datetime) -> datetime:
+    start = month_start(moment)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def previous_month(moment: datetime) -> datetime:
+    start = month_start(moment)
+    return datetime(start.year - (start.month == 1), (start.month - 2) % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_months(table: str, names: List[str]) -> List[datetime]:
+    """Months of the <table>_pYYYY_MM names in a list of table names, oldest first."""
+    pattern = re.compile(rf'^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$')
+    months = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+# PostgreSQL: declarative range partitions
+
+def pg_is_partitioned(conn, table: str) -> bool:
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+    ), {'table': table}).scalar()
+
+
+def pg_partitions(conn, table: str) -> List[str]:
+    return [row[0] for row in conn.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+    ), {'table': table})]
+
+
+def pg_partition_table(conn, table: str, now: Optional[datetime] = None):
+    """
+    Turn a plain log table into a monthly range-partitioned one, in place.
+
+    Existing rows are not copied: the old table becomes the partition for the
+    month of its newest row, covering everything before the end of that month,
+    and is dropped by retention like any other partition. An empty table is
+    simply replaced. A default partition catches rows outside the created
+    partitions.
+    """
+    model_table, column = LOG_TABLES[table]
+    now = now or datetime.utcnow()
+
+    newest = conn.execute(text(f"SELECT max({column}) FROM {table}")).scalar()
+    has_rows = conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table})")).scalar()
+    legacy = partition_name(table, month_start(newest or now))
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': table}).scalar()
+
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    # The parent takes over the index names; matching renamed indexes are
+    # reused for the legacy partition when it is attached
+    pk_name = inspect(conn).get_pk_constraint(legacy)['name']
+    if pk_name:
+        conn.execute(text(f"ALTER TABLE {legacy} DROP CONSTRAINT {pk_name}"))
+    for index in inspect(conn).get_indexes(legacy):
+        conn.execute(text(f"ALTER INDEX {index['name']} RENAME TO {index['name']}_{legacy.rsplit('_p', 1)[1]}"))
+
+    conn.execute(text(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})"
+    ))
+    conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})"))
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    for index in model_table.indexes:
+        index.create(conn)
+
+    if has_rows:
+        # The partition key is part of the primary key, so it cannot be NULL
+        conn.execute(text(f"UPDATE {legacy} SET {column} = '1970-01-01' WHERE {column} IS NULL"))
+        conn.execute(text(f"ALTER TABLE {legacy} ALTER COLUMN {column} SET NOT NULL"))
+        conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{next_month(newest or now):%Y-%m-%d}')"
+        ))
+    else:
+        conn.execute(text(f"DROP TABLE {legacy}"))
+    conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+    logger.info(f"🗂️ Partitioned {table} by month")
+
+
+def pg_create_partitions(conn, table: str, now: Optional[datetime] = None) -> List[str]:
+    """Create monthly partitions from the current month through PARTITIONS_AHEAD months ahead."""
+    now = now or datetime.utcnow()
+    existing = partition_months(table, pg_partitions(conn, table))
+    covered_until = next_month(existing[-1]) if existing else None
+
+    created = []
+    month = month_start(now)
+    for _ in range(PARTITIONS_AHEAD + 1):
+        if covered_until is None or month >= covered_until:
+            name = partition_name(table, month)
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month(month):%Y-%m-%d}')"
+            ))
+            created.append(name)
+        month = next_month(month)
+    return created
+
+
+def pg_drop_partitions(conn, table: str, cutoff: datetime) -> List[str]:
+    """Drop partitions whose rows are all older than cutoff; prune the default partition."""
+    _, column = LOG_TABLES[table]
+    dropped = []
+    for month in partition_months(table, pg_partitions(conn, table)):
+        if next_month(month) <= cutoff:
+            name = partition_name(table, month)
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    conn.execute(text(f"DELETE FROM {table}_default WHERE {column} < :cutoff"), {'cutoff': cutoff})
+    return dropped
+
+
+# SQLite: the live table is rolled into a <table>_pYYYY_MM archive each month
+
+def sqlite_rotate_table(conn, table: str, now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Move rows from before the current month out of the live table.
+
+    The live table is renamed to an archive named after the previous month and
+    a fresh one is created; rows of the current month that were written before
+    the rotation are moved back, so each archive only holds older rows.
+    Archives keep no indexes. Returns the archive name, or None if nothing
+    needed rotating.
+    """
+    model_table, column = LOG_TABLES[table]
+    cut = month_start(now or datetime.utcnow())
+
+    if not conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE {column} < :cut)"), {'cut': cut}).scalar():
+        return None
+
+    archive = partition_name(table, previous_month(cut))
+    if archive in inspect(conn).get_table_names():
+        # Rows that arrived with an old timestamp after the last rotation
+        columns = ', '.join(c.name for c in model_table.columns if c.name != 'id')
+        conn.execute(text(
+            f"INSERT INTO {archive} ({columns}) SELECT {columns} FROM {table} WHERE {column} < :cut"
+        ), {'cut': cut})
+        conn.execute(text(f"DELETE FROM {table} WHERE {column} < :cut"), {'cut': cut})
+        return archive
+
+    for index in model_table.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {archive}"))
+    model_table.create(conn)
+
+    columns = ', '.join(c.name for c in model_table.columns)
+    conn.execute(text(
+        f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {archive} WHERE {column} >= :cut"
+    ), {'cut': cut})
+    conn.execute(text(f"DELETE FROM {archive} WHERE {column} >= :cut"), {'cut': cut})
+    logger.info(f"🗂️ Rolled {table} into {archive}")
+    return archive
+
+
+def sqlite_drop_archives(conn, table: str, cutoff: datetime) -> List[str]:
+    """Drop archives whose rows are all older than cutoff."""
+    dropped = []
+    for month in partition_months(table, inspect(conn).get_table_names()):
+        if next_month(month) <= cutoff:
+            name = partition_name(table, month)
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
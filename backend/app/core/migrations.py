@@ -0,0 +1,245 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+import json
+import logging
+
+from app.models.database_models import (
+    ArchivedClassification, ArchivedPlacement, ArchivedRemovalTask,
+    RemovalTask, ShowroomPlacement, WarehouseClassification
+)
+from app.core.log_partitions import LOG_TABLES, pg_create_partitions, pg_is_partitioned, pg_partition_table
+from app.services.read_model import refresh_style_read_model
+from app.utils.style_keys import normalize_key, split_style_key
+
+logger = logging.getLogger(__name__)
+
+# Schema changes to tables that already exist. create_all() only creates
+# missing tables, so columns and indexes added to existing models are applied
+# here. Every step must be idempotent: it runs on each startup.
+
+
+def _has_column(conn, table: str, column: str) -> bool:
+    return column in {c['name'] for c in inspect(conn).get_columns(table)}
+
+
+def _has_index(conn, table: str, index: str) -> bool:
+    return index in {i['name'] for i in inspect(conn).get_indexes(table)}
+
+
+def add_files_content_hash(conn):
+    """Add files.content_hash used to skip re-ingesting unchanged files."""
+    if not _has_column(conn, 'files', 'content_hash'):
+        conn.execute(text("ALTER TABLE files ADD COLUMN content_hash VARCHAR(64)"))
+    if not _has_index(conn, 'files', 'idx_files_content_hash'):
+        conn.execute(text("CREATE INDEX idx_files_content_hash ON files (content_hash)"))
+
+
+def backfill_style_sources(conn):
+    """Move the JSON styles.source_file_ids column into the style_sources table."""
+    if not _has_column(conn, 'styles', 'source_file_ids'):
+        return
+    file_ids = {row[0] for row in conn.execute(text("SELECT id FROM files"))}
+    pairs = set()
+    for style_id, source_file_ids in conn.execute(text("SELECT id, source_file_ids FROM styles")):
+        for file_id in json.loads(source_file_ids or '[]'):
+            if file_id in file_ids:
+                pairs.add((style_id, file_id))
+    if pairs:
+        conn.execute(
+            text("INSERT INTO style_sources (style_id, file_id) VALUES (:style_id, :file_id)"),
+            [{'style_id': style_id, 'file_id': file_id} for style_id, file_id in pairs]
+        )
+    conn.execute(text("ALTER TABLE styles DROP COLUMN source_file_ids"))
+    logger.info(f"Backfilled {len(pairs)} style sources")
+
+
+def _merge_style_into(conn, duplicate_id: int, keeper_id: int):
+    """Move colors and sources of a case-variant duplicate style onto the kept style."""
+    params = {'duplicate_id': duplicate_id, 'keeper_id': keeper_id}
+    conn.execute(text(
+        "DELETE FROM colors WHERE style_id = :duplicate_id AND color_name IN "
+        "(SELECT color_name FROM colors WHERE style_id = :keeper_id)"
+    ), params)
+    conn.execute(text("UPDATE colors SET style_id = :keeper_id WHERE style_id = :duplicate_id"), params)
+    conn.execute(text(
+        "INSERT INTO style_sources (style_id, file_id) "
+        "SELECT :keeper_id, file_id FROM style_sources WHERE style_id = :duplicate_id "
+        "AND file_id NOT IN (SELECT file_id FROM style_sources WHERE style_id = :keeper_id)"
+    ), params)
+    conn.execute(text("DELETE FROM style_sources WHERE style_id = :duplicate_id"), params)
+    conn.execute(text("DELETE FROM styles WHERE id = :duplicate_id"), params)
+
+
+def add_style_keys(conn):
+    """Add normalized style keys, merging styles that differ only in case or whitespace."""
+    if not _has_column(conn, 'styles', 'style_key'):
+        conn.execute(text("ALTER TABLE styles ADD COLUMN style_key VARCHAR(50)"))
+        conn.execute(text("ALTER TABLE styles ADD COLUMN base_style_key VARCHAR(50)"))
+        conn.execute(text("ALTER TABLE styles ADD COLUMN variant_suffix VARCHAR(2)"))
+    if _has_index(conn, 'styles', 'idx_styles_key'):
+        return
+    
+    keepers = {}
+    updates = []
+    duplicates = []
+    for style_id, style_number in conn.execute(text("SELECT id, style_number FROM styles ORDER BY id")):
+        style_key = normalize_key(style_number)
+        if style_key in keepers:
+            duplicates.append((style_id, keepers[style_key]))
+            continue
+        keepers[style_key] = style_id
+        base_style_key, variant_suffix = split_style_key(style_key)
+        updates.append({
+            'id': style_id,
+            'style_key': style_key,
+            'base_style_key': base_style_key,
+            'variant_suffix': variant_suffix
+        })
+    
+    if updates:
+        conn.execute(text(
+            "UPDATE styles SET style_key = :style_key, base_style_key = :base_style_key, "
+            "variant_suffix = :variant_suffix WHERE id = :id"
+        ), updates)
+    for duplicate_id, keeper_id in duplicates:
+        _merge_style_into(conn, duplicate_id, keeper_id)
+    if duplicates:
+        logger.info(f"Merged {len(duplicates)} case-variant duplicate styles")
+    
+    conn.execute(text("CREATE UNIQUE INDEX idx_styles_key ON styles (style_key)"))
+    conn.execute(text("CREATE INDEX idx_styles_base_key ON styles (base_style_key)"))
+
+
+def add_color_keys(conn):
+    """Add normalized color keys, dropping colors that differ only in case or whitespace."""
+    if not _has_column(conn, 'colors', 'color_key'):
+        conn.execute(text("ALTER TABLE colors ADD COLUMN color_key VARCHAR(100)"))
+    # The unique (style_id, color_key) index supersedes the one on color_name
+    if _has_index(conn, 'colors', 'idx_colors_style_color'):
+        conn.execute(text("DROP INDEX idx_colors_style_color"))
+    if _has_index(conn, 'colors', 'idx_colors_style_key'):
+        return
+    
+    updates = [
+        {'id': color_id, 'color_key': normalize_key(color_name)}
+        for color_id, color_name in conn.execute(text("SELECT id, color_name FROM colors"))
+    ]
+    if updates:
+        conn.execute(text("UPDATE colors SET color_key = :color_key WHERE id = :id"), updates)
+    # Keep an image from a dropped duplicate when the kept color has none
+    conn.execute(text(
+        "UPDATE colors SET image_url = (SELECT MAX(c2.image_url) FROM colors c2 "
+        "WHERE c2.style_id = colors.style_id AND c2.color_key = colors.color_key) "
+        "WHERE image_url IS NULL"
+    ))
+    conn.execute(text(
+        "DELETE FROM colors WHERE id NOT IN "
+        "(SELECT MIN(id) FROM colors GROUP BY style_id, color_key)"
+    ))
+    conn.execute(text("CREATE UNIQUE INDEX idx_colors_style_key ON colors (style_id, color_key)"))
+
+
+def partition_log_tables(conn):
+    """Partition sync_log and audit_log by month on PostgreSQL (SQLite rolls tables instead)."""
+    if conn.dialect.name != 'postgresql':
+        return
+    for table in LOG_TABLES:
+        if not pg_is_partitioned(conn, table):
+            pg_partition_table(conn, table)
+        pg_create_partitions(conn, table)
+
+
+def build_style_read_model(conn):
+    """Rebuild style_read_model when it is missing styles, e.g. on first startup after adding it."""
+    styles = conn.execute(text("SELECT count(*) FROM styles")).scalar()
+    rows = conn.execute(text("SELECT count(*) FROM style_read_model")).scalar()
+    if styles != rows:
+        refreshed = refresh_style_read_model(conn)
+        logger.info(f"Rebuilt style read model for {refreshed} styles")
+
+
+MIGRATIONS = [
+    add_files_content_hash,
+    backfill_style_sources,
+    add_style_keys,
+    add_color_keys,
+    partition_log_tables,
+    build_style_read_model,
+]
+
+
+# Tables the archival job moves rows out of, with their archives. On SQLite
+# they need AUTOINCREMENT so archived ids are not reused; SQLite cannot add it
+# to an existing table, so the table is rebuilt.
+AUTOINCREMENT_TABLES = [
+    (WarehouseClassification.__table__, ArchivedClassification.__table__),
+    (ShowroomPlacement.__table__, ArchivedPlacement.__table__),
+    (RemovalTask.__table__, ArchivedRemovalTask.__table__),
+]
+
+
+def sqlite_autoincrement_tables(engine):
+    """
+    Rebuild archived tables created before they were AUTOINCREMENT (SQLite only).
+
+    Follows SQLite's table rebuild procedure: foreign keys are switched off,
+    which is only possible outside a transaction, so this runs on its own
+    connection before the other migrations. The sequence starts after the
+    highest id in the table or its archive.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.connect() as conn:
+        schemas = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'table'")).all())
+    pending = [
+        (table, archive) for table, archive in AUTOINCREMENT_TABLES
+        if table.name in schemas and 'AUTOINCREMENT' not in schemas[table.name].upper()
+    ]
+    if not pending:
+        return
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=OFF")
+        try:
+            cursor.execute("BEGIN")
+            for table, archive in pending:
+                rebuilt = f"{table.name}_rebuild"
+                create = str(CreateTable(table).compile(dialect=engine.dialect)).strip()
+                cursor.execute(create.replace(f"CREATE TABLE {table.name} (", f"CREATE TABLE {rebuilt} (", 1))
+                columns = ', '.join(column.name for column in table.columns)
+                cursor.execute(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}")
+                cursor.execute(f"DROP TABLE {table.name}")
+                cursor.execute(f"ALTER TABLE {rebuilt} RENAME TO {table.name}")
+                for index in table.indexes:
+                    cursor.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+                cursor.execute(
+                    f"INSERT INTO sqlite_sequence (name, seq) VALUES (?, max("
+                    f"(SELECT coalesce(max(id), 0) FROM {table.name}), "
+                    f"(SELECT coalesce(max(id), 0) FROM {archive.name})))",
+                    (table.name,)
+                )
+            violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+            if violations:
+                raise RuntimeError(f"Foreign key violations after rebuilding tables: {violations[:5]}")
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+    finally:
+        connection.close()
+    logger.info(f"Rebuilt {', '.join(table.name for table, _ in pending)} with AUTOINCREMENT ids")
+
+
+def run_migrations(engine):
+    """Apply all migrations in order in a single transaction."""
+    sqlite_autoincrement_tables(engine)
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            migration(conn)
+    logger.info(f"Applied {len(MIGRATIONS)} schema migrations")
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+# Each workload class gets its own connection pool (bulkhead), so big uploads
+# or full syncs cannot take the connections scanner lookups need.
+#   lookup    - scanner lookups, search and warehouse classification
+#   sync      - full and incremental device syncs
+#   admin     - dashboard, file management and health checks
+#   ingestion - uploads, hot folder and resumed ingestions (sync engine)
+WORKLOADS = ('lookup', 'sync', 'admin', 'ingestion')
+
+
+def workload_pool_args(workload: str) -> Dict:
+    """Return pool_size, max_overflow and pool_timeout engine arguments for a workload."""
+    prefix = 'INGEST' if workload == 'ingestion' else workload.upper()
+    return {
+        'pool_size': getattr(settings, f'{prefix}_POOL_SIZE'),
+        'max_overflow': getattr(settings, f'{prefix}_POOL_MAX_OVERFLOW'),
+        'pool_timeout': getattr(settings, f'{prefix}_POOL_TIMEOUT')
+    }
+
+
+class PoolMetrics:
+    """Checkout counts, wait times and timeouts of one pool."""
+
+    def __init__(self, name: str, recent: int = 1000):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=recent)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+                self._waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict:
+        """Current utilization of the pool and wait times since startup."""
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+
+        pool = self.pool
+        capacity = pool.size() + pool._max_overflow if pool else 0
+        checked_out = pool.checkedout() if pool else 0
+        return {
+            'pool_size': pool.size() if pool else 0,
+            'max_overflow': pool._max_overflow if pool else 0,
+            'checked_out': checked_out,
+            'idle': pool.checkedin() if pool else 0,
+            'utilization': round(checked_out / capacity, 3) if capacity else 0.0,
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_ms': {
+                'avg': round(total_wait / checkouts * 1000, 2) if checkouts else 0.0,
+                'p95': round(waits[int(len(waits) * 0.95) - 1] * 1000, 2) if waits else 0.0,
+                'max': round(max_wait * 1000, 2)
+            }
+        }
+
+
+pool_metrics = {workload: PoolMetrics(workload) for workload in WORKLOADS}
+
+
+class _MeteredPool:
+    """Records how long each checkout waits for a connection (including opening a new one) and timeouts."""
+
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics:
+                self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics:
+            self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep reporting under the same name
+        pool = super().recreate()
+        if self.metrics:
+            attach_metrics(pool, self.metrics.name)
+        return pool
+
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def attach_metrics(pool, name: str):
+    """Report a metered pool's checkouts under a workload (or replica pool) name."""
+    metrics = pool_metrics.setdefault(name, PoolMetrics(name))
+    pool.metrics = metrics
+    metrics.pool = pool
+
+
+def pool_status() -> Dict[str, Dict]:
+    """Utilization and wait-time metrics for every workload pool, including replica pools."""
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -0,0 +1,94 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Counts SQL statements and the time spent executing them per request, for
+# every engine (sync, async and replica). The request's counter lives in a
+# context variable, so statements from background jobs are not attributed to
+# it.
+
+
+class RequestQueries:
+    """Statements executed and database time within one request."""
+
+    __slots__ = ('statements', 'db_time')
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar('request_queries', default=None)
+
+
+@contextmanager
+def track_queries():
+    """Count the statements executed inside the block, including in greenlets and threadpools it spawns."""
+    queries = RequestQueries()
+    token = _current.set(queries)
+    try:
+        yield queries
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    started = conn.info.get('query_started')
+    if queries is not None and started:
+        queries.statements += 1
+        queries.db_time += time.perf_counter() - started.pop()
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    queries = _current.get()
+    started = exception_context.connection.info.get('query_started') if exception_context.connection else None
+    if queries is not None and started:
+        queries.statements += 1
+        queries.db_time += time.perf_counter() - started.pop()
+
+
+class EndpointQueryStats:
+    """Statement counts and database time per endpoint since startup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict] = {}
+
+    def record(self, endpoint: str, queries: RequestQueries):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'statements': 0, 'max_statements': 0, 'db_time': 0.0, 'max_db_time': 0.0
+            })
+            stats['requests'] += 1
+            stats['statements'] += queries.statements
+            stats['max_statements'] = max(stats['max_statements'], queries.statements)
+            stats['db_time'] += queries.db_time
+            stats['max_db_time'] = max(stats['max_db_time'], queries.db_time)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._endpoints.items()}
+        return {name: {
+            'requests': stats['requests'],
+            'avg_statements': round(stats['statements'] / stats['requests'], 2),
+            'max_statements': stats['max_statements'],
+            'avg_db_ms': round(stats['db_time'] / stats['requests'] * 1000, 2),
+            'max_db_ms': round(stats['max_db_time'] * 1000, 2)
+        } for name, stats in sorted(endpoints.items())}
+
+
+endpoint_query_stats = EndpointQueryStats()
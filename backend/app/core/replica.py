@@ -0,0 +1,56 @@
+import threading
+import time
+from typing import Optional
+
+from starlette.requests import HTTPConnection, Request
+
+from app.core.config import settings
+
+DEVICE_ID_HEADER = 'X-Device-ID'
+
+
+def request_device_id(request: HTTPConnection) -> Optional[str]:
+    """Device that sent a request: the X-Device-ID header, else a device_id query parameter."""
+    return request.headers.get(DEVICE_ID_HEADER) or request.query_params.get('device_id')
+
+
+class RecentWrites:
+    """
+    Devices that wrote within the read-your-writes window.
+
+    Their reads go to the primary until the replica has had time to catch up,
+    so a device always sees its own classifications, placements and uploads.
+    Tracked per process, like the rest of the in-memory server state.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._lock = threading.Lock()
+        self._writes = {}
+
+    def note(self, device_id: Optional[str]):
+        if not device_id:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._writes[device_id] = now
+            if len(self._writes) > 10000:
+                self._writes = {d: t for d, t in self._writes.items() if now - t < self.window}
+
+    def wrote_recently(self, device_id: Optional[str]) -> bool:
+        if not device_id:
+            return False
+        with self._lock:
+            written = self._writes.get(device_id)
+        return written is not None and time.monotonic() - written < self.window
+
+
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+async def track_device_writes(request: Request, call_next):
+    """HTTP middleware: send a device's reads to the primary for a while after it writes (read-your-writes)"""
+    response = await call_next(request)
+    if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+        recent_writes.note(request_device_id(request))
+    return response
@@ -0,0 +1,139 @@
+import logging
+import os
+import re
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.pools import MeteredQueuePool, attach_metrics, workload_pool_args
+
+logger = logging.getLogger(__name__)
+
+_WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+
+class WriterLock:
+    """
+    Process-wide lock that lets one connection at a time hold a write transaction.
+
+    SQLite allows a single writer; queueing writers here instead of in
+    SQLite's busy handler avoids SQLITE_BUSY errors under load. A thread that
+    already holds the lock through another connection is not blocked (it
+    would wait on itself), and a writer that waits longer than the busy
+    timeout goes ahead and leaves it to SQLite.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owner = None
+
+    def held_by_current_thread(self) -> bool:
+        return self._owner == threading.get_ident()
+
+    def acquire(self, timeout: float) -> bool:
+        if not self._lock.acquire(timeout=timeout):
+            return False
+        self._owner = threading.get_ident()
+        return True
+
+    def release(self):
+        self._owner = None
+        self._lock.release()
+
+
+writer_lock = WriterLock()
+
+
+def create_sqlite_engine(url: URL) -> Engine:
+    """
+    Create an engine for the embedded SQLite deployment.
+
+    Connections use WAL journaling so readers never block the writer,
+    synchronous=NORMAL (durable at checkpoints, safe with WAL), a memory-mapped
+    database file and a busy timeout. File databases keep the ingestion
+    workload's pool of connections; in-memory databases share one
+    connection. Writes are serialized through writer_lock when
+    SQLITE_SERIALIZE_WRITES is set.
+    """
+    database = url.database
+    in_memory = not database or database == ':memory:'
+
+    if in_memory:
+        pool_args = {'poolclass': StaticPool}
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+        pool_args = {'poolclass': MeteredQueuePool, **workload_pool_args('ingestion')}
+
+    engine = create_engine(
+        url,
+        connect_args={
+            'check_same_thread': False,
+            'timeout': settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+        },
+        echo=settings.DEBUG,
+        **pool_args
+    )
+
+    set_pragmas(engine, in_memory)
+    if not in_memory:
+        attach_metrics(engine.pool, 'ingestion')
+
+    if settings.SQLITE_SERIALIZE_WRITES:
+        _serialize_writes(engine)
+
+    logger.info(f"Using embedded SQLite database: {database or ':memory:'}")
+    return engine
+
+
+def set_pragmas(engine: Engine, in_memory: bool):
+    """Apply the embedded-mode pragmas to every new connection of an engine (or an async engine's sync_engine)."""
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def _serialize_writes(engine: Engine):
+    """Hold writer_lock from a connection's first write statement until its transaction ends."""
+    timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+
+    def _release(info):
+        if info.pop('holds_writer_lock', False):
+            writer_lock.release()
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _acquire(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get('holds_writer_lock') or not _WRITE_STATEMENT.match(statement):
+            return
+        if writer_lock.held_by_current_thread():
+            return
+        if writer_lock.acquire(timeout):
+            conn.info['holds_writer_lock'] = True
+        else:
+            logger.warning("⚠️ Write started without the SQLite writer lock")
+
+    @event.listens_for(engine, 'commit')
+    def _on_commit(conn):
+        _release(conn.info)
+
+    @event.listens_for(engine, 'rollback')
+    def _on_rollback(conn):
+        _release(conn.info)
+
+    # Connections returned to the pool mid-transaction are rolled back by the pool
+    @event.listens_for(engine.pool, 'reset')
+    def _on_reset(dbapi_connection, connection_record, reset_state):
+        _release(connection_record.info)
+
+    @event.listens_for(engine.pool, 'invalidate')
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        _release(connection_record.info)
@@ -1,2 +1,3 @@
-from .database_models import Base, Style, Color, File, WarehouseClassification, ShowroomPlacement, RemovalTask, SyncLog, AuditLog
+from .database_models import Base, Style, StyleSource, Color, File, WarehouseClassification, ShowroomPlacement, RemovalTask, IngestionCheckpoint, SyncLog, AuditLog
+from .parsed_item import ParsedItem
 from .schema_models import *
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Index
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Index, JSON, Table
+from sqlalchemy.orm import relationship, declarative_base, validates
 from datetime import datetime
+from app.utils.style_keys import normalize_key, split_style_key
 
 Base = declarative_base()
 
@@ -17,10 +18,12 @@ class File(Base):
     row_count = Column(Integer, nullable=True)
     status = Column(String(20), default='pending')
     is_active = Column(Boolean, default=True)
+    content_hash = Column(String(64), nullable=True)
     
     __table_args__ = (
         Index('idx_files_active', 'is_active'),
         Index('idx_files_type', 'file_type'),
+        Index('idx_files_content_hash', 'content_hash'),
     )
 
 class Style(Base):
@@ -28,17 +31,38 @@ class Style(Base):
     
     id = Column(Integer, primary_key=True)
     style_number = Column(String(50), unique=True, nullable=False)
+    style_key = Column(String(50), nullable=False)
+    base_style_key = Column(String(50), nullable=False)
+    variant_suffix = Column(String(2), nullable=True)
     division = Column(String(100), nullable=True)
     outsole = Column(String(100), nullable=True)
     gender = Column(String(20), nullable=True)
-    source_file_ids = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     colors = relationship('Color', back_populates='style', cascade='all, delete-orphan')
+    sources = relationship('StyleSource', cascade='all, delete-orphan', passive_deletes=True)
     
     __table_args__ = (
         Index('idx_styles_number', 'style_number'),
+        Index('idx_styles_key', 'style_key', unique=True),
+        Index('idx_styles_base_key', 'base_style_key'),
+    )
+    
+    @validates('style_number')
+    def _set_style_keys(self, key, style_number):
+        self.style_key = normalize_key(style_number)
+        self.base_style_key, self.variant_suffix = split_style_key(self.style_key)
+        return style_number
+
+class StyleSource(Base):
+    __tablename__ = 'style_sources'
+    
+    style_id = Column(Integer, ForeignKey('styles.id', ondelete='CASCADE'), primary_key=True)
+    file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'), primary_key=True)
+    
+    __table_args__ = (
+        Index('idx_style_sources_file', 'file_id'),
     )
 
 class Color(Base):
@@ -47,6 +71,7 @@ class Color(Base):
     id = Column(Integer, primary_key=True)
     style_id = Column(Integer, ForeignKey('styles.id', ondelete='CASCADE'), nullable=False)
     color_name = Column(String(100), nullable=False)
+    color_key = Column(String(100), nullable=False)
     image_url = Column(String(500), nullable=True)
     source_file_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -55,7 +80,38 @@ class Color(Base):
     
     __table_args__ = (
         Index('idx_colors_style_id', 'style_id'),
-        Index('idx_colors_style_color', 'style_id', 'color_name'),
+        Index('idx_colors_style_key', 'style_id', 'color_key', unique=True),
+    )
+    
+    @validates('color_name')
+    def _set_color_key(self, key, color_name):
+        self.color_key = normalize_key(color_name)
+        return color_name
+
+class StyleReadModel(Base):
+    """
+    One ready-to-serve row per style, with its colors and source files inlined.
+    
+    colors is a list of {'name', 'key', 'image_url'} dicts and source_files a
+    list of {'id', 'filename'} dicts, both in insertion order. Rows are rebuilt
+    by app.services.read_model in the same transaction as every write to the
+    style, its colors or its sources.
+    """
+    __tablename__ = 'style_read_model'
+    
+    style_id = Column(Integer, ForeignKey('styles.id', ondelete='CASCADE'), primary_key=True)
+    style_number = Column(String(50), nullable=False)
+    style_key = Column(String(50), nullable=False)
+    division = Column(String(100), nullable=True)
+    gender = Column(String(20), nullable=True)
+    outsole = Column(String(100), nullable=True)
+    colors = Column(JSON, nullable=False)
+    source_files = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_read_model_style_key', 'style_key', unique=True),
+        Index('idx_read_model_updated_at', 'updated_at'),
     )
 
 class WarehouseClassification(Base):
@@ -79,6 +135,8 @@ class WarehouseClassification(Base):
         Index('idx_warehouse_approved', 'manager_approved'),
         Index('idx_warehouse_status', 'status'),
         Index('idx_warehouse_submission', 'submission_timestamp'),
+        # The archival job moves rows out; SQLite would otherwise reuse their ids
+        {'sqlite_autoincrement': True},
     )
 
 class ShowroomPlacement(Base):
@@ -97,6 +155,7 @@ class ShowroomPlacement(Base):
         Index('idx_placements_style', 'style_number'),
         Index('idx_placements_location', 'shelf_location'),
         Index('idx_placements_active', 'is_active'),
+        {'sqlite_autoincrement': True},
     )
 
 class RemovalTask(Base):
@@ -113,6 +172,24 @@ class RemovalTask(Base):
     
     __table_args__ = (
         Index('idx_removal_completed', 'completed'),
+        {'sqlite_autoincrement': True},
+    )
+
+class IngestionCheckpoint(Base):
+    __tablename__ = 'ingestion_checkpoints'
+    
+    id = Column(Integer, primary_key=True)
+    file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'), unique=True, nullable=False)
+    status = Column(String(20), default='in_progress')
+    last_processed_row = Column(Integer, default=0)
+    total_rows = Column(Integer, nullable=False)
+    parse_cache_path = Column(String(500), nullable=False)
+    stats = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_checkpoints_status', 'status'),
     )
 
 class SyncLog(Base):
@@ -145,3 +222,35 @@ class AuditLog(Base):
         Index('idx_audit_timestamp', 'timestamp'),
         Index('idx_audit_action', 'action_type'),
     )
+
+def _archive_table(model, name: str, *indexes: Index) -> Table:
+    """Archive copy of a model's table: same columns without defaults or foreign keys, plus archived_at."""
+    return Table(
+        name, Base.metadata,
+        *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable, autoincrement=False)
+          for c in model.__table__.columns],
+        Column('archived_at', DateTime, nullable=False),
+        *indexes
+    )
+
+class ArchivedClassification(Base):
+    """Decided classifications moved out of warehouse_classifications by the archival job."""
+    __table__ = _archive_table(
+        WarehouseClassification, 'warehouse_classifications_archive',
+        Index('idx_warehouse_archive_submission', 'submission_timestamp')
+    )
+
+class ArchivedPlacement(Base):
+    """Inactive placements moved out of showroom_placements by the archival job."""
+    __table__ = _archive_table(
+        ShowroomPlacement, 'showroom_placements_archive',
+        Index('idx_placements_archive_style', 'style_number'),
+        Index('idx_placements_archive_classification', 'classification_id')
+    )
+
+class ArchivedRemovalTask(Base):
+    """Completed removal tasks moved out of removal_tasks by the archival job."""
+    __table__ = _archive_table(
+        RemovalTask, 'removal_tasks_archive',
+        Index('idx_removal_archive_created', 'created_timestamp')
+    )
@@ -0,0 +1,36 @@
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class ParsedItem:
+    """
+    One style/color row produced by the spreadsheet parsers.
+
+    Shared by the parsers and save_excel_data so rows are not copied into
+    intermediate dicts. Division and outsole repeat across thousands of rows,
+    so they are interned to share a single string object per distinct value.
+    """
+    style: str
+    color: str
+    image: Optional[str] = None
+    division: Optional[str] = None
+    outsole: Optional[str] = None
+    color_description: Optional[str] = None
+    gender: Optional[str] = None
+
+    def __post_init__(self):
+        if self.division is not None:
+            self.division = sys.intern(self.division)
+        if self.outsole is not None:
+            self.outsole = sys.intern(self.outsole)
+
+    def to_row(self) -> list:
+        """Return field values in declaration order, for compact serialization."""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_row(cls, row: list) -> 'ParsedItem':
+        """Rebuild an item from the output of to_row."""
+        return cls(*row)
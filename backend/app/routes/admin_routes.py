@@ -70,7 +70,6 @@ def complete_removal_task(task_id):
             db.commit()
             
             log_audit_action(
-                db,
                 'removal_task_completed',
                 affected_resources=f"Task ID: {task_id}",
                 ip_address=request.remote_addr,
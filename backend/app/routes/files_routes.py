@@ -7,7 +7,7 @@ from app.core.database import SessionLocal
 from app.models.database_models import File
 from app.services.excel_parser import parse_excel_file
 from app.services.pdf_parser import parse_pdf_file
-from app.services.database_service import save_excel_data, log_audit_action
+from app.services.database_service import save_excel_data, save_pdf_styles, log_audit_action
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -89,7 +89,6 @@ def upload_file():
                     
                     # Log audit action
                     log_audit_action(
-                        db, 
                         'file_uploaded',
                         affected_resources=f"File ID: {file_id}",
                         ip_address=request.remote_addr,
@@ -123,6 +122,9 @@ def upload_file():
                 parse_result = parse_pdf_file(file_path)
                 
                 if parse_result['success']:
+                    # Save detected styles
+                    save_stats = save_pdf_styles(db, file_id, parse_result['detected_style_numbers'])
+                    
                     from datetime import datetime
                     file_record.parsed_at = datetime.utcnow()
                     file_record.row_count = len(parse_result['detected_style_numbers'])
@@ -130,7 +132,6 @@ def upload_file():
                     db.commit()
                     
                     log_audit_action(
-                        db,
                         'file_uploaded',
                         affected_resources=f"File ID: {file_id}",
                         ip_address=request.remote_addr,
@@ -145,7 +146,14 @@ def upload_file():
                         'parsing_summary': {
                             'page_count': parse_result['page_count'],
                             'style_numbers_detected': len(parse_result['detected_style_numbers']),
-                            'style_numbers': parse_result['detected_style_numbers']
+                            'style_numbers': parse_result['detected_style_numbers'],
+                            'styles_created': save_stats['styles_created'],
+                            'styles_updated': save_stats['styles_updated'],
+                            'slowest_pages': sorted(
+                                parse_result['page_timings'],
+                                key=lambda t: t['seconds'],
+                                reverse=True
+                            )[:10]
                         },
                         'warnings': []
                     }), 201
@@ -214,7 +222,6 @@ def delete_file(file_id):
             
             # Log audit action
             log_audit_action(
-                db,
                 'file_deleted',
                 affected_resources=f"File ID: {file_id}",
                 ip_address=request.remote_addr,
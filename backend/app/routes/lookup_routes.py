@@ -2,7 +2,8 @@ from flask import Blueprint, request, jsonify
 import logging
 from app.core.database import SessionLocal
 from app.services.database_service import lookup_style_color
-from app.models.database_models import Style, Color
+from app.models.database_models import StyleReadModel
+from app.services.read_model import read_model_colors
 from sqlalchemy import func, or_
 
 logger = logging.getLogger(__name__)
@@ -48,23 +49,23 @@ def search():
         db = SessionLocal()
         try:
             # Build query
-            styles_query = db.query(Style)
+            styles_query = db.query(StyleReadModel)
             
             if query:
                 # Search in style number, division
                 search_pattern = f"%{query}%"
                 styles_query = styles_query.filter(
                     or_(
-                        Style.style_number.ilike(search_pattern),
-                        Style.division.ilike(search_pattern)
+                        StyleReadModel.style_number.ilike(search_pattern),
+                        StyleReadModel.division.ilike(search_pattern)
                     )
                 )
             
             if division_filter:
-                styles_query = styles_query.filter(Style.division == division_filter)
+                styles_query = styles_query.filter(StyleReadModel.division == division_filter)
             
             if gender_filter:
-                styles_query = styles_query.filter(Style.gender == gender_filter)
+                styles_query = styles_query.filter(StyleReadModel.gender == gender_filter)
             
             # Get total count
             total_count = styles_query.count()
@@ -76,13 +77,12 @@ def search():
             # Format results
             results = []
             for style in styles:
-                colors = db.query(Color).filter(Color.style_id == style.id).all()
                 results.append({
                     'style_number': style.style_number,
                     'division': style.division,
                     'gender': style.gender,
                     'outsole': style.outsole,
-                    'colors': [c.color_name for c in colors]
+                    'colors': read_model_colors(style)
                 })
             
             return jsonify({
@@ -2,8 +2,8 @@ from flask import Blueprint, request, jsonify
 import logging
 from datetime import datetime
 from app.core.database import SessionLocal
-from app.models.database_models import File, Style, Color, ShowroomPlacement, SyncLog
-import json
+from app.models.database_models import File, StyleReadModel, ShowroomPlacement, SyncLog
+from app.services.read_model import read_model_colors
 
 logger = logging.getLogger(__name__)
 
@@ -25,20 +25,19 @@ def full_sync():
                 'upload_date': f.upload_date.isoformat()
             } for f in files]
             
-            # Get all styles with colors
-            styles = db.query(Style).all()
+            # Get all styles with colors and sources from the read model
+            styles = db.query(StyleReadModel).all()
             styles_data = []
             for style in styles:
-                colors = db.query(Color).filter(Color.style_id == style.id).all()
                 styles_data.append({
-                    'id': style.id,
+                    'id': style.style_id,
                     'style_number': style.style_number,
                     'division': style.division,
                     'gender': style.gender,
                     'outsole': style.outsole,
-                    'source_file_ids': json.loads(style.source_file_ids or '[]'),
-                    'colors': [c.color_name for c in colors],
-                    'updated_at': style.updated_at.isoformat() if style.updated_at else style.created_at.isoformat()
+                    'source_file_ids': [source['id'] for source in style.source_files],
+                    'colors': read_model_colors(style),
+                    'updated_at': style.updated_at.isoformat()
                 })
             
             # Get all active placements
@@ -94,21 +93,20 @@ def incremental_sync():
         db = SessionLocal()
         try:
             # Get styles updated since timestamp
-            updated_styles = db.query(Style).filter(
-                Style.updated_at > since_datetime
+            updated_styles = db.query(StyleReadModel).filter(
+                StyleReadModel.updated_at > since_datetime
             ).all()
             
             styles_data = []
             for style in updated_styles:
-                colors = db.query(Color).filter(Color.style_id == style.id).all()
                 styles_data.append({
-                    'id': style.id,
+                    'id': style.style_id,
                     'style_number': style.style_number,
                     'division': style.division,
                     'gender': style.gender,
                     'outsole': style.outsole,
-                    'colors': [c.color_name for c in colors],
-                    'updated_at': style.updated_at.isoformat() if style.updated_at else style.created_at.isoformat(),
+                    'colors': read_model_colors(style),
+                    'updated_at': style.updated_at.isoformat(),
                     'change_type': 'updated'
                 })
             
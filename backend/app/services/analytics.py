@@ -0,0 +1,278 @@
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import column, inspect, select, table, union_all
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.log_partitions import partition_months, partition_name
+from app.models.database_models import (
+    ArchivedClassification,
+    ArchivedPlacement,
+    ShowroomPlacement,
+    SyncLog,
+    WarehouseClassification
+)
+from app.services.archival import with_archive
+from app.services.periodic import PeriodicJob
+
+try:
+    import duckdb
+except ImportError:  # duckdb is only needed for the analytics export and reports
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+
+def _classifications(conn):
+    rows = with_archive(WarehouseClassification, ArchivedClassification)
+    return select(
+        rows.c.id, rows.c.style_number, rows.c.color, rows.c.status, rows.c.coordinator_user_id,
+        rows.c.coordinator_name, rows.c.manager_approved, rows.c.final_status,
+        rows.c.submission_timestamp, rows.c.approval_timestamp, rows.c.confidence_score, rows.c.archived
+    )
+
+
+def _placements(conn):
+    rows = with_archive(ShowroomPlacement, ArchivedPlacement)
+    return select(
+        rows.c.id, rows.c.style_number, rows.c.color, rows.c.shelf_location, rows.c.coordinator_user_id,
+        rows.c.placement_timestamp, rows.c.classification_id, rows.c.is_active, rows.c.archived
+    )
+
+
+def _sync_log(conn):
+    names = ('device_id', 'last_sync_timestamp', 'sync_status', 'sync_type', 'records_synced')
+    live = select(*[SyncLog.__table__.c[name] for name in names])
+    if conn.dialect.name != 'sqlite':
+        # PostgreSQL partitions are read through the parent table
+        return live
+    # SQLite rolls past months into sync_log_pYYYY_MM archive tables
+    archives = [
+        table(partition_name('sync_log', month), *[column(name, SyncLog.__table__.c[name].type) for name in names])
+        for month in partition_months('sync_log', inspect(conn).get_table_names())
+    ]
+    if not archives:
+        return live
+    rows = union_all(live, *[select(*archive.c) for archive in archives]).subquery('sync_log')
+    return select(rows)
+
+
+# Exported tables: query, month partition column, and whether rows are
+# append-only. Append-only datasets only re-export the latest exported month
+# onwards; the others are rewritten on every run because rows change
+# (approvals, deactivations). Classifications and placements include their
+# archives.
+DATASETS = {
+    'classifications': (_classifications, 'submission_timestamp', False),
+    'placements': (_placements, 'placement_timestamp', False),
+    'sync_log': (_sync_log, 'last_sync_timestamp', True),
+}
+
+
+def _sql_string(value: str) -> str:
+    """Quote a file path as a DuckDB string literal (COPY TO and read_parquet take no parameters here)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _exported_months(root: str) -> List[tuple]:
+    """(year, month) partitions already written under a dataset directory."""
+    months = []
+    if not os.path.isdir(root):
+        return months
+    for year_dir in os.listdir(root):
+        if not year_dir.startswith('year='):
+            continue
+        for month_dir in os.listdir(os.path.join(root, year_dir)):
+            if month_dir.startswith('month='):
+                months.append((int(year_dir[5:]), int(month_dir[6:])))
+    return sorted(months)
+
+
+def export_dataset(name: str) -> int:
+    """
+    Export one dataset to Parquet files partitioned by year and month.
+
+    Each partition is <ANALYTICS_PATH>/<name>/year=YYYY/month=M/data.parquet,
+    written to a temporary file and renamed into place so readers never see a
+    partial file. Rows are read from the database with one query.
+
+    Returns:
+        Number of rows exported
+    """
+    query, column, append_only = DATASETS[name]
+    root = os.path.join(settings.ANALYTICS_PATH, name)
+    exported = _exported_months(root)
+
+    with engine.connect() as conn:
+        query = query(conn)
+        if append_only and exported:
+            # The latest exported month may have been partial
+            year, month = exported[-1]
+            query = query.where(query.selected_columns[column] >= datetime(year, month, 1))
+        frame = pd.read_sql(query, conn)
+
+    months = []
+    if not frame.empty:
+        con = duckdb.connect()
+        try:
+            con.register('export_rows', frame)
+            # Typed explicitly: SQLite returns timestamps that pandas may leave as strings
+            con.execute(
+                f"CREATE TEMP VIEW export_typed AS "
+                f"SELECT * REPLACE (CAST({column} AS TIMESTAMP) AS {column}) FROM export_rows"
+            )
+            months = con.execute(
+                f"SELECT DISTINCT year({column}), month({column}) FROM export_typed WHERE {column} IS NOT NULL"
+            ).fetchall()
+            for year, month in months:
+                directory = os.path.join(root, f'year={year}', f'month={month}')
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, 'data.parquet')
+                con.execute(
+                    f"COPY (SELECT * FROM export_typed WHERE year({column}) = {int(year)} "
+                    f"AND month({column}) = {int(month)}) "
+                    f"TO {_sql_string(path + '.tmp')} (FORMAT parquet)"
+                )
+                os.replace(f'{path}.tmp', path)
+        finally:
+            con.close()
+
+    if not append_only:
+        for year, month in set(exported) - set(months):
+            shutil.rmtree(os.path.join(root, f'year={year}', f'month={month}'), ignore_errors=True)
+
+    return len(frame)
+
+
+def export_analytics() -> Dict[str, int]:
+    """Export every dataset; returns rows exported per dataset (None for a dataset that failed)."""
+    if duckdb is None:
+        raise RuntimeError("Analytics export requires the 'duckdb' package")
+    exported = {}
+    for name in DATASETS:
+        # One failing dataset must not hold back the others
+        try:
+            exported[name] = export_dataset(name)
+        except Exception as e:
+            logger.exception(f"❌ Exporting analytics dataset {name} failed: {e}")
+            exported[name] = None
+    logger.info(f"📊 Exported analytics datasets: {exported}")
+    return exported
+
+
+# Reports over the exported files. Each takes start and end (dates, end
+# exclusive) plus the bucket for time series; dataset placeholders are
+# replaced by read_parquet() over that dataset's files.
+REPORTS = {
+    'keep_drop_rates': ("""
+        SELECT coalesce(coordinator_name, 'unknown') AS coordinator,
+               count(*) AS decided,
+               count(*) FILTER (WHERE final_status = 'keep') AS kept,
+               count(*) FILTER (WHERE final_status = 'drop') AS dropped,
+               round(count(*) FILTER (WHERE final_status = 'keep') / count(*), 4) AS keep_rate,
+               round(count(*) FILTER (WHERE final_status = 'drop') / count(*), 4) AS drop_rate,
+               round(count(*) FILTER (WHERE status = final_status) / count(*), 4) AS agreement_rate
+        FROM {classifications}
+        WHERE manager_approved AND submission_timestamp >= $start AND submission_timestamp < $end
+        GROUP BY coordinator
+        ORDER BY decided DESC
+    """, ('classifications',)),
+    'placement_churn': ("""
+        SELECT CAST(date_trunc($bucket, placement_timestamp) AS DATE) AS period,
+               count(*) AS placed,
+               count(*) FILTER (WHERE NOT is_active) AS removed,
+               count(*) FILTER (WHERE is_active) AS still_active,
+               round(count(*) FILTER (WHERE NOT is_active) / count(*), 4) AS churn_rate
+        FROM {placements}
+        WHERE placement_timestamp >= $start AND placement_timestamp < $end
+        GROUP BY period
+        ORDER BY period
+    """, ('placements',)),
+    'sync_volume': ("""
+        SELECT CAST(date_trunc($bucket, last_sync_timestamp) AS DATE) AS period,
+               count(*) AS syncs,
+               count(*) FILTER (WHERE sync_type = 'full') AS full_syncs,
+               count(*) FILTER (WHERE sync_type = 'incremental') AS incremental_syncs,
+               count(*) FILTER (WHERE sync_status <> 'success') AS failed_syncs,
+               count(DISTINCT device_id) AS devices,
+               CAST(coalesce(sum(records_synced), 0) AS BIGINT) AS records_synced
+        FROM {sync_log}
+        WHERE last_sync_timestamp >= $start AND last_sync_timestamp < $end
+        GROUP BY period
+        ORDER BY period
+    """, ('sync_log',)),
+}
+
+REPORT_BUCKETS = ('day', 'week', 'month')
+
+
+def run_report(report: str, start: datetime, end: datetime, bucket: str = 'day') -> List[Dict]:
+    """
+    Run a named report over the exported Parquet files with DuckDB.
+
+    Never touches the operational database. Values are bound as query
+    parameters. Returns an empty list until the report's datasets have been
+    exported.
+
+    Raises:
+        ValueError: Unknown report or bucket
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report '{report}', expected one of {sorted(REPORTS)}")
+    if bucket not in REPORT_BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(REPORT_BUCKETS)}")
+    if duckdb is None:
+        raise RuntimeError("Analytics reports require the 'duckdb' package")
+
+    sql, datasets = REPORTS[report]
+    sources = {}
+    for name in datasets:
+        root = os.path.join(settings.ANALYTICS_PATH, name)
+        if not _exported_months(root):
+            return []
+        path = _sql_string(os.path.join(root, '**', '*.parquet'))
+        sources[name] = f"read_parquet({path}, hive_partitioning = true, union_by_name = true)"
+
+    params = {'start': start, 'end': end}
+    if '$bucket' in sql:
+        params['bucket'] = bucket
+
+    con = duckdb.connect()
+    try:
+        cursor = con.execute(sql.format(**sources), params)
+        columns = [description[0] for description in cursor.description]
+        return [
+            {column: value.isoformat() if hasattr(value, 'isoformat') else value
+             for column, value in zip(columns, row)}
+            for row in cursor.fetchall()
+        ]
+    finally:
+        con.close()
+
+
+_job: Optional[PeriodicJob] = None
+
+
+def start_analytics_export():
+    """Start the periodic analytics export unless ANALYTICS_EXPORT_INTERVAL_SECONDS is 0."""
+    global _job
+    if settings.ANALYTICS_EXPORT_INTERVAL_SECONDS <= 0 or _job is not None:
+        return
+    if duckdb is None:
+        logger.error("❌ Analytics export requires the 'duckdb' package; export not started")
+        return
+    _job = PeriodicJob('analytics-export', export_analytics, settings.ANALYTICS_EXPORT_INTERVAL_SECONDS)
+    _job.start()
+
+
+def stop_analytics_export():
+    """Stop the analytics export job if it is running."""
+    global _job
+    if _job is not None:
+        _job.stop()
+        _job = None
@@ -0,0 +1,126 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import and_, delete, exists, insert, literal, or_, select, union_all
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.database_models import (
+    ArchivedClassification,
+    ArchivedPlacement,
+    ArchivedRemovalTask,
+    RemovalTask,
+    ShowroomPlacement,
+    WarehouseClassification
+)
+from app.services.periodic import PeriodicJob
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def _move_batch(conn, model, archive, condition, now: datetime) -> int:
+    """Move up to ARCHIVE_BATCH_SIZE rows matching condition into the archive table."""
+    ids = conn.execute(select(model.id).where(condition).limit(ARCHIVE_BATCH_SIZE)).scalars().all()
+    if not ids:
+        return 0
+    columns = [column.name for column in model.__table__.columns]
+    conn.execute(insert(archive).from_select(
+        columns + ['archived_at'],
+        select(*[model.__table__.c[name] for name in columns], literal(now)).where(model.id.in_(ids))
+    ))
+    conn.execute(delete(model).where(model.id.in_(ids)))
+    return len(ids)
+
+
+def _move(model, archive, condition, now: datetime) -> int:
+    """Move all rows matching condition, one transaction per batch to keep locks short."""
+    moved = 0
+    while True:
+        with engine.begin() as conn:
+            count = _move_batch(conn, model, archive, condition, now)
+        moved += count
+        if count < ARCHIVE_BATCH_SIZE:
+            return moved
+
+
+def archive_records(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Move finished warehouse records older than ARCHIVE_AFTER_DAYS into archive tables.
+
+    - Inactive placements, by placement time
+    - Decided classifications, by approval time, once no live placement
+      references them; kept ones only after their placement was archived,
+      so an approved item can still be placed
+    - Completed removal tasks, by completion time
+
+    Returns:
+        Rows archived per table
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+    placements = _move(ShowroomPlacement, ArchivedPlacement, and_(
+        ShowroomPlacement.is_active == False,
+        ShowroomPlacement.placement_timestamp < cutoff
+    ), now)
+
+    classifications = _move(WarehouseClassification, ArchivedClassification, and_(
+        WarehouseClassification.manager_approved == True,
+        WarehouseClassification.approval_timestamp < cutoff,
+        ~exists().where(ShowroomPlacement.classification_id == WarehouseClassification.id),
+        or_(
+            WarehouseClassification.final_status != 'keep',
+            exists().where(ArchivedPlacement.classification_id == WarehouseClassification.id)
+        )
+    ), now)
+
+    tasks = _move(RemovalTask, ArchivedRemovalTask, and_(
+        RemovalTask.completed == True,
+        RemovalTask.completed_timestamp < cutoff
+    ), now)
+
+    archived = {
+        'showroom_placements': placements,
+        'warehouse_classifications': classifications,
+        'removal_tasks': tasks
+    }
+    if any(archived.values()):
+        logger.info(f"📦 Archived records older than {cutoff:%Y-%m-%d}: {archived}")
+    return archived
+
+
+def with_archive(model, archive):
+    """
+    Hot and archived rows of a table as one subquery, with an 'archived' column.
+
+    Read endpoints select from this instead of the hot table when asked to
+    include archived records.
+    """
+    columns = [column.name for column in model.__table__.columns]
+    return union_all(
+        select(*[model.__table__.c[name] for name in columns], literal(False).label('archived')),
+        select(*[archive.__table__.c[name] for name in columns], literal(True).label('archived'))
+    ).subquery(model.__tablename__)
+
+
+_job: Optional[PeriodicJob] = None
+
+
+def start_archival():
+    """Start the archival job unless ARCHIVE_AFTER_DAYS is 0."""
+    global _job
+    if settings.ARCHIVE_AFTER_DAYS <= 0 or _job is not None:
+        return
+    _job = PeriodicJob('archival', archive_records, settings.ARCHIVE_INTERVAL_SECONDS)
+    _job.start()
+
+
+def stop_archival():
+    """Stop the archival job if it is running."""
+    global _job
+    if _job is not None:
+        _job.stop()
+        _job = None
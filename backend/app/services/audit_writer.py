@@ -0,0 +1,157 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.database_models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Writes queued audit events in batches from a background thread.
+
+    A batch is written with one multi-row INSERT once it holds batch_size
+    events or its oldest event has waited flush_seconds. Stopping the writer
+    (also done at interpreter exit) flushes everything still queued.
+
+    A failed batch is kept and retried every flush_seconds. When the database
+    rejects the batch's data, or after max_retries failures, the events are
+    written one by one so only the offending events are dropped (and
+    logged). While the database is unreachable at most max_pending events
+    are kept; the oldest are dropped beyond that.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_seconds: float = 1.0,
+                 max_retries: int = 3, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+
+    def put(self, event: Dict):
+        self._queue.put(event)
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _run(self):
+        batch: List[Dict] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+
+            if event is _STOP:
+                # Drain whatever was queued before the stop
+                while not self._queue.empty():
+                    queued = self._queue.get_nowait()
+                    if queued is not _STOP:
+                        batch.append(queued)
+                batch = self._write(self._trim(batch))
+                if batch:
+                    logger.error(f"❌ Lost {len(batch)} audit events at shutdown")
+                return
+
+            if event is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_seconds
+                batch.append(event)
+                batch = self._trim(batch)
+
+            # After a failure, wait out flush_seconds instead of retrying on every new event
+            full = len(batch) >= self.batch_size and not self._failures
+            if batch and (full or time.monotonic() >= deadline):
+                batch = self._write(batch)
+                deadline = time.monotonic() + self.flush_seconds
+
+    def _trim(self, batch: List[Dict]) -> List[Dict]:
+        """Drop the oldest events beyond max_pending."""
+        if len(batch) <= self.max_pending:
+            return batch
+        dropped = len(batch) - self.max_pending
+        logger.error(f"❌ Dropped {dropped} audit events: more than {self.max_pending} waiting to be saved")
+        return batch[dropped:]
+
+    def _insert(self, events: List[Dict]):
+        with engine.begin() as conn:
+            for start in range(0, len(events), self.batch_size):
+                conn.execute(insert(AuditLog).values(events[start:start + self.batch_size]))
+
+    def _write(self, batch: List[Dict]) -> List[Dict]:
+        """Save a batch; returns the events still to be saved (empty on success)."""
+        if not batch:
+            return batch
+        try:
+            self._insert(batch)
+        except Exception as e:
+            self._failures += 1
+            if _is_unavailable(e) and self._failures < self.max_retries:
+                logger.exception(f"❌ Failed to write {len(batch)} audit events (attempt {self._failures}): {e}")
+                return batch
+            logger.warning(f"⚠️ Writing {len(batch)} audit events one by one after: {e}")
+            return self._write_each(batch)
+        self._failures = 0
+        return []
+
+    def _write_each(self, batch: List[Dict]) -> List[Dict]:
+        """Save events one at a time, dropping those the database rejects."""
+        for index, event in enumerate(batch):
+            try:
+                self._insert([event])
+            except Exception as e:
+                if _is_unavailable(e):
+                    # Not this event's fault; keep it and the rest for the next attempt
+                    logger.exception(f"❌ Failed to write {len(batch) - index} audit events: {e}")
+                    return batch[index:]
+                logger.error(f"❌ Dropped audit event {event!r}: {e}")
+        self._failures = 0
+        return []
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """Whether a write failed because of the database (connection, lock, pool) rather than the event itself."""
+    return isinstance(error, (OperationalError, InterfaceError, TimeoutError))
+
+
+audit_writer = AuditWriter(
+    settings.AUDIT_BATCH_SIZE, settings.AUDIT_FLUSH_SECONDS, max_pending=settings.AUDIT_MAX_PENDING
+)
+
+
+def stop_audit_writer():
+    """Flush queued audit events and stop the writer thread."""
+    audit_writer.stop()
+
+
+atexit.register(stop_audit_writer)
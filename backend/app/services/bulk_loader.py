@@ -0,0 +1,177 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Staged row layout, in COPY column order
+STAGING_COLUMNS = (
+    'row_no', 'style_number', 'style_key', 'base_style_key', 'variant_suffix',
+    'division', 'gender', 'outsole', 'file_id',
+    'color_name', 'color_key', 'image_url', 'color_file_id'
+)
+
+# Temporary tables are never WAL-logged, like UNLOGGED ones, and are private
+# to the connection, so concurrent loads cannot see each other's rows.
+CREATE_STAGING = """
+CREATE TEMPORARY TABLE IF NOT EXISTS style_load_staging (
+    row_no INTEGER NOT NULL,
+    style_number TEXT NOT NULL,
+    style_key TEXT NOT NULL,
+    base_style_key TEXT NOT NULL,
+    variant_suffix TEXT,
+    division TEXT,
+    gender TEXT,
+    outsole TEXT,
+    file_id INTEGER,
+    color_name TEXT,
+    color_key TEXT,
+    image_url TEXT,
+    color_file_id INTEGER
+) ON COMMIT DROP
+"""
+
+COUNT_STYLES = """
+SELECT count(DISTINCT st.row_no),
+       count(DISTINCT st.style_key) FILTER (WHERE s.id IS NULL)
+FROM style_load_staging st
+LEFT JOIN styles s ON s.style_key = st.style_key
+"""
+
+COUNT_NEW_COLORS = """
+SELECT count(*)
+FROM (SELECT DISTINCT style_key, color_key FROM style_load_staging WHERE color_key IS NOT NULL) c
+LEFT JOIN styles s ON s.style_key = c.style_key
+LEFT JOIN colors co ON co.style_id = s.id AND co.color_key = c.color_key
+WHERE co.id IS NULL
+"""
+
+# Later non-empty values win for division, gender and outsole; the first
+# spelling of a style or color and the first image of a color are kept.
+MERGE_STYLES = """
+INSERT INTO styles (style_number, style_key, base_style_key, variant_suffix,
+                    division, gender, outsole, created_at, updated_at)
+SELECT (array_agg(style_number ORDER BY row_no))[1],
+       style_key,
+       min(base_style_key),
+       min(variant_suffix),
+       (array_agg(division ORDER BY row_no DESC) FILTER (WHERE division IS NOT NULL))[1],
+       (array_agg(gender ORDER BY row_no DESC) FILTER (WHERE gender IS NOT NULL))[1],
+       (array_agg(outsole ORDER BY row_no DESC) FILTER (WHERE outsole IS NOT NULL))[1],
+       :now, :now
+FROM style_load_staging
+GROUP BY style_key
+ON CONFLICT (style_key) DO UPDATE SET
+    division = COALESCE(EXCLUDED.division, styles.division),
+    gender = COALESCE(EXCLUDED.gender, styles.gender),
+    outsole = COALESCE(EXCLUDED.outsole, styles.outsole),
+    updated_at = EXCLUDED.updated_at
+"""
+
+MERGE_SOURCES = """
+INSERT INTO style_sources (style_id, file_id)
+SELECT DISTINCT s.id, st.file_id
+FROM style_load_staging st
+JOIN styles s ON s.style_key = st.style_key
+WHERE st.file_id IS NOT NULL
+ON CONFLICT DO NOTHING
+"""
+
+MERGE_COLORS = """
+INSERT INTO colors (style_id, color_name, color_key, image_url, source_file_id, created_at)
+SELECT s.id,
+       (array_agg(st.color_name ORDER BY st.row_no))[1],
+       st.color_key,
+       (array_agg(st.image_url ORDER BY st.row_no) FILTER (WHERE st.image_url IS NOT NULL))[1],
+       (array_agg(st.color_file_id ORDER BY st.row_no))[1],
+       :now
+FROM style_load_staging st
+JOIN styles s ON s.style_key = st.style_key
+WHERE st.color_key IS NOT NULL
+GROUP BY s.id, st.color_key
+ON CONFLICT (style_id, color_key) DO UPDATE SET
+    image_url = COALESCE(colors.image_url, EXCLUDED.image_url)
+"""
+
+LOADED_STYLE_IDS = """
+SELECT s.id
+FROM (SELECT DISTINCT style_key FROM style_load_staging) st
+JOIN styles s ON s.style_key = st.style_key
+"""
+
+
+class _CopyStream:
+    """File-like object that renders rows as CSV on demand for COPY FROM STDIN."""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self._rows = iter(rows)
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out, lineterminator='\n')
+        self._buffer = ''
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            # Empty strings load as NULL, like missing values
+            self._writer.writerow(['' if value is None else value for value in row])
+            self._buffer += self._out.getvalue()
+            self._out.seek(0)
+            self._out.truncate()
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def copy_merge_styles(db: Session, rows: Iterator[Tuple], stats: Dict,
+                      now: Optional[datetime] = None) -> List[int]:
+    """
+    Load staged style/color rows with COPY and merge them set-based, without committing.
+
+    Rows follow STAGING_COLUMNS and are streamed into a temporary staging table
+    through the session's own psycopg2 connection, so the load and the merge
+    into styles, style_sources and colors share the caller's transaction.
+    Stats are updated in place with the same meaning as the row-by-row save.
+    PostgreSQL only.
+
+    Returns:
+        IDs of the loaded styles
+    """
+    now = now or datetime.utcnow()
+    connection = db.connection()
+    connection.execute(text(CREATE_STAGING))
+    connection.execute(text("TRUNCATE style_load_staging"))
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY style_load_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            _CopyStream(rows)
+        )
+        staged = cursor.rowcount
+    finally:
+        cursor.close()
+
+    connection.execute(text("ANALYZE style_load_staging"))
+
+    total_rows, styles_created = connection.execute(text(COUNT_STYLES)).one()
+    colors_created = connection.execute(text(COUNT_NEW_COLORS)).scalar()
+
+    connection.execute(text(MERGE_STYLES), {'now': now})
+    connection.execute(text(MERGE_SOURCES))
+    connection.execute(text(MERGE_COLORS), {'now': now})
+
+    stats['styles_created'] += styles_created
+    stats['styles_updated'] += total_rows - styles_created
+    stats['colors_created'] += colors_created
+    logger.info(f"📥 COPY loaded {staged} staged rows for {total_rows} parsed rows")
+    return connection.execute(text(LOADED_STYLE_IDS)).scalars().all()
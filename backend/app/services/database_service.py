@@ -1,17 +1,362 @@
-import json
 import logging
-from typing import List, Dict, Optional
-from sqlalchemy import func, and_, or_
-from sqlalchemy.orm import Session
+from typing import List, Dict, Optional, Tuple, Union
+from sqlalchemy import func, and_, or_, select, exists
+from sqlalchemy.orm import Session, aliased
 from datetime import datetime, timedelta
 from app.models.database_models import (
-    Style, Color, File, WarehouseClassification, 
-    ShowroomPlacement, RemovalTask, SyncLog, AuditLog
+    Style, StyleSource, Color, WarehouseClassification,
+    ShowroomPlacement, RemovalTask, SyncLog, StyleReadModel
 )
+from app.models.parsed_item import ParsedItem
+from app.core.config import settings
+from app.services.audit_writer import audit_writer
+from app.services.bulk_loader import copy_merge_styles
+from app.services.read_model import refresh_style_read_model
+from app.services.style_index import lookup_result, style_index, style_record
+from app.utils.style_keys import lookup_key, normalize_key, split_style_key
 
 logger = logging.getLogger(__name__)
 
-def save_excel_data(db: Session, file_id: int, extracted_data: List[Dict]) -> Dict:
+def _style_fields(style_data: Union[Dict, ParsedItem], file_id: int) -> Tuple:
+    """
+    Return (style_number, division, gender, outsole, colors) for a parsed row or style dict.
+    
+    colors is a list of (color_name, image_url, source_file_id) tuples.
+    """
+    if isinstance(style_data, ParsedItem):
+        return (
+            style_data.style,
+            style_data.division,
+            style_data.gender,
+            style_data.outsole,
+            [(style_data.color, style_data.image, file_id)]
+        )
+    
+    colors = []
+    for color_data in style_data.get('colors', []):
+        # Handle both dict and string formats for backward compatibility
+        if isinstance(color_data, dict):
+            colors.append((
+                color_data.get('color_name'),
+                color_data.get('image_url'),
+                color_data.get('source_file_id', file_id)
+            ))
+        else:
+            colors.append((color_data, None, file_id))
+    
+    return (
+        style_data['style_number'],
+        style_data.get('division'),
+        style_data.get('gender'),
+        style_data.get('outsole'),
+        colors
+    )
+
+
+def _save_style(db: Session, style_data: Union[Dict, ParsedItem], file_ids: List[int], stats: Dict):
+    """Create or update a single style and its colors without committing."""
+    style_number, division, gender, outsole, colors = _style_fields(style_data, file_ids[0])
+    
+    # Check if style exists
+    existing_style = db.query(Style).filter(
+        Style.style_key == normalize_key(style_number)
+    ).first()
+    
+    if existing_style:
+        # Update existing style
+        existing_style.division = division or existing_style.division
+        existing_style.gender = gender or existing_style.gender
+        existing_style.outsole = outsole or existing_style.outsole
+        existing_style.updated_at = datetime.utcnow()
+        
+        stats['styles_updated'] += 1
+        style_id = existing_style.id
+    else:
+        # Create new style
+        new_style = Style(
+            style_number=style_number,
+            division=division,
+            gender=gender,
+            outsole=outsole
+        )
+        db.add(new_style)
+        db.flush()
+        stats['styles_created'] += 1
+        style_id = new_style.id
+    
+    # Update source files
+    source_files = {fid for (fid,) in db.query(StyleSource.file_id).filter(StyleSource.style_id == style_id)}
+    for fid in file_ids:
+        if fid not in source_files:
+            db.add(StyleSource(style_id=style_id, file_id=fid))
+            source_files.add(fid)
+    
+    # Add colors
+    for color_name, image_url, color_file_id in colors:
+        if not color_name:
+            continue
+        
+        # Check if color already exists
+        existing_color = db.query(Color).filter(
+            and_(
+                Color.style_id == style_id,
+                Color.color_key == normalize_key(color_name)
+            )
+        ).first()
+        
+        if not existing_color:
+            new_color = Color(
+                style_id=style_id,
+                color_name=color_name,
+                image_url=image_url,
+                source_file_id=color_file_id
+            )
+            db.add(new_color)
+            stats['colors_created'] += 1
+        else:
+            # Update image URL if provided and not already set
+            if image_url and not existing_color.image_url:
+                existing_color.image_url = image_url
+
+
+# Rows per multi-row INSERT; keeps SQLite under its bound-parameter limit
+UPSERT_BATCH_SIZE = 500
+
+
+def _upsert_insert(db: Session):
+    """Return the dialect's INSERT construct with ON CONFLICT support, or None."""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def _batches(items: List, size: int = UPSERT_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _style_key_columns(style_number: str) -> Dict:
+    """Return the normalized key columns stored alongside a style number."""
+    style_key = normalize_key(style_number)
+    base_style_key, variant_suffix = split_style_key(style_key)
+    return {
+        'style_key': style_key,
+        'base_style_key': base_style_key,
+        'variant_suffix': variant_suffix
+    }
+
+
+def _resolve_style_ids(db: Session, keys: List[str]) -> Dict[str, int]:
+    """Map style keys to style ids, one index lookup query per batch."""
+    style_ids = {}
+    for batch in _batches(keys):
+        rows = db.execute(select(Style.id, Style.style_key).where(Style.style_key.in_(batch)))
+        for style_id, style_key in rows:
+            style_ids[style_key] = style_id
+    return style_ids
+
+
+def _link_sources(db: Session, insert, pairs: List[Tuple[int, int]]):
+    """Record (style_id, file_id) provenance pairs, ignoring ones already present."""
+    rows = [{'style_id': style_id, 'file_id': file_id} for style_id, file_id in set(pairs)]
+    for batch in _batches(rows):
+        db.execute(insert(StyleSource).values(batch).on_conflict_do_nothing(
+            index_elements=['style_id', 'file_id']
+        ))
+
+
+def _staging_rows(entries: List[Tuple[Union[Dict, ParsedItem], List[int]]]):
+    """
+    Yield one staging row per color of each entry for the COPY loader.
+    
+    Every source file of an entry is carried on one of its rows, with extra
+    color-less rows when an entry has more source files than colors.
+    """
+    for row_no, (style_data, file_ids) in enumerate(entries):
+        style_number, division, gender, outsole, colors = _style_fields(style_data, file_ids[0])
+        keys = _style_key_columns(style_number)
+        style_columns = (
+            row_no, style_number, keys['style_key'], keys['base_style_key'], keys['variant_suffix'],
+            division or None, gender or None, outsole or None
+        )
+        colors = [color for color in colors if color[0]]
+        for index in range(max(len(colors), len(file_ids))):
+            file_id = file_ids[index] if index < len(file_ids) else None
+            if index < len(colors):
+                color_name, image_url, color_file_id = colors[index]
+                color_columns = (color_name, normalize_key(color_name), image_url or None, color_file_id)
+            else:
+                color_columns = (None, None, None, None)
+            yield style_columns + (file_id,) + color_columns
+
+
+def _merge_style_rows(entries: List[Tuple[Union[Dict, ParsedItem], List[int]]]) -> Dict[str, Dict]:
+    """
+    Collapse parsed rows into one record per style, keyed by normalized style key.
+    
+    Later non-empty values win for division, gender and outsole, and the first
+    image seen for a color is kept, matching the row-by-row save.
+    """
+    merged = {}
+    for style_data, file_ids in entries:
+        style_number, division, gender, outsole, colors = _style_fields(style_data, file_ids[0])
+        style_key = normalize_key(style_number)
+        style = merged.get(style_key)
+        if style is None:
+            style = merged[style_key] = {
+                'style_number': style_number,
+                'division': division,
+                'gender': gender,
+                'outsole': outsole,
+                'file_ids': [],
+                'colors': {},
+                'rows': 0
+            }
+        else:
+            style['division'] = division or style['division']
+            style['gender'] = gender or style['gender']
+            style['outsole'] = outsole or style['outsole']
+        
+        style['rows'] += 1
+        style['file_ids'].extend(fid for fid in file_ids if fid not in style['file_ids'])
+        
+        for color_name, image_url, color_file_id in colors:
+            if not color_name:
+                continue
+            color_key = normalize_key(color_name)
+            color = style['colors'].get(color_key)
+            if color is None:
+                style['colors'][color_key] = {
+                    'color_name': color_name,
+                    'image_url': image_url,
+                    'source_file_id': color_file_id
+                }
+            elif image_url and not color['image_url']:
+                color['image_url'] = image_url
+    
+    return merged
+
+
+def _save_styles(db: Session, entries: List[Tuple[Union[Dict, ParsedItem], List[int]]], stats: Dict):
+    """
+    Create or update styles and colors with set-based statements, without committing.
+    
+    Existing styles and their colors are preloaded with one query per batch,
+    then written with multi-row INSERT ... ON CONFLICT DO UPDATE, so the number
+    of statements grows with the batch count rather than the row count. Stats
+    match the row-by-row save: a style counts as created on its first row and
+    updated on every other row. Dialects without ON CONFLICT use the ORM path.
+    
+    On PostgreSQL, loads of at least COPY_LOAD_MIN_ROWS rows are streamed
+    through COPY into a staging table and merged there instead.
+    
+    The saved styles' read-model rows are refreshed in the same transaction.
+    """
+    if (db.get_bind().dialect.name == 'postgresql'
+            and 0 < settings.COPY_LOAD_MIN_ROWS <= len(entries)):
+        refresh_style_read_model(db, copy_merge_styles(db, _staging_rows(entries), stats))
+        return
+    
+    insert = _upsert_insert(db)
+    if insert is None:
+        for style_data, file_ids in entries:
+            _save_style(db, style_data, file_ids, stats)
+        db.flush()
+        keys = {normalize_key(_style_fields(style_data, file_ids[0])[0]) for style_data, file_ids in entries}
+        refresh_style_read_model(db, _resolve_style_ids(db, list(keys)).values())
+        return
+    
+    merged = _merge_style_rows(entries)
+    if not merged:
+        return
+    
+    # Preload existing styles by their case-insensitive key
+    existing = _resolve_style_ids(db, list(merged))
+    
+    now = datetime.utcnow()
+    style_rows = []
+    for key, style in merged.items():
+        if key in existing:
+            stats['styles_updated'] += style['rows']
+        else:
+            stats['styles_created'] += 1
+            stats['styles_updated'] += style['rows'] - 1
+        
+        style_rows.append({
+            'style_number': style['style_number'],
+            **_style_key_columns(style['style_number']),
+            'division': style['division'],
+            'gender': style['gender'],
+            'outsole': style['outsole'],
+            'updated_at': now
+        })
+    
+    for batch in _batches(style_rows):
+        stmt = insert(Style).values(batch)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['style_key'],
+            set_={
+                'division': func.coalesce(func.nullif(stmt.excluded.division, ''), Style.division),
+                'gender': func.coalesce(func.nullif(stmt.excluded.gender, ''), Style.gender),
+                'outsole': func.coalesce(func.nullif(stmt.excluded.outsole, ''), Style.outsole),
+                'updated_at': stmt.excluded.updated_at
+            }
+        ))
+    
+    # Resolve ids of the written styles, link their source files and preload their colors
+    style_ids = _resolve_style_ids(db, list(merged))
+    _link_sources(db, insert, [
+        (style_ids[key], file_id) for key, style in merged.items() for file_id in style['file_ids']
+    ])
+    
+    existing_colors = set()
+    for batch in _batches(list(style_ids.values())):
+        rows = db.execute(
+            select(Color.style_id, Color.color_key).where(Color.style_id.in_(batch))
+        )
+        existing_colors.update((style_id, color_key) for style_id, color_key in rows)
+    
+    color_rows = []
+    for key, style in merged.items():
+        style_id = style_ids[key]
+        for color_key, color in style['colors'].items():
+            if (style_id, color_key) not in existing_colors:
+                stats['colors_created'] += 1
+            elif not color['image_url']:
+                continue
+            color_rows.append({
+                'style_id': style_id,
+                'color_name': color['color_name'],
+                'color_key': color_key,
+                'image_url': color['image_url'],
+                'source_file_id': color['source_file_id']
+            })
+    
+    for batch in _batches(color_rows):
+        stmt = insert(Color).values(batch)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['style_id', 'color_key'],
+            set_={'image_url': func.coalesce(Color.image_url, stmt.excluded.image_url)}
+        ))
+    
+    refresh_style_read_model(db, style_ids.values())
+
+
+def apply_excel_data(db: Session, file_id: int, extracted_data: List[Union[Dict, ParsedItem]], stats: Dict):
+    """
+    Add extracted data to the session without committing, updating stats in place.
+    
+    Entries may be parser ParsedItem rows or style dicts with a 'colors' list.
+    """
+    _save_styles(db, [(style_data, [file_id]) for style_data in extracted_data], stats)
+
+
+def save_excel_data(db: Session, file_id: int, extracted_data: List[Union[Dict, ParsedItem]]) -> Dict:
     """Save extracted Excel data to database."""
     stats = {
         'styles_created': 0,
@@ -20,77 +365,7 @@ def save_excel_data(db: Session, file_id: int, extracted_data: List[Dict]) -> Di
     }
     
     try:
-        for style_data in extracted_data:
-            style_number = style_data['style_number']
-            
-            # Check if style exists
-            existing_style = db.query(Style).filter(
-                func.lower(Style.style_number) == style_number.lower()
-            ).first()
-            
-            if existing_style:
-                # Update existing style
-                existing_style.division = style_data.get('division') or existing_style.division
-                existing_style.gender = style_data.get('gender') or existing_style.gender
-                existing_style.outsole = style_data.get('outsole') or existing_style.outsole
-                existing_style.updated_at = datetime.utcnow()
-                
-                # Update source files
-                source_files = json.loads(existing_style.source_file_ids or '[]')
-                if file_id not in source_files:
-                    source_files.append(file_id)
-                    existing_style.source_file_ids = json.dumps(source_files)
-                
-                stats['styles_updated'] += 1
-                style_id = existing_style.id
-            else:
-                # Create new style
-                new_style = Style(
-                    style_number=style_number,
-                    division=style_data.get('division'),
-                    gender=style_data.get('gender'),
-                    outsole=style_data.get('outsole'),
-                    source_file_ids=json.dumps([file_id])
-                )
-                db.add(new_style)
-                db.flush()
-                stats['styles_created'] += 1
-                style_id = new_style.id
-            
-            # Add colors
-            for color_data in style_data.get('colors', []):
-                # Handle both dict and string formats for backward compatibility
-                if isinstance(color_data, dict):
-                    color_name = color_data.get('color_name')
-                    image_url = color_data.get('image_url')
-                else:
-                    color_name = color_data
-                    image_url = None
-                
-                if not color_name:
-                    continue
-                
-                # Check if color already exists
-                existing_color = db.query(Color).filter(
-                    and_(
-                        Color.style_id == style_id,
-                        func.lower(Color.color_name) == color_name.lower()
-                    )
-                ).first()
-                
-                if not existing_color:
-                    new_color = Color(
-                        style_id=style_id,
-                        color_name=color_name,
-                        image_url=image_url,
-                        source_file_id=file_id
-                    )
-                    db.add(new_color)
-                    stats['colors_created'] += 1
-                else:
-                    # Update image URL if provided and not already set
-                    if image_url and not existing_color.image_url:
-                        existing_color.image_url = image_url
+        apply_excel_data(db, file_id, extracted_data, stats)
         
         db.commit()
         logger.info(f"Saved Excel data: {stats}")
@@ -102,6 +377,87 @@ def save_excel_data(db: Session, file_id: int, extracted_data: List[Dict]) -> Di
         raise
 
 
+def save_batch_data(db: Session, merged_data: List[Dict]) -> Dict:
+    """
+    Save styles merged from several files in a single transaction.
+    
+    Each entry carries its own 'source_file_ids' and each color dict its
+    'source_file_id', so provenance is kept per file. Pending changes already
+    added to the session (e.g. File status updates) are committed together
+    with the styles.
+    """
+    stats = {
+        'styles_created': 0,
+        'styles_updated': 0,
+        'colors_created': 0
+    }
+    
+    try:
+        _save_styles(db, [(style_data, style_data['source_file_ids']) for style_data in merged_data], stats)
+        
+        db.commit()
+        logger.info(f"Saved batch data: {stats}")
+        return stats
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error saving batch data: {str(e)}")
+        raise
+
+
+def save_pdf_styles(db: Session, file_id: int, style_numbers: List[str]) -> Dict:
+    """
+    Save style numbers detected in a PDF line sheet, linked to its file.
+    
+    New styles are written with multi-row INSERT ... ON CONFLICT DO NOTHING,
+    so a concurrent upload of the same style cannot fail the request, and every
+    detected style is then linked to file_id in style_sources.
+    """
+    stats = {
+        'styles_created': 0,
+        'styles_updated': 0,
+        'colors_created': 0
+    }
+    
+    try:
+        insert = _upsert_insert(db)
+        if insert is None:
+            apply_excel_data(db, file_id, [{'style_number': s} for s in style_numbers], stats)
+            db.commit()
+            return stats
+        
+        # Deduplicate case-insensitively, keeping the first spelling
+        unique = {}
+        for style_number in style_numbers:
+            unique.setdefault(normalize_key(style_number), style_number)
+        
+        existing = _resolve_style_ids(db, list(unique))
+        stats['styles_updated'] = len(existing)
+        
+        new_styles = [
+            {'style_number': style_number, **_style_key_columns(style_number)}
+            for key, style_number in unique.items() if key not in existing
+        ]
+        for batch in _batches(new_styles):
+            result = db.execute(
+                insert(Style).values(batch).on_conflict_do_nothing(index_elements=['style_key'])
+            )
+            stats['styles_created'] += result.rowcount
+        
+        style_ids = {**existing, **_resolve_style_ids(db, [key for key in unique if key not in existing])}
+        _link_sources(db, insert, [(style_id, file_id) for style_id in style_ids.values()])
+        refresh_style_read_model(db, style_ids.values())
+        
+        db.commit()
+        logger.info(f"Saved PDF styles: {stats}")
+        return stats
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error saving PDF styles: {str(e)}")
+        raise
+
+
 def lookup_style_color(db: Session, style_number: str, color: Optional[str] = None) -> Dict:
     """
     Lookup style and color in database.
@@ -110,97 +466,57 @@ def lookup_style_color(db: Session, style_number: str, color: Optional[str] = No
     - Scanned: 144083 → Matches: 144083, 144083W, 144083WW
     - Scanned: 144083L → Matches: 144083L only (kids shoe)
     - Scanned: 144083N → Matches: 144083N only (kids shoe)
+
+    Answered from the in-memory style index once it is loaded.
     """
-    # Normalize the scanned style number
-    base_style = style_number
-    is_kids = False
-    
-    # Check if it's a kids shoe (ends with L or N)
-    if style_number and len(style_number) > 1:
-        if style_number[-1] in ['L', 'N']:
-            is_kids = True
-            # For kids shoes, look for exact match
-        else:
-            # For regular shoes, strip any width suffix for lookup
-            # This shouldn't happen from tags, but handle it just in case
-            if style_number.endswith('WW'):
-                base_style = style_number[:-2]
-            elif style_number.endswith('W'):
-                base_style = style_number[:-1]
-    
-    # Find style - exact match for kids, base match for regular
-    style = db.query(Style).filter(
-        func.lower(Style.style_number) == base_style.lower()
-    ).first()
-    
-    if not style:
-        return {
-            'status': 'drop',
-            'style_number': style_number,
-            'message': 'Style number not found in database',
-            'colors': [],
-            'is_kids': is_kids
-        }
-    
-    # Get all colors for this style with image URLs
-    colors = db.query(Color).filter(Color.style_id == style.id).all()
-    color_names = [c.color_name for c in colors]
-    
-    # Build color details with images
-    color_details = {}
-    for c in colors:
-        color_details[c.color_name] = {
-            'image_url': c.image_url
-        }
-    
-    # Get source files with names
-    source_file_ids = json.loads(style.source_file_ids or '[]')
-    source_files = []
-    for file_id in source_file_ids:
-        file_record = db.query(File).filter(File.id == file_id).first()
-        if file_record:
-            source_files.append({
-                'id': file_id,
-                'filename': file_record.original_filename
-            })
-    
-    result = {
-        'style_number': style.style_number,
-        'division': style.division,
-        'gender': style.gender,
-        'outsole': style.outsole,
-        'colors': color_names,
-        'color_details': color_details,
-        'source_files': source_files,
-        'is_kids': is_kids
-    }
-    
-    if color:
-        # Check if specific color exists
-        color_match = any(c.lower() == color.lower() for c in color_names)
-        if color_match:
-            result['status'] = 'keep'
-            result['message'] = 'Exact match found'
-            result['color'] = color
-            # Add image URL for the specific color
-            for c in colors:
-                if c.color_name.lower() == color.lower():
-                    result['image_url'] = c.image_url
-                    break
-            if is_kids:
-                result['message'] += ' (Kids shoe)'
-        else:
-            result['status'] = 'wait'
-            result['message'] = 'Style exists but color not found'
-            if is_kids:
-                result['message'] += ' (Kids shoe)'
-    else:
-        result['status'] = 'keep'
-        result['message'] = 'Style found'
-        if is_kids:
-            result['message'] += ' (Kids shoe)'
-    
-    return result
+    result = style_index.lookup(style_number, color)
+    if result is not None:
+        return result
+
+    record, is_kids = find_style_record(db, style_number)
+    return lookup_result(style_number, color, record, is_kids)
+
+
+def find_style_record(db: Session, style_number: str) -> Tuple[Optional[Dict], bool]:
+    """
+    Lookup record (see style_record) for a scanned style number, or None, and whether it is a kids shoe.
+
+    Depends only on the normalized style number; lookup_result turns it into
+    the response for the scanned style and color.
+    """
+    # Normalize the scanned style number: exact match for kids, base match for regular
+    style_key, is_kids = lookup_key(style_number)
+
+    # Colors with image URLs and source files come pre-aggregated
+    style = db.execute(
+        select(StyleReadModel.__table__).where(StyleReadModel.style_key == style_key).limit(1)
+    ).mappings().first()
+
+    return (style_record(style) if style else None), is_kids
+
+
+def lookup_style_colors(db: Session, items: List[Tuple[str, Optional[str]]]) -> List[Dict]:
+    """
+    Lookup many (style_number, color) pairs at once.
+
+    Same results as calling lookup_style_color for each pair, in order, but
+    with a single read-model query (none once the style index is loaded).
+    """
+    if style_index.loaded:
+        return [style_index.lookup(style_number, color) for style_number, color in items]
+
+    keys = [lookup_key(style_number) for style_number, _ in items]
+    records = {}
+    if keys:
+        for row in db.execute(
+            select(StyleReadModel.__table__).where(StyleReadModel.style_key.in_({key for key, _ in keys}))
+        ).mappings():
+            records[row['style_key']] = style_record(row)
+
+    return [
+        lookup_result(style_number, color, records.get(style_key), is_kids)
+        for (style_number, color), (style_key, is_kids) in zip(items, keys)
+    ]
 
 
 def get_pending_classifications(db: Session, limit: int = 100) -> List[Dict]:
@@ -211,11 +527,11 @@ def get_pending_classifications(db: Session, limit: int = 100) -> List[Dict]:
         WarehouseClassification.submission_timestamp.asc()
     ).limit(limit).all()
     
+    # Style info for every classification in one lookup
+    style_infos = lookup_style_colors(db, [(c.style_number, c.color) for c in classifications])
+    
     results = []
-    for classification in classifications:
-        # Get style info
-        style_info = lookup_style_color(db, classification.style_number, classification.color)
-        
+    for classification, style_info in zip(classifications, style_infos):
         results.append({
             'classification_id': classification.id,
             'style_number': classification.style_number,
@@ -327,16 +643,28 @@ def get_statistics(db: Session) -> Dict:
     }
 
 
+def styles_only_in_file(db: Session, file_id: int):
+    """
+    Query styles whose only source is file_id.
+    
+    An indexed anti-join on style_sources: linked to file_id, with no link to
+    any other file.
+    """
+    other = aliased(StyleSource)
+    other_source = exists().where(
+        other.style_id == Style.id,
+        other.file_id != file_id
+    )
+    return db.query(Style).join(
+        StyleSource,
+        and_(StyleSource.style_id == Style.id, StyleSource.file_id == file_id)
+    ).filter(~other_source)
+
+
 def trigger_auto_drop(db: Session, file_id: int) -> List[Dict]:
     """Trigger auto-drop for styles that only have this file as source."""
     # Find styles where this is the only source file
-    orphaned_styles = []
-    
-    all_styles = db.query(Style).all()
-    for style in all_styles:
-        source_files = json.loads(style.source_file_ids or '[]')
-        if source_files == [file_id]:
-            orphaned_styles.append(style)
+    orphaned_styles = styles_only_in_file(db, file_id).all()
     
     removal_tasks = []
     
@@ -369,16 +697,15 @@ def trigger_auto_drop(db: Session, file_id: int) -> List[Dict]:
     return removal_tasks
 
 
-def log_audit_action(db: Session, action_type: str, admin_user_id: Optional[int] = None,
-                    affected_resources: Optional[str] = None, ip_address: Optional[str] = None,
-                    details: Optional[str] = None):
-    """Log an audit action."""
-    audit = AuditLog(
-        admin_user_id=admin_user_id,
-        action_type=action_type,
-        affected_resources=affected_resources,
-        ip_address=ip_address,
-        details=details
-    )
-    db.add(audit)
-    db.commit()
+def log_audit_action(action_type: str, admin_user_id: Optional[int] = None,
+                     affected_resources: Optional[str] = None, ip_address: Optional[str] = None,
+                     details: Optional[str] = None):
+    """Queue an audit action; the audit writer saves it in the background."""
+    audit_writer.put({
+        'admin_user_id': admin_user_id,
+        'action_type': action_type,
+        'affected_resources': affected_resources,
+        'timestamp': datetime.utcnow(),
+        'ip_address': ip_address,
+        'details': details
+    })
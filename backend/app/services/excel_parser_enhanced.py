@@ -1,10 +1,13 @@
+import csv
 import logging
 import tempfile
 import openpyxl
 from openpyxl_image_loader import SheetImageLoader
 from pyxlsb import open_workbook as open_xlsb
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Any, List, Optional
+
+from app.models.parsed_item import ParsedItem
 
 logger = logging.getLogger(__name__)
 
@@ -168,7 +171,7 @@ def extract_and_save_image(image_loader, cell_address: str, style: str, color: s
     return None
 
 
-def parse_excel_ki(file_path: Path) -> List[Dict]:
+def parse_excel_ki(file_path: Path) -> List[ParsedItem]:
     """Parse KI sheet - extract style, color, image, division, outsole"""
     logger.info(f"📊 Parsing KI sheet: {file_path.name}")
     
@@ -266,28 +269,32 @@ def parse_excel_ki(file_path: Path) -> List[Dict]:
             if image_url:
                 images_extracted += 1
         
-        item = {
-            "style": style,
-            "color": color,
-            "image": image_url
-        }
-        
+        division = None
         if col_map.get('division'):
             division_val = row[col_map['division'] - 1].value
             if division_val:
-                item["division"] = str(division_val).strip()
+                division = str(division_val).strip()
         
+        outsole = None
         if col_map.get('outsole'):
             outsole_val = row[col_map['outsole'] - 1].value
             if outsole_val:
-                item["outsole"] = str(outsole_val).strip()
+                outsole = str(outsole_val).strip()
         
+        color_description = None
         if col_map.get('colorDescription'):
             color_desc_val = row[col_map['colorDescription'] - 1].value
             if color_desc_val:
-                item["colorDescription"] = str(color_desc_val).strip()
+                color_description = str(color_desc_val).strip()
         
-        items.append(item)
+        items.append(ParsedItem(
+            style,
+            color,
+            image_url,
+            division=division,
+            outsole=outsole,
+            color_description=color_description
+        ))
     
     wb.close()
     logger.info(f"✅ Parsed {len(items)} KI items (skipped {skipped} empty rows)")
@@ -299,7 +306,7 @@ def parse_excel_ki(file_path: Path) -> List[Dict]:
     return items
 
 
-def parse_excel_allbought(file_path: Path) -> List[Dict]:
+def parse_excel_allbought(file_path: Path) -> List[ParsedItem]:
     """Parse All Bought sheet - extract style, color, image, division, outsole"""
     logger.info(f"📊 Parsing All Bought sheet: {file_path.name}")
     
@@ -361,11 +368,7 @@ def parse_excel_allbought(file_path: Path) -> List[Dict]:
         if not style or not color:
             continue
         
-        item = {
-            "style": style,
-            "color": color
-        }
-        
+        image_str = None
         if 'image' in col_map:
             image_val = row[col_map['image'] - 1].value
             if image_val:
@@ -376,31 +379,40 @@ def parse_excel_allbought(file_path: Path) -> List[Dict]:
                     if match:
                         filename = match.group(1)
                         image_str = f"/uploads/shoe_images/{filename}"
-                item["image"] = image_str
         
+        division = None
         if 'division' in col_map:
             division_val = row[col_map['division'] - 1].value
             if division_val:
-                item["division"] = str(division_val).strip()
+                division = str(division_val).strip()
         
+        outsole = None
         if 'outsole' in col_map:
             outsole_val = row[col_map['outsole'] - 1].value
             if outsole_val:
-                item["outsole"] = str(outsole_val).strip()
+                outsole = str(outsole_val).strip()
         
+        color_description = None
         if 'colorDescription' in col_map:
             color_desc_val = row[col_map['colorDescription'] - 1].value
             if color_desc_val:
-                item["colorDescription"] = str(color_desc_val).strip()
+                color_description = str(color_desc_val).strip()
         
-        items.append(item)
+        items.append(ParsedItem(
+            style,
+            color,
+            image_str,
+            division=division,
+            outsole=outsole,
+            color_description=color_description
+        ))
     
     wb.close()
     logger.info(f"✅ Parsed {len(items)} All Bought items")
     return items
 
 
-def parse_xlsb_file(file_path: Path) -> List[Dict]:
+def parse_xlsb_file(file_path: Path) -> List[ParsedItem]:
     """Parse XLSB (binary Excel) file - works for both KI and AllBought"""
     logger.info(f"📊 Parsing XLSB file: {file_path.name}")
     
@@ -460,18 +472,80 @@ def parse_xlsb_file(file_path: Path) -> List[Dict]:
                 if not style_str or not color_str:
                     continue
                 
-                item = {
-                    "style": style_str,
-                    "color": color_str,
-                    "image": None
-                }
-                
+                color_description = None
                 if 'colorDescription' in col_map and col_map['colorDescription'] < len(row_values):
                     color_desc = row_values[col_map['colorDescription']]
                     if color_desc:
-                        item["colorDescription"] = str(color_desc).strip()
+                        color_description = str(color_desc).strip()
+                
+                item = ParsedItem(style_str, color_str, color_description=color_description)
                 
                 items.append(item)
     
     logger.info(f"✅ Parsed {len(items)} items from XLSB")
     return items
+
+
+def parse_csv_file(file_path: Path) -> List[ParsedItem]:
+    """Parse CSV export - works for both KI and AllBought"""
+    logger.info(f"📊 Parsing CSV file: {file_path.name}")
+    
+    items = []
+    
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    
+    if not rows:
+        raise ValueError("CSV file is empty")
+    
+    header_row_idx = None
+    col_map = {}
+    
+    for idx, row in enumerate(rows[:10]):
+        row_str = ' '.join([str(v).lower() for v in row])
+        
+        if 'style' in row_str and 'color' in row_str:
+            header_row_idx = idx
+            for col_idx, cell_value in enumerate(row):
+                val_lower = cell_value.lower().strip()
+                if not val_lower:
+                    continue
+                if 'style' in val_lower:
+                    col_map['style'] = col_idx
+                elif 'color description' in val_lower or 'colordescription' in val_lower:
+                    col_map['colorDescription'] = col_idx
+                elif val_lower == 'color':
+                    col_map['color'] = col_idx
+                elif 'division' in val_lower:
+                    col_map['division'] = col_idx
+                elif 'outsole' in val_lower:
+                    col_map['outsole'] = col_idx
+            break
+    
+    if header_row_idx is None or 'style' not in col_map or 'color' not in col_map:
+        raise ValueError("Could not find style and color columns in CSV")
+    
+    logger.info(f"✓ Header at row {header_row_idx}, columns: {list(col_map.keys())}")
+    
+    for row in rows[header_row_idx + 1:]:
+        style = row[col_map['style']].strip() if col_map['style'] < len(row) else ''
+        color = row[col_map['color']].strip() if col_map['color'] < len(row) else ''
+        
+        if not style or not color:
+            continue
+        
+        def column_value(field):
+            if field in col_map and col_map[field] < len(row):
+                return row[col_map[field]].strip() or None
+            return None
+        
+        items.append(ParsedItem(
+            style,
+            color,
+            division=column_value('division'),
+            outsole=column_value('outsole'),
+            color_description=column_value('colorDescription')
+        ))
+    
+    logger.info(f"✅ Parsed {len(items)} items from CSV")
+    return items
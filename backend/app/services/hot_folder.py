@@ -0,0 +1,259 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database_models import File
+from app.services.database_service import log_audit_action
+from app.services.ingestion_service import (
+    compute_content_hash,
+    detect_category,
+    find_file_by_hash,
+    get_parse_pool,
+    parse_items_file,
+    run_ingestion,
+    start_ingestion
+)
+
+try:
+    import fcntl
+except ImportError:  # No flock on Windows; run a single server process there
+    fcntl = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is only needed when HOT_FOLDER_PATH is set
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+HOT_FOLDER_EXTENSIONS = {'.xlsx', '.xlsb', '.csv'}
+
+# Held by the one process watching a folder; dotfiles are never ingested
+LOCK_FILENAME = '.hot_folder.lock'
+LOCK_RETRY_SECONDS = 5.0
+
+
+def is_ingestible(path: str) -> bool:
+    """Check whether a path is a spreadsheet export the hot folder should pick up."""
+    name = os.path.basename(path)
+    if name.startswith('~$') or name.startswith('.'):
+        return False
+    return Path(name).suffix.lower() in HOT_FOLDER_EXTENSIONS
+
+
+class _PendingFileHandler(FileSystemEventHandler):
+    """Record created, modified and moved-in files with the time of their last event."""
+
+    def __init__(self, watcher: 'HotFolderWatcher'):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.mark_pending(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.mark_pending(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.mark_pending(event.dest_path)
+
+
+class HotFolderWatcher:
+    """
+    Watch a directory and ingest new or changed exports in batches.
+
+    Files are queued on filesystem events (inotify on Linux) and processed once
+    they have had no events for HOT_FOLDER_SETTLE_SECONDS, so partially copied
+    files are not read. Each batch is parsed concurrently in the shared parse
+    pool and saved through the same checkpointed ingestion as uploads. Files
+    whose SHA-256 matches an already ingested file are skipped.
+
+    Every server process starts a watcher, but only the one holding an
+    exclusive lock on the folder's lock file scans and ingests, so a file is
+    not picked up by several workers at once. The others retry the lock and
+    take over if that process exits.
+    """
+
+    def __init__(self, folder: str, category: Optional[str] = None,
+                 settle_seconds: float = 5.0):
+        self.folder = folder
+        self.category = category
+        self.settle_seconds = settle_seconds
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+        self.watching = threading.Event()
+
+    def mark_pending(self, path: str):
+        if is_ingestible(path):
+            with self._lock:
+                self._pending[path] = time.monotonic()
+
+    def start(self):
+        if Observer is None:
+            logger.error("❌ Hot folder requires the 'watchdog' package; watcher not started")
+            return
+
+        os.makedirs(self.folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='hot-folder', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self.watching.clear()
+
+    def _acquire_lock(self) -> bool:
+        """
+        Take the folder's lock without waiting; False while another process holds it.
+
+        POSIX record locks belong to the process, so parse pool workers forked
+        while it is held do not keep it after this process exits.
+        """
+        if fcntl is None:
+            return True
+        lock_file = open(os.path.join(self.folder, LOCK_FILENAME), 'a')
+        try:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _watch(self):
+        # Pick up files dropped while no process was watching
+        for entry in os.scandir(self.folder):
+            if entry.is_file():
+                self.mark_pending(entry.path)
+
+        self._observer = Observer()
+        self._observer.schedule(_PendingFileHandler(self), self.folder, recursive=False)
+        self._observer.start()
+        self.watching.set()
+        logger.info(f"👀 Watching hot folder: {os.path.abspath(self.folder)}")
+
+    def _take_settled(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            settled = [path for path, seen in self._pending.items()
+                       if now - seen >= self.settle_seconds]
+            for path in settled:
+                del self._pending[path]
+        return [path for path in settled if os.path.isfile(path)]
+
+    def _run(self):
+        if not self._acquire_lock():
+            logger.info(f"⏸️ Hot folder {os.path.abspath(self.folder)} is watched by another process; standing by")
+            while not self._acquire_lock():
+                if self._stop.wait(LOCK_RETRY_SECONDS):
+                    return
+        self._watch()
+
+        while not self._stop.wait(1.0):
+            batch = self._take_settled()
+            if batch:
+                try:
+                    self.ingest_batch(batch)
+                except Exception as e:
+                    logger.exception(f"❌ Hot folder batch failed: {e}")
+
+    def ingest_batch(self, paths: List[str]) -> List[Dict]:
+        """Ingest a batch of settled files, skipping ones already ingested."""
+        db = SessionLocal()
+        try:
+            to_parse = []
+            for path in paths:
+                content_hash = compute_content_hash(path)
+                existing = find_file_by_hash(db, content_hash)
+                if existing:
+                    logger.info(f"⏭️  Skipping {path}: unchanged (matches file {existing.id})")
+                    continue
+
+                filename = os.path.basename(path)
+                file_record = File(
+                    filename=filename,
+                    original_filename=filename,
+                    file_type=Path(filename).suffix.lower().lstrip('.'),
+                    category=self.category or detect_category(filename),
+                    status='processing',
+                    content_hash=content_hash
+                )
+                db.add(file_record)
+                db.commit()
+                to_parse.append((path, file_record))
+
+            if not to_parse:
+                return []
+
+            pool = get_parse_pool()
+            futures = [pool.submit(parse_items_file, path, file_record.category)
+                       for path, file_record in to_parse]
+
+            results = []
+            for (path, file_record), future in zip(to_parse, futures):
+                try:
+                    items = future.result()
+                    checkpoint = start_ingestion(db, file_record.id, items)
+                    stats = run_ingestion(db, checkpoint, items)
+                except Exception as e:
+                    logger.error(f"❌ Hot folder ingestion failed for {path}: {e}")
+                    db.rollback()
+                    file_record.status = 'failed'
+                    db.commit()
+                    continue
+
+                log_audit_action(
+                    'file_uploaded',
+                    affected_resources=f"File ID: {file_record.id}",
+                    details=f"Hot folder file ingested: {file_record.original_filename}"
+                )
+                logger.info(f"✅ Hot folder ingested {path}: {stats}")
+                results.append({'file_id': file_record.id, 'path': path, **stats})
+
+            return results
+        finally:
+            db.close()
+
+
+_watcher: Optional[HotFolderWatcher] = None
+
+
+def start_hot_folder():
+    """Start the hot folder watcher when HOT_FOLDER_PATH is configured."""
+    global _watcher
+    if not settings.HOT_FOLDER_PATH or _watcher is not None:
+        return
+    _watcher = HotFolderWatcher(
+        settings.HOT_FOLDER_PATH,
+        category=settings.HOT_FOLDER_CATEGORY,
+        settle_seconds=settings.HOT_FOLDER_SETTLE_SECONDS
+    )
+    _watcher.start()
+
+
+def stop_hot_folder():
+    """Stop the hot folder watcher if it is running."""
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
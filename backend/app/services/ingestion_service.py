@@ -0,0 +1,349 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database_models import File, IngestionCheckpoint
+from app.models.parsed_item import ParsedItem
+from app.utils.style_keys import normalize_key
+from app.services.database_service import apply_excel_data
+from app.services.periodic import PeriodicJob
+from app.services.excel_parser_enhanced import (
+    parse_csv_file,
+    parse_excel_ki,
+    parse_excel_allbought,
+    parse_xlsb_file
+)
+
+logger = logging.getLogger(__name__)
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool used to parse uploaded files."""
+    global _parse_pool
+    if _parse_pool is None:
+        workers = max(1, settings.PARSE_WORKERS)
+        _parse_pool = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"⚙️  Parse pool started with {workers} workers")
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Shut down the parse pool if it was started."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=True)
+        _parse_pool = None
+
+
+def detect_category(filename: str) -> str:
+    """Detect file category from its name, defaulting to all_bought."""
+    filename_lower = filename.lower()
+    if 'ki' in filename_lower or 'key' in filename_lower:
+        return 'key_initiative'
+    return 'all_bought'
+
+
+def parse_items_file(file_path: str, category: str) -> List[ParsedItem]:
+    """
+    Parse an XLSX/XLSB/CSV file into row items.
+
+    Module-level so it can be shipped to worker processes.
+    """
+    path = Path(file_path)
+    if path.suffix.lower() == '.xlsb':
+        logger.info("📊 Parsing as XLSB (binary Excel)")
+        return parse_xlsb_file(path)
+    elif path.suffix.lower() == '.csv':
+        logger.info("📊 Parsing as CSV")
+        return parse_csv_file(path)
+    elif category == 'all_bought':
+        logger.info("📊 Parsing as All Bought XLSX")
+        return parse_excel_allbought(path)
+    else:
+        logger.info("📊 Parsing as KI XLSX with image extraction")
+        return parse_excel_ki(path)
+
+
+def merge_parsed_files(parsed_files: List[Tuple[int, List[ParsedItem]]]) -> Tuple[List[Dict], Dict[int, Dict]]:
+    """
+    Merge row items from several files into one style/color set.
+
+    Args:
+        parsed_files: (file_id, items) pairs in upload order
+
+    Returns:
+        Merged style entries for save_batch_data and a per-file summary
+        keyed by file ID
+    """
+    merged: Dict[str, Dict] = {}
+    summaries: Dict[int, Dict] = {}
+
+    for file_id, items in parsed_files:
+        file_styles = set()
+        file_colors = set()
+
+        for item in items:
+            style_key = normalize_key(item.style)
+            color_key = normalize_key(item.color)
+            file_styles.add(style_key)
+            file_colors.add((style_key, color_key))
+
+            entry = merged.get(style_key)
+            if entry is None:
+                entry = {
+                    'style_number': item.style,
+                    'division': item.division,
+                    'gender': item.gender,
+                    'outsole': item.outsole,
+                    'source_file_ids': [],
+                    'colors': {}
+                }
+                merged[style_key] = entry
+            else:
+                entry['division'] = item.division or entry['division']
+                entry['gender'] = item.gender or entry['gender']
+                entry['outsole'] = item.outsole or entry['outsole']
+
+            if file_id not in entry['source_file_ids']:
+                entry['source_file_ids'].append(file_id)
+
+            color = entry['colors'].get(color_key)
+            if color is None:
+                entry['colors'][color_key] = {
+                    'color_name': item.color,
+                    'image_url': item.image,
+                    'source_file_id': file_id
+                }
+            elif item.image and not color['image_url']:
+                color['image_url'] = item.image
+
+        summaries[file_id] = {
+            'total_rows_processed': len(items),
+            'total_styles_found': len(file_styles),
+            'total_colors_found': len(file_colors)
+        }
+
+    merged_data = []
+    for entry in merged.values():
+        entry['colors'] = list(entry['colors'].values())
+        merged_data.append(entry)
+
+    return merged_data, summaries
+
+
+def compute_content_hash(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_file_by_hash(db: Session, content_hash: str) -> Optional[File]:
+    """Return the active file record already ingested with this content hash."""
+    return db.query(File).filter(
+        File.content_hash == content_hash,
+        File.is_active == True,
+        File.status != 'failed'
+    ).first()
+
+
+def write_parse_cache(file_id: int, items: List[ParsedItem]) -> str:
+    """Persist parsed items, one JSON row per line, so an interrupted ingestion can skip re-parsing."""
+    os.makedirs(settings.PARSE_CACHE_FOLDER, exist_ok=True)
+    cache_path = os.path.join(settings.PARSE_CACHE_FOLDER, f"{file_id}.jsonl")
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for item in items:
+            f.write(json.dumps(item.to_row()))
+            f.write('\n')
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def read_parse_cache(cache_path: str) -> List[ParsedItem]:
+    """Load parsed items written by write_parse_cache."""
+    with open(cache_path) as f:
+        return [ParsedItem.from_row(json.loads(line)) for line in f]
+
+
+def start_ingestion(db: Session, file_id: int, items: List[ParsedItem]) -> IngestionCheckpoint:
+    """Cache parsed items and create the checkpoint for a new ingestion."""
+    checkpoint = IngestionCheckpoint(
+        file_id=file_id,
+        status='in_progress',
+        last_processed_row=0,
+        total_rows=len(items),
+        parse_cache_path=write_parse_cache(file_id, items),
+        stats=json.dumps({'styles_created': 0, 'styles_updated': 0, 'colors_created': 0})
+    )
+    db.add(checkpoint)
+    db.commit()
+    db.refresh(checkpoint)
+    return checkpoint
+
+
+def run_ingestion(db: Session, checkpoint: IngestionCheckpoint,
+                  items: Optional[List[ParsedItem]] = None) -> Dict:
+    """
+    Save parsed items in committed chunks, starting after the last committed row.
+
+    Each chunk is committed together with the checkpoint, so a restart resumes
+    from the last chunk instead of the beginning. The file record is marked as
+    parsed in the same commit that completes the checkpoint.
+
+    Args:
+        db: Database session
+        checkpoint: Checkpoint returned by start_ingestion or loaded for resume
+        items: Parsed items, loaded from the parse cache when not given
+
+    Returns:
+        Cumulative save statistics
+    """
+    if items is None:
+        items = read_parse_cache(checkpoint.parse_cache_path)
+
+    stats = json.loads(checkpoint.stats or '{}')
+    chunk_size = max(1, settings.INGEST_CHUNK_SIZE)
+
+    try:
+        for start in range(checkpoint.last_processed_row, len(items), chunk_size):
+            end = min(start + chunk_size, len(items))
+            apply_excel_data(db, checkpoint.file_id, items[start:end], stats)
+
+            checkpoint.last_processed_row = end
+            checkpoint.stats = json.dumps(stats)
+            db.commit()
+            logger.info(f"💾 File {checkpoint.file_id}: committed rows {start}-{end} of {len(items)}")
+
+        file_record = db.query(File).filter(File.id == checkpoint.file_id).first()
+        if file_record:
+            file_record.parsed_at = datetime.utcnow()
+            file_record.row_count = len(items)
+            file_record.status = 'success'
+        checkpoint.status = 'completed'
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        checkpoint.status = 'failed'
+        db.commit()
+        raise
+
+    try:
+        os.remove(checkpoint.parse_cache_path)
+    except OSError:
+        pass
+
+    logger.info(f"Ingestion complete for file {checkpoint.file_id}: {stats}")
+    return stats
+
+
+def _resumable(now: datetime):
+    """
+    Checkpoints of interrupted ingestions.
+
+    Every committed chunk refreshes a checkpoint's updated_at, whether the
+    ingestion is a live upload ('in_progress') or a resume ('resuming'), so
+    only one left untouched for INGEST_RESUME_AFTER_SECONDS has lost its
+    process.
+    """
+    return and_(
+        IngestionCheckpoint.status.in_(('in_progress', 'resuming')),
+        IngestionCheckpoint.updated_at < now - timedelta(seconds=settings.INGEST_RESUME_AFTER_SECONDS)
+    )
+
+
+def claim_checkpoint(db: Session, checkpoint_id: int) -> bool:
+    """
+    Mark an interrupted ingestion as being resumed by this process.
+
+    The staleness check and update are one statement, so when several
+    workers look at once exactly one of them claims each checkpoint, and an
+    ingestion that is still committing chunks is never claimed.
+
+    Returns:
+        False if another process claimed (or finished) it first
+    """
+    now = datetime.utcnow()
+    claimed = db.execute(
+        update(IngestionCheckpoint)
+        .where(IngestionCheckpoint.id == checkpoint_id, _resumable(now))
+        .values(status='resuming', updated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def resume_pending_ingestions(db: Session) -> int:
+    """Resume every ingestion whose process stopped committing chunks and that no other process claimed."""
+    checkpoint_ids = [checkpoint_id for checkpoint_id, in db.query(IngestionCheckpoint.id).filter(
+        _resumable(datetime.utcnow())
+    )]
+
+    resumed = 0
+    for checkpoint_id in checkpoint_ids:
+        if not claim_checkpoint(db, checkpoint_id):
+            logger.info(f"⏭️ Ingestion checkpoint {checkpoint_id} is being resumed by another process")
+            continue
+        checkpoint = db.get(IngestionCheckpoint, checkpoint_id, populate_existing=True)
+
+        if not os.path.exists(checkpoint.parse_cache_path):
+            logger.error(f"❌ Parse cache missing for file {checkpoint.file_id}, cannot resume")
+            checkpoint.status = 'failed'
+            db.commit()
+            continue
+
+        logger.info(f"🔁 Resuming ingestion of file {checkpoint.file_id} "
+                    f"from row {checkpoint.last_processed_row}/{checkpoint.total_rows}")
+        try:
+            run_ingestion(db, checkpoint)
+            resumed += 1
+        except Exception as e:
+            logger.error(f"❌ Could not resume ingestion of file {checkpoint.file_id}: {e}")
+
+    return resumed
+
+
+def _resume_ingestions():
+    db = SessionLocal()
+    try:
+        resumed = resume_pending_ingestions(db)
+        if resumed:
+            logger.info(f"✅ Resumed {resumed} interrupted ingestion(s)")
+    finally:
+        db.close()
+
+
+_resume_job: Optional[PeriodicJob] = None
+
+
+def start_ingestion_resume():
+    """Resume interrupted ingestions at startup and every INGEST_RESUME_AFTER_SECONDS."""
+    global _resume_job
+    if _resume_job is not None:
+        return
+    _resume_job = PeriodicJob('ingestion-resume', _resume_ingestions, settings.INGEST_RESUME_AFTER_SECONDS)
+    _resume_job.start()
+
+
+def stop_ingestion_resume():
+    """Stop checking for interrupted ingestions."""
+    global _resume_job
+    if _resume_job is not None:
+        _resume_job.stop()
+        _resume_job = None
@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.log_partitions import (
+    LOG_TABLES,
+    pg_create_partitions,
+    pg_drop_partitions,
+    sqlite_drop_archives,
+    sqlite_rotate_table
+)
+from app.services.periodic import PeriodicJob
+
+logger = logging.getLogger(__name__)
+
+
+def maintain_log_tables(now: Optional[datetime] = None) -> Dict[str, List[str]]:
+    """
+    Create upcoming sync_log/audit_log partitions and drop expired ones.
+
+    Rows older than LOG_RETENTION_DAYS go away a whole month at a time with
+    DROP TABLE instead of a DELETE over the live table; 0 keeps everything.
+    On SQLite the live tables are first rolled into monthly archives.
+
+    Returns:
+        Dropped partition (or archive) names per table
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.LOG_RETENTION_DAYS)
+    dropped = {table: [] for table in LOG_TABLES}
+
+    with engine.begin() as conn:
+        for table in LOG_TABLES:
+            if conn.dialect.name == 'postgresql':
+                pg_create_partitions(conn, table, now)
+                if settings.LOG_RETENTION_DAYS > 0:
+                    dropped[table] = pg_drop_partitions(conn, table, cutoff)
+            else:
+                sqlite_rotate_table(conn, table, now)
+                if settings.LOG_RETENTION_DAYS > 0:
+                    dropped[table] = sqlite_drop_archives(conn, table, cutoff)
+            if dropped[table]:
+                logger.info(f"🧹 Dropped {table} partitions older than {cutoff:%Y-%m-%d}: {dropped[table]}")
+    return dropped
+
+
+_job: Optional[PeriodicJob] = None
+
+
+def start_log_retention():
+    """Start the log partition maintenance and retention job."""
+    global _job
+    if _job is not None:
+        return
+    _job = PeriodicJob('log-retention', maintain_log_tables, settings.LOG_MAINTENANCE_INTERVAL_SECONDS)
+    _job.start()
+
+
+def stop_log_retention():
+    """Stop the retention job if it is running."""
+    global _job
+    if _job is not None:
+        _job.stop()
+        _job = None
@@ -1,71 +1,240 @@
 import pdfplumber
+import pytesseract
 import logging
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-def parse_pdf_file(file_path: str or Path) -> Dict:
+if settings.TESSERACT_PATH:
+    pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_PATH
+
+# Standalone 6-7 digit numbers, or numbers after a "Style"/"SKU"/"Item" label
+STYLE_NUMBER_PATTERN = re.compile(
+    r'(?:Style|SKU|Item)[:\s]+(\d{6,7})|\b(\d{6,7})\b',
+    re.IGNORECASE
+)
+
+
+def extract_style_numbers(text: str) -> set:
+    """Return every style number matched in text in a single pass."""
+    return {labelled or bare for labelled, bare in STYLE_NUMBER_PATTERN.findall(text)}
+
+
+def _scan_pages(file_path: str, first_page: int, last_page: int) -> Tuple[List[str], List[Dict]]:
+    """
+    Scan pages [first_page, last_page) of a PDF for style numbers.
+
+    Each page's word stream is built once and matched with one combined
+    pattern; table cells are made of the same characters, so they need no
+    separate pass. The page's object cache is released as soon as it has been
+    scanned to keep memory flat on long documents. Opens the PDF itself so it
+    can run in a worker process.
+
+    Returns:
+        Style numbers found and per-page timings
+    """
+    style_numbers = set()
+    page_timings = []
+
+    with pdfplumber.open(file_path) as pdf:
+        for page_index in range(first_page, last_page):
+            page_num = page_index + 1
+            started = time.perf_counter()
+            page = pdf.pages[page_index]
+            try:
+                words = page.extract_words()
+            finally:
+                page.flush_cache()
+
+            if not words:
+                logger.warning(f"No text found on page {page_num}")
+                page_styles = set()
+            else:
+                page_styles = extract_style_numbers(' '.join(word['text'] for word in words))
+
+            style_numbers.update(page_styles)
+            page_timings.append({
+                'page': page_num,
+                'seconds': round(time.perf_counter() - started, 4),
+                'style_numbers_found': len(page_styles),
+                'has_text': bool(words)
+            })
+
+    return sorted(style_numbers), page_timings
+
+
+def _ocr_page(file_path: str, page_index: int, dpi: int) -> Tuple[List[str], Dict]:
+    """
+    Rasterize one page and run tesseract on it.
+
+    Used for scanned pages that have no text layer. Opens the PDF itself so it
+    can run in a worker process.
+
+    Returns:
+        Style numbers found and the page timing
+    """
+    started = time.perf_counter()
+    with pdfplumber.open(file_path) as pdf:
+        page = pdf.pages[page_index]
+        try:
+            image = page.to_image(resolution=dpi).original
+        finally:
+            page.flush_cache()
+
+    page_styles = extract_style_numbers(pytesseract.image_to_string(image))
+    return sorted(page_styles), {
+        'page': page_index + 1,
+        'seconds': round(time.perf_counter() - started, 4),
+        'style_numbers_found': len(page_styles),
+        'has_text': False,
+        'ocr': True
+    }
+
+
+_scan_pool: Optional[ProcessPoolExecutor] = None
+_scan_pool_lock = threading.Lock()
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_scan_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by all page-range scans, creating it on first use.
+
+    PDF_WORKERS bounds the scan processes across all requests, not per PDF.
+    """
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            _scan_pool = ProcessPoolExecutor(max_workers=max(1, settings.PDF_WORKERS))
+        return _scan_pool
+
+
+def shutdown_scan_pool():
+    """Shut down the shared scan pool if it was started."""
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is not None:
+            _scan_pool.shutdown(wait=False, cancel_futures=True)
+            _scan_pool = None
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by all OCR work, creating it on first use.
+
+    One pool of PDF_OCR_WORKERS processes serves every request, so several
+    scanned PDFs uploaded at once queue behind each other instead of each
+    spawning its own tesseract processes.
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(max_workers=max(1, settings.PDF_OCR_WORKERS))
+        return _ocr_pool
+
+
+def shutdown_ocr_pool():
+    """Shut down the shared OCR pool if it was started."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+            _ocr_pool = None
+
+
+def _ocr_pages(file_path: str, page_indexes: List[int]) -> List[Tuple[List[str], Dict]]:
+    """OCR text-less pages in the shared pool at PDF_OCR_DPI."""
+    logger.info(f"🔍 Running OCR on {len(page_indexes)} pages without text at {settings.PDF_OCR_DPI} DPI")
+    pool = get_ocr_pool()
+    futures = [pool.submit(_ocr_page, file_path, page_index, settings.PDF_OCR_DPI)
+               for page_index in page_indexes]
+
+    results = []
+    for page_index, future in zip(page_indexes, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.error(f"OCR failed on page {page_index + 1}: {str(e)}")
+    return results
+
+
+def _page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Split pages into contiguous [first, last) ranges."""
+    pages_per_task = max(1, pages_per_task)
+    return [(first, min(first + pages_per_task, page_count))
+            for first in range(0, page_count, pages_per_task)]
+
+
+def parse_pdf_file(file_path: str or Path, workers: Optional[int] = None) -> Dict:
     """
     Parse PDF file to extract style numbers and product information.
-    
+
+    Page ranges of PDF_PAGES_PER_TASK pages are scanned in parallel in the
+    shared scan pool of PDF_WORKERS processes, each opening the PDF independently. Pages without a
+    text layer are then OCRed in the shared OCR pool when PDF_OCR_ENABLED is set.
+
     Args:
         file_path: Path to PDF file
-        
+        workers: Scan in-process when 1 (defaults to settings.PDF_WORKERS)
+
     Returns:
-        Dictionary with parsing results
+        Dictionary with parsing results, including per-page timings
     """
     result = {
         'success': False,
         'page_count': 0,
         'detected_style_numbers': [],
+        'page_timings': [],
         'error': None
     }
-    
+
     try:
+        file_path = str(file_path)
         with pdfplumber.open(file_path) as pdf:
             result['page_count'] = len(pdf.pages)
-            style_numbers = set()
-            
-            for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                
-                if not text:
-                    logger.warning(f"No text found on page {page_num}")
-                    continue
-                
-                # Pattern 1: 6-7 digit style numbers
-                matches = re.findall(r'\b(\d{6,7})\b', text)
-                for match in matches:
-                    style_numbers.add(match)
-                
-                # Pattern 2: Style numbers with prefix (e.g., "Style: 123456")
-                matches = re.findall(r'(?:Style|SKU|Item)[:\s]+(\d{6,7})', text, re.IGNORECASE)
-                for match in matches:
-                    style_numbers.add(match)
-                
-                # Extract tables if present
-                tables = page.extract_tables()
-                for table in tables:
-                    for row in table:
-                        if not row:
-                            continue
-                        for cell in row:
-                            if cell and isinstance(cell, str):
-                                # Look for style numbers in cells
-                                cell_matches = re.findall(r'\b(\d{6,7})\b', cell)
-                                for match in cell_matches:
-                                    style_numbers.add(match)
-            
-            result['detected_style_numbers'] = sorted(list(style_numbers))
-            result['success'] = True
-            
-            logger.info(f"PDF parsing complete: {len(result['detected_style_numbers'])} unique style numbers found across {result['page_count']} pages")
-            
+
+        ranges = _page_ranges(result['page_count'], settings.PDF_PAGES_PER_TASK)
+        workers = min(workers or settings.PDF_WORKERS, len(ranges))
+
+        if workers <= 1:
+            range_results = [_scan_pages(file_path, first, last) for first, last in ranges]
+        else:
+            pool = get_scan_pool()
+            futures = [pool.submit(_scan_pages, file_path, first, last) for first, last in ranges]
+            range_results = [future.result() for future in futures]
+
+        style_numbers = set()
+        for range_styles, range_timings in range_results:
+            style_numbers.update(range_styles)
+            result['page_timings'].extend(range_timings)
+
+        textless_pages = [t['page'] - 1 for t in result['page_timings'] if not t['has_text']]
+        if textless_pages and settings.PDF_OCR_ENABLED:
+            ocr_timings = {}
+            for page_styles, page_timing in _ocr_pages(file_path, textless_pages):
+                style_numbers.update(page_styles)
+                ocr_timings[page_timing['page']] = page_timing
+            result['page_timings'] = [ocr_timings.get(t['page'], t) for t in result['page_timings']]
+
+        result['detected_style_numbers'] = sorted(list(style_numbers))
+        result['success'] = True
+
+        slowest = sorted(result['page_timings'], key=lambda t: t['seconds'], reverse=True)[:5]
+        logger.info(f"PDF parsing complete: {len(result['detected_style_numbers'])} unique style numbers found across {result['page_count']} pages using {max(workers, 1)} workers")
+        if slowest:
+            logger.info("Slowest pages: " + ", ".join(f"{t['page']} ({t['seconds']:.2f}s)" for t in slowest))
+
     except Exception as e:
         logger.error(f"Error parsing PDF: {str(e)}")
         result['error'] = str(e)
         result['success'] = False
-    
+
     return result
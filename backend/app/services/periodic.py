@@ -0,0 +1,34 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Runs a maintenance function at startup and then every interval_seconds in a daemon thread."""
+
+    def __init__(self, name: str, target: Callable, interval_seconds: float = 3600):
+        self.name = name
+        self.target = target
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                self.target()
+            except Exception as e:
+                logger.exception(f"❌ {self.name} failed: {e}")
+            if self._stop.wait(self.interval_seconds):
+                return
@@ -0,0 +1,97 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.database_models import Color, File, Style, StyleReadModel, StyleSource
+
+logger = logging.getLogger(__name__)
+
+READ_MODEL_BATCH_SIZE = 500
+
+# Session.info key holding the rows refreshed in the current transaction,
+# style_id -> row (None when the style was deleted), or None after a full
+# rebuild. The style index applies them once the transaction commits.
+REFRESHED_ROWS = 'refreshed_style_rows'
+
+
+def _read_model_rows(db, style_ids: List[int]) -> List[Dict]:
+    """Build read-model rows for a batch of styles with three queries."""
+    colors = {}
+    for style_id, name, key, image_url in db.execute(
+        select(Color.style_id, Color.color_name, Color.color_key, Color.image_url)
+        .where(Color.style_id.in_(style_ids))
+        .order_by(Color.id)
+    ):
+        colors.setdefault(style_id, []).append({'name': name, 'key': key, 'image_url': image_url})
+
+    source_files = {}
+    for style_id, file_id, filename in db.execute(
+        select(StyleSource.style_id, File.id, File.original_filename)
+        .join(File, File.id == StyleSource.file_id)
+        .where(StyleSource.style_id.in_(style_ids))
+        .order_by(File.id)
+    ):
+        source_files.setdefault(style_id, []).append({'id': file_id, 'filename': filename})
+
+    return [{
+        'style_id': style.id,
+        'style_number': style.style_number,
+        'style_key': style.style_key,
+        'division': style.division,
+        'gender': style.gender,
+        'outsole': style.outsole,
+        'colors': colors.get(style.id, []),
+        'source_files': source_files.get(style.id, []),
+        'updated_at': style.updated_at
+    } for style in db.execute(
+        select(
+            Style.id, Style.style_number, Style.style_key, Style.division, Style.gender, Style.outsole,
+            func.coalesce(Style.updated_at, Style.created_at).label('updated_at')
+        ).where(Style.id.in_(style_ids))
+    )]
+
+
+def refresh_style_read_model(db, style_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Rebuild the style_read_model rows of the given styles, without committing.
+
+    Works on a Session or a Connection. Styles that no longer exist lose their
+    row. With style_ids None, the whole table is rebuilt. Pending ORM changes
+    must be flushed first. On a Session the new rows are also recorded in
+    session.info[REFRESHED_ROWS].
+
+    Returns:
+        Number of styles refreshed
+    """
+    rebuild = style_ids is None
+    refreshed = None
+    if rebuild:
+        db.execute(delete(StyleReadModel))
+        style_ids = db.execute(select(Style.id)).scalars().all()
+        if isinstance(db, Session):
+            db.info[REFRESHED_ROWS] = None
+    else:
+        style_ids = list(set(style_ids))
+        if isinstance(db, Session):
+            refreshed = db.info.get(REFRESHED_ROWS, {})
+            if refreshed is not None:
+                db.info[REFRESHED_ROWS] = refreshed
+
+    for start in range(0, len(style_ids), READ_MODEL_BATCH_SIZE):
+        batch = style_ids[start:start + READ_MODEL_BATCH_SIZE]
+        if not rebuild:
+            db.execute(delete(StyleReadModel).where(StyleReadModel.style_id.in_(batch)))
+        rows = _read_model_rows(db, batch)
+        if rows:
+            db.execute(insert(StyleReadModel).values(rows))
+        if refreshed is not None:
+            found = {row['style_id']: row for row in rows}
+            refreshed.update((style_id, found.get(style_id)) for style_id in batch)
+    return len(style_ids)
+
+
+def read_model_colors(row: StyleReadModel) -> List[str]:
+    """Color names of a read-model row."""
+    return [color['name'] for color in row.colors]
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database_models import ShowroomPlacement, StyleReadModel
+
+# Tables whose writes change lookup and search responses. Every ingest and
+# file delete rewrites style_read_model rows, so watching it covers them.
+WATCHED_TABLES = (StyleReadModel.__table__, ShowroomPlacement.__table__)
+
+_DATA_CHANGED = 'response_cache_data_changed'
+
+_version_lock = threading.Lock()
+_data_version = 0
+_changed_at = float('-inf')
+
+
+def data_version() -> int:
+    """Counter bumped after every committed write to a watched table in this process."""
+    return _data_version
+
+
+def changed_within(seconds: float) -> bool:
+    """Whether the data version was bumped in the last seconds."""
+    return time.monotonic() - _changed_at < seconds
+
+
+def bump_data_version():
+    global _data_version, _changed_at
+    with _version_lock:
+        _data_version += 1
+        _changed_at = time.monotonic()
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of endpoint responses with a time-to-live.
+
+    Entries remember the data version they were computed at and are dropped
+    on read once it has moved on, so a write invalidates everything cached
+    before it without scanning the cache.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires_at, value = entry
+                if version != _data_version:
+                    del self._entries[key]
+                    self.invalidations += 1
+                elif expires_at <= time.monotonic():
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, version: int):
+        """
+        Cache value for key, evicting the least recently used entries when full.
+
+        version is the data version read before computing the value, so a
+        write that lands meanwhile makes the entry stale straight away.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'data_version': _data_version
+            }
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement_writes(state):
+    """Note Core inserts, updates and deletes of watched tables (bulk ingest, read model refresh)."""
+    if (state.is_insert or state.is_update or state.is_delete) and state.statement.table in WATCHED_TABLES:
+        state.session.info[_DATA_CHANGED] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_writes(session, flush_context):
+    """Note ORM changes to watched tables (placements)."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, '__table__', None) in WATCHED_TABLES:
+            session.info[_DATA_CHANGED] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    if session.info.pop(_DATA_CHANGED, False):
+        bump_data_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop(_DATA_CHANGED, None)
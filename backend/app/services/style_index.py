@@ -0,0 +1,240 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.database_models import StyleReadModel
+from app.services.periodic import PeriodicJob
+from app.services.read_model import REFRESHED_ROWS
+from app.utils.style_keys import WIDTH_SUFFIXES, lookup_key, normalize_key
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 5000
+
+
+def style_record(row) -> Dict:
+    """
+    Lookup record for a style_read_model row (mapping or dict).
+
+    Color names, per-color details and the color key map are precomputed so
+    a lookup only does dictionary reads.
+    """
+    colors = row['colors']
+    color_keys = {}
+    for color in colors:
+        color_keys.setdefault(color['key'], color)
+    return {
+        'style_number': row['style_number'],
+        'division': row['division'],
+        'gender': row['gender'],
+        'outsole': row['outsole'],
+        'color_names': [color['name'] for color in colors],
+        'color_details': {color['name']: {'image_url': color['image_url']} for color in colors},
+        'color_keys': color_keys,
+        'source_files': row['source_files']
+    }
+
+
+def lookup_result(style_number: str, color: Optional[str], record: Optional[Dict], is_kids: bool) -> Dict:
+    """Build the lookup_style_color response for a scanned style and its record."""
+    if record is None:
+        return {
+            'status': 'drop',
+            'style_number': style_number,
+            'message': 'Style number not found in database',
+            'colors': [],
+            'is_kids': is_kids
+        }
+
+    result = {
+        'style_number': record['style_number'],
+        'division': record['division'],
+        'gender': record['gender'],
+        'outsole': record['outsole'],
+        'colors': record['color_names'],
+        'color_details': record['color_details'],
+        'source_files': record['source_files'],
+        'is_kids': is_kids
+    }
+
+    if color:
+        # Check if specific color exists
+        color_match = record['color_keys'].get(normalize_key(color))
+        if color_match:
+            result['status'] = 'keep'
+            result['message'] = 'Exact match found'
+            result['color'] = color
+            # Add image URL for the specific color
+            result['image_url'] = color_match['image_url']
+        else:
+            result['status'] = 'wait'
+            result['message'] = 'Style exists but color not found'
+    else:
+        result['status'] = 'keep'
+        result['message'] = 'Style found'
+    if is_kids:
+        result['message'] += ' (Kids shoe)'
+
+    return result
+
+
+def scan_keys(style_key: str):
+    """
+    Normalized scans that resolve to a stored style key, with their kids flag.
+
+    144083 → 144083, 144083W, 144083WW; 144083L → 144083L only. Width
+    variants are stored but never matched, since tags carry the base style.
+    """
+    for scanned in (style_key,) + tuple(style_key + suffix for suffix in WIDTH_SUFFIXES):
+        key, is_kids = lookup_key(scanned)
+        if key == style_key:
+            yield scanned, is_kids
+
+
+class StyleIndex:
+    """
+    In-memory map from normalized scanned style number to its lookup record.
+
+    Readers use the current dictionary without locking. A load builds a new
+    dictionary and swaps it in; committed changes are written into the live
+    one key by key, new records first and dropped keys last, so a lookup sees
+    a style's old or new record but never a gap in between. Records are
+    never modified once built. Until the first load completes, lookup()
+    returns None and callers query the database.
+    """
+
+    def __init__(self):
+        self._entries: Optional[Dict[str, tuple]] = None
+        self._keys: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._changes_during_load: Optional[Dict[int, Optional[Dict]]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, style_number: str, color: Optional[str] = None) -> Optional[Dict]:
+        """Same result as lookup_style_color, or None if the index is not loaded."""
+        entries = self._entries
+        if entries is None:
+            return None
+        entry = entries.get(normalize_key(style_number) or '')
+        if entry is None:
+            return lookup_result(style_number, color, None, lookup_key(style_number)[1])
+        record, is_kids = entry
+        return lookup_result(style_number, color, record, is_kids)
+
+    @staticmethod
+    def _add(entries: Dict, keys: Dict, row):
+        keys[row['style_id']] = row['style_key']
+        record = style_record(row)
+        for scanned, is_kids in scan_keys(row['style_key']):
+            entries[scanned] = (record, is_kids)
+
+    def load(self):
+        """Read the whole style read model and swap it in."""
+        started = time.perf_counter()
+        with self._lock:
+            self._changes_during_load = {}
+
+        entries, keys = {}, {}
+        try:
+            with engine.connect() as conn:
+                result = conn.execution_options(yield_per=LOAD_BATCH_SIZE).execute(select(StyleReadModel.__table__))
+                for row in result.mappings():
+                    self._add(entries, keys, row)
+        except Exception:
+            with self._lock:
+                self._changes_during_load = None
+            raise
+
+        with self._lock:
+            # Commits made while reading are applied on top of the snapshot
+            self._apply(entries, keys, self._changes_during_load)
+            self._changes_during_load = None
+            self._keys = keys
+            self._entries = entries
+        logger.info(f"🗂️ Style index loaded {len(keys)} styles in {time.perf_counter() - started:.2f}s")
+
+    def apply(self, rows: Dict[int, Optional[Dict]]):
+        """Replace the given styles (style_id -> read-model row, None when deleted) in the live index."""
+        with self._lock:
+            if self._changes_during_load is not None:
+                self._changes_during_load.update(rows)
+            if self._entries is None:
+                return
+            self._apply(self._entries, self._keys, rows)
+
+    def _apply(self, entries: Dict, keys: Dict, rows: Dict[int, Optional[Dict]]):
+        stale = set()
+        for style_id in rows:
+            style_key = keys.pop(style_id, None)
+            if style_key is not None:
+                stale.update(scanned for scanned, _ in scan_keys(style_key))
+        fresh = {}
+        for row in rows.values():
+            if row is not None:
+                self._add(fresh, keys, row)
+        # Overwrite first, then drop the keys no longer produced, so a key
+        # present before and after the change is never missing
+        entries.update(fresh)
+        for scanned in stale - fresh.keys():
+            entries.pop(scanned, None)
+
+
+style_index = StyleIndex()
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed_styles(session):
+    """Update the index with the read-model rows written by the committed transaction."""
+    if REFRESHED_ROWS not in session.info:
+        return
+    rows = session.info.pop(REFRESHED_ROWS)
+    try:
+        if rows is None:
+            if style_index.loaded:
+                style_index.load()
+        else:
+            style_index.apply(rows)
+    except Exception as e:
+        logger.exception(f"❌ Updating style index failed: {e}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_styles(session):
+    session.info.pop(REFRESHED_ROWS, None)
+
+
+_job: Optional[PeriodicJob] = None
+
+
+def start_style_index():
+    """
+    Warm the style index in the background and reload it every STYLE_INDEX_REFRESH_SECONDS.
+
+    The reload picks up writes made by other processes; writes in this process
+    are applied as they commit. STYLE_INDEX_REFRESH_SECONDS=0 loads only once.
+    """
+    global _job
+    if not settings.STYLE_INDEX_ENABLED or _job is not None:
+        return
+    _job = PeriodicJob('style-index', style_index.load, settings.STYLE_INDEX_REFRESH_SECONDS or None)
+    _job.start()
+
+
+def stop_style_index():
+    """Stop reloading the style index."""
+    global _job
+    if _job is not None:
+        _job.stop()
+        _job = None
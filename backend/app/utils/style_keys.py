@@ -0,0 +1,44 @@
+import re
+from typing import Optional, Tuple
+
+# Kids shoes end in L or N; wide widths end in W or WW. A suffix only counts
+# when it follows the numeric part, so codes like "SN" are left alone.
+KIDS_SUFFIXES = ('L', 'N')
+WIDTH_SUFFIXES = ('WW', 'W')
+
+_SUFFIX_PATTERN = re.compile(r'^(.*\d)(WW|W|L|N)$')
+
+
+def normalize_key(value: Optional[str]) -> Optional[str]:
+    """Return the case-insensitive key for a style number or color name."""
+    if value is None:
+        return None
+    return value.strip().upper()
+
+
+def split_style_key(style_key: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a normalized style key into its base and kids/width suffix.
+
+    144083WW → ('144083', 'WW'), 144083L → ('144083', 'L'), 144083 → ('144083', None)
+    """
+    match = _SUFFIX_PATTERN.match(style_key)
+    if not match:
+        return style_key, None
+    return match.group(1), match.group(2)
+
+
+def lookup_key(style_number: str) -> Tuple[str, bool]:
+    """
+    Return the style key to look up for a scanned style number, and whether it is a kids shoe.
+
+    Kids shoes are looked up exactly; width suffixes are stripped, since tags
+    carry the base style.
+    """
+    key = normalize_key(style_number) or ''
+    base, suffix = split_style_key(key)
+    if suffix in KIDS_SUFFIXES:
+        return key, True
+    if suffix in WIDTH_SUFFIXES:
+        return base, False
+    return key, False
@@ -4,29 +4,56 @@ Skechers Inventory FastAPI Server
 Enhanced with OCR, WebSocket, and activity logging
 """
 
+import asyncio
+import hashlib
 import time
 import logging
 import tempfile
-import os
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, Query, File, Form, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, Query, File, Form, Request, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pynput.keyboard import Controller, Key
-import pyautogui
 import pytesseract
 from PIL import Image
 import io
-
-from app.services.excel_parser_enhanced import (
-    parse_excel_ki,
-    parse_excel_allbought,
-    parse_xlsb_file
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ingestion_service import (
+    detect_category,
+    get_parse_pool,
+    merge_parsed_files,
+    parse_items_file,
+    run_ingestion,
+    shutdown_parse_pool,
+    start_ingestion,
+    start_ingestion_resume,
+    stop_ingestion_resume
 )
+from app.services.hot_folder import start_hot_folder, stop_hot_folder
+from app.services.pdf_parser import shutdown_ocr_pool, shutdown_scan_pool
+from app.services.log_retention import start_log_retention, stop_log_retention
+from app.services.archival import start_archival, stop_archival
+from app.services.analytics import start_analytics_export, stop_analytics_export
+from app.services.style_index import start_style_index, stop_style_index
+from app.services.audit_writer import stop_audit_writer
 from app.core.database import SessionLocal, init_db
-from app.services.database_service import save_excel_data, log_audit_action
+from app.core.async_database import (
+    close_async_db,
+    get_admin_db,
+    get_admin_read_db,
+    get_lookup_db,
+    get_lookup_read_db,
+    get_sync_db,
+    get_sync_read_db,
+    is_replica
+)
+from app.core.replica import track_device_writes
+from app.core.query_metrics import endpoint_query_stats, track_queries
+from app.services.database_service import save_batch_data, log_audit_action
 from app.models.database_models import File as FileModel
 from app.core.config import settings
 
@@ -103,14 +130,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.middleware("http")(track_device_writes)
+
+
+@app.middleware("http")
+async def count_request_queries(request: Request, call_next):
+    """Count SQL statements and database time per request, per endpoint and in response headers"""
+    with track_queries() as queries:
+        response = await call_next(request)
+    route = request.scope.get('route')
+    if route is not None:
+        endpoint_query_stats.record(f"{request.method} {route.path}", queries)
+    response.headers['X-DB-Statements'] = str(queries.statements)
+    response.headers['X-DB-Time-Ms'] = f"{queries.db_time * 1000:.2f}"
+    return response
+
 try:
     app.mount("/uploads/shoe_images", StaticFiles(directory=str(IMAGES_DIR)), name="shoe_images")
     logger.info("✅ Static image serving enabled at /uploads/shoe_images")
 except Exception as e:
     logger.warning(f"⚠️  Could not mount static files: {e}")
 
-# Keyboard controller for OCR
-keyboard = Controller()
+# Keyboard controller and screen capture for OCR. Both need a desktop session;
+# without one (e.g. headless servers and tests) the API runs without them.
+try:
+    from pynput.keyboard import Controller, Key
+    import pyautogui
+    keyboard = Controller()
+    GUI_ERROR = None
+except Exception as e:  # ImportError, or the X display errors raised on import
+    Key = pyautogui = keyboard = None
+    GUI_ERROR = f"Keyboard typing and screen capture are unavailable: {e}"
+    logger.warning(f"⚠️  {GUI_ERROR}")
 
 # OCR screenshot region (configurable)
 SCREENSHOT_REGION = {
@@ -123,6 +174,8 @@ SCREENSHOT_REGION = {
 def type_code(code: str) -> Dict[str, Any]:
     """Type code into focused field using system keyboard"""
     try:
+        if keyboard is None:
+            raise RuntimeError(GUI_ERROR)
         logger.info(f"🎹 Typing code: {code}")
         time.sleep(0.1)
         
@@ -147,6 +200,8 @@ def type_code(code: str) -> Dict[str, Any]:
 def press_tab() -> Dict[str, Any]:
     """Press Tab key to move to next field"""
     try:
+        if keyboard is None:
+            raise RuntimeError(GUI_ERROR)
         logger.info("⇥ Pressing Tab key")
         keyboard.press(Key.tab)
         time.sleep(0.05)
@@ -160,6 +215,8 @@ def press_tab() -> Dict[str, Any]:
 def capture_and_ocr() -> Dict[str, Any]:
     """Capture screenshot and read text with OCR"""
     try:
+        if pyautogui is None:
+            raise RuntimeError(GUI_ERROR)
         logger.info("📸 Capturing screenshot for OCR")
         
         screenshot = pyautogui.screenshot(region=(
@@ -209,6 +266,33 @@ def capture_and_ocr() -> Dict[str, Any]:
         }
 
 
+@app.on_event("startup")
+async def startup():
+    """Start resuming interrupted ingestions, warm the style index and start the hot folder watcher and maintenance jobs"""
+    start_ingestion_resume()
+    start_style_index()
+    start_hot_folder()
+    start_log_retention()
+    start_archival()
+    start_analytics_export()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background ingestion workers, flush audit events and close database connections"""
+    stop_ingestion_resume()
+    stop_hot_folder()
+    stop_log_retention()
+    stop_archival()
+    stop_analytics_export()
+    stop_style_index()
+    stop_audit_writer()
+    shutdown_parse_pool()
+    shutdown_scan_pool()
+    shutdown_ocr_pool()
+    await close_async_db()
+
+
 @app.get("/")
 @app.get("/health")
 async def root():
@@ -231,13 +315,10 @@ async def root():
 
 
 @app.get("/api/health")
-async def api_health():
+async def api_health(db: AsyncSession = Depends(get_admin_db)):
     """API health check"""
     try:
-        from app.core.database import SessionLocal
-        db = SessionLocal()
-        db.execute('SELECT 1')
-        db.close()
+        await db.execute(text('SELECT 1'))
         database_status = 'healthy'
     except Exception as e:
         logger.error(f"Database health check failed: {str(e)}")
@@ -249,6 +330,67 @@ async def api_health():
     }
 
 
+def _ingest_upload(tmp_path: Path, filename: str, file_type: str, category: str, content_hash: str) -> Dict[str, Any]:
+    """Parse an uploaded file and save it in committed chunks; runs in a worker thread."""
+    try:
+        items = parse_items_file(str(tmp_path), category)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    db = SessionLocal()
+    try:
+        file_record = FileModel(
+            filename=filename,
+            original_filename=filename,
+            file_type=file_type,
+            category=category,
+            status='processing',
+            content_hash=content_hash
+        )
+        db.add(file_record)
+        db.commit()
+        db.refresh(file_record)
+        file_id = file_record.id
+
+        # Save in committed chunks; an interrupted upload resumes on restart
+        try:
+            checkpoint = start_ingestion(db, file_id, items)
+            save_stats = run_ingestion(db, checkpoint, items)
+        except Exception:
+            db.rollback()
+            file_record.status = 'failed'
+            db.commit()
+            raise
+
+        log_audit_action(
+            'file_uploaded',
+            affected_resources=f"File ID: {file_id}",
+            ip_address="127.0.0.1",
+            details=f"File uploaded: {filename}"
+        )
+
+        logger.info(f"✅ Saved {len(items)} items to database")
+
+        # Response in the format expected by the iOS app
+        return {
+            "file_id": file_id,
+            "filename": filename,
+            "file_type": file_type,
+            "category": category,
+            "parsing_summary": {
+                "total_rows_processed": len(items),
+                "total_styles_found": save_stats.get('styles_created', 0) + save_stats.get('styles_updated', 0),
+                "total_colors_found": save_stats.get('colors_created', 0),
+                "styles_created": save_stats.get('styles_created', 0),
+                "styles_updated": save_stats.get('styles_updated', 0),
+                "colors_created": save_stats.get('colors_created', 0)
+            },
+            "warnings": []
+        }
+    finally:
+        db.close()
+
+
 @app.post("/api/files/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -272,12 +414,7 @@ async def upload_file(
 
         # Use provided category or detect from filename
         if not category:
-            if 'ki' in filename_lower or 'key' in filename_lower:
-                category = 'key_initiative'
-            elif 'bought' in filename_lower or 'all' in filename_lower:
-                category = 'all_bought'
-            else:
-                category = 'all_bought'  # Default to all_bought
+            category = detect_category(file.filename)
 
         # Use provided file_type or set based on extension
         if not file_type:
@@ -289,88 +426,12 @@ async def upload_file(
             content = await file.read()
             tmp.write(content)
             tmp_path = Path(tmp.name)
+        content_hash = hashlib.sha256(content).hexdigest()
         
-        # Parse based on file type
-        if is_xlsb:
-            logger.info("📊 Parsing as XLSB (binary Excel)")
-            items = parse_xlsb_file(tmp_path)
-        elif category == 'all_bought':
-            logger.info("📊 Parsing as All Bought XLSX")
-            items = parse_excel_allbought(tmp_path)
-        else:
-            logger.info("📊 Parsing as KI XLSX with image extraction")
-            items = parse_excel_ki(tmp_path)
-        
-        tmp_path.unlink()
-        
-        db = SessionLocal()
-        try:
-            file_record = FileModel(
-                filename=file.filename,
-                original_filename=file.filename,
-                file_type=file_type,
-                category=category,
-                status='processing'
-            )
-            db.add(file_record)
-            db.commit()
-            db.refresh(file_record)
-            file_id = file_record.id
-            
-            # Convert items to format expected by save_excel_data
-            extracted_data = []
-            for item in items:
-                style_data = {
-                    'style_number': item['style'],
-                    'division': item.get('division'),
-                    'gender': None,
-                    'outsole': item.get('outsole'),
-                    'colors': [{
-                        'color_name': item['color'],
-                        'image_url': item.get('image')
-                    }],
-                    'width_variants': []
-                }
-                extracted_data.append(style_data)
-            
-            save_stats = save_excel_data(db, file_id, extracted_data)
-            
-            from datetime import datetime
-            file_record.parsed_at = datetime.utcnow()
-            file_record.row_count = len(items)
-            file_record.status = 'success'
-            db.commit()
-            
-            log_audit_action(
-                db,
-                'file_uploaded',
-                affected_resources=f"File ID: {file_id}",
-                ip_address="127.0.0.1",
-                details=f"File uploaded: {file.filename}"
-            )
-            
-            logger.info(f"✅ Saved {len(items)} items to database")
-
-            # Return response in format expected by iOS app
-            return JSONResponse(content={
-                "file_id": file_id,
-                "filename": file.filename,
-                "file_type": file_type,
-                "category": category,
-                "parsing_summary": {
-                    "total_rows_processed": len(items),
-                    "total_styles_found": save_stats.get('styles_created', 0) + save_stats.get('styles_updated', 0),
-                    "total_colors_found": save_stats.get('colors_created', 0),
-                    "styles_created": save_stats.get('styles_created', 0),
-                    "styles_updated": save_stats.get('styles_updated', 0),
-                    "colors_created": save_stats.get('colors_created', 0)
-                },
-                "warnings": [],
-                "extracted_data": extracted_data
-            })
-            
-        finally:
-            db.close()
+        # Parsing and the chunked save block, so they run in a worker thread
+        return JSONResponse(content=await run_in_threadpool(
+            _ingest_upload, tmp_path, file.filename, file_type, category, content_hash
+        ))
     
     except Exception as e:
         import traceback
@@ -380,47 +441,159 @@ async def upload_file(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.delete("/api/files/{file_id}")
-async def delete_file(file_id: int):
-    """Delete a file and all associated data"""
-    logger.info(f"🗑️ Delete request for file ID: {file_id}")
-
+def _create_file_records(uploads: List[Dict[str, Any]]) -> List[int]:
+    """Create 'processing' file records for a batch upload; runs in a worker thread."""
     db = SessionLocal()
     try:
-        # Get the file record
-        file_record = db.query(FileModel).filter(FileModel.id == file_id).first()
-        if not file_record:
-            raise HTTPException(status_code=404, detail="File not found")
+        file_records = []
+        for upload in uploads:
+            file_record = FileModel(
+                filename=upload['filename'],
+                original_filename=upload['filename'],
+                file_type=upload['file_type'],
+                category=upload['category'],
+                status='processing',
+                content_hash=upload['content_hash']
+            )
+            db.add(file_record)
+            file_records.append(file_record)
+        db.commit()
+        return [f.id for f in file_records]
+    finally:
+        db.close()
 
-        # Delete associated styles and colors
-        styles_deleted = db.execute(
-            text("DELETE FROM styles WHERE source_file_ids LIKE :pattern"),
-            {"pattern": f"%{file_id}%"}
-        ).rowcount
 
-        # Colors are deleted via cascade
+def _save_batch_upload(file_ids: List[int], uploads: List[Dict[str, Any]], results: List[Any]) -> Dict[str, Any]:
+    """Merge parsed batch files and save them with the file statuses; runs in a worker thread."""
+    db = SessionLocal()
+    try:
+        records_by_id = {f.id: f for f in db.query(FileModel).filter(FileModel.id.in_(file_ids)).all()}
+        file_records = [records_by_id[file_id] for file_id in file_ids]
+
+        parsed_files = []
+        errors = {}
+        for file_record, upload, result in zip(file_records, uploads, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Parse error in {upload['filename']}: {result}")
+                file_record.status = 'failed'
+                errors[file_record.id] = str(result)
+            else:
+                parsed_files.append((file_record.id, result))
+
+        merged_data, summaries = merge_parsed_files(parsed_files)
+
+        now = datetime.utcnow()
+        for file_record in file_records:
+            if file_record.id in summaries:
+                file_record.parsed_at = now
+                file_record.row_count = summaries[file_record.id]['total_rows_processed']
+                file_record.status = 'success'
+
+        # Styles and file statuses are committed together
+        save_stats = save_batch_data(db, merged_data)
+
+        file_summaries = []
+        for file_record in file_records:
+            file_summaries.append({
+                'file_id': file_record.id,
+                'filename': file_record.original_filename,
+                'file_type': file_record.file_type,
+                'category': file_record.category,
+                'status': file_record.status,
+                'parsing_summary': summaries.get(file_record.id),
+                'error': errors.get(file_record.id)
+            })
 
-        # Delete the file record
-        db.delete(file_record)
-        db.commit()
+        log_audit_action(
+            'files_uploaded',
+            affected_resources=f"File IDs: {file_ids}",
+            ip_address="127.0.0.1",
+            details=f"Batch upload: {len(parsed_files)} parsed, {len(errors)} failed"
+        )
 
-        logger.info(f"✅ Deleted file {file_id} and {styles_deleted} associated styles")
+        logger.info(f"✅ Batch saved: {len(parsed_files)} files, {len(merged_data)} styles")
 
         return {
-            "success": True,
-            "file_id": file_id,
-            "styles_deleted": styles_deleted,
-            "message": "File and associated data deleted successfully"
+            'files': file_summaries,
+            'files_processed': len(parsed_files),
+            'files_failed': len(errors),
+            'total_styles_found': len(merged_data),
+            'styles_created': save_stats['styles_created'],
+            'styles_updated': save_stats['styles_updated'],
+            'colors_created': save_stats['colors_created']
         }
-
-    except HTTPException:
+    except Exception:
+        db.rollback()
+        # The file records were committed before parsing; don't leave them 'processing'
+        try:
+            db.query(FileModel).filter(FileModel.id.in_(file_ids)).update(
+                {'status': 'failed'}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Could not mark batch files {file_ids} as failed: {e}")
         raise
+    finally:
+        db.close()
+
+
+@app.post("/api/files/upload/batch")
+async def upload_files_batch(
+    files: List[UploadFile] = File(...),
+    category: Optional[str] = Form(None)
+):
+    """Upload several Excel files, parse them concurrently and save them in one transaction"""
+    logger.info(f"📥 Received batch of {len(files)} files, category: {category}")
+
+    uploads = []
+    for upload in files:
+        filename_lower = upload.filename.lower()
+        is_xlsb = filename_lower.endswith('.xlsb')
+        is_xlsx = filename_lower.endswith('.xlsx') or filename_lower.endswith('.xls')
+
+        if not (is_xlsb or is_xlsx):
+            for pending in uploads:
+                pending['tmp_path'].unlink(missing_ok=True)
+            return JSONResponse(
+                status_code=400,
+                content={'error': f'Invalid file type for {upload.filename}. Only XLSX and XLSB files are supported.'}
+            )
+
+        suffix = '.xlsb' if is_xlsb else '.xlsx'
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            content = await upload.read()
+            tmp.write(content)
+            tmp_path = Path(tmp.name)
+
+        uploads.append({
+            'filename': upload.filename,
+            'file_type': 'xlsb' if is_xlsb else 'xlsx',
+            'category': category or detect_category(upload.filename),
+            'tmp_path': tmp_path,
+            'content_hash': hashlib.sha256(content).hexdigest()
+        })
+
+    try:
+        file_ids = await run_in_threadpool(_create_file_records, uploads)
+
+        # Parse all files concurrently across worker processes
+        loop = asyncio.get_running_loop()
+        pool = get_parse_pool()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(pool, parse_items_file, str(upload['tmp_path']), upload['category'])
+            for upload in uploads
+        ], return_exceptions=True)
+
+        # The merge and the single-transaction save block, so they run in a worker thread
+        return JSONResponse(content=await run_in_threadpool(_save_batch_upload, file_ids, uploads, results))
+
     except Exception as e:
-        db.rollback()
-        logger.error(f"❌ Delete error: {e}")
+        logger.exception(f"Error in batch upload: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        db.close()
+        for upload in uploads:
+            upload['tmp_path'].unlink(missing_ok=True)
 
 
 @app.get("/api/lookup")
@@ -584,14 +757,17 @@ async def get_connected_devices():
 # WAREHOUSE ROUTES (from warehouse_routes.py)
 # ============================================================================
 
-from app.models.database_models import WarehouseClassification, ShowroomPlacement
+from app.models.database_models import (
+    ArchivedClassification, ArchivedPlacement, WarehouseClassification, ShowroomPlacement
+)
+from app.services.archival import with_archive
 from app.services.database_service import (
     get_pending_classifications, approve_classification, create_placement
 )
-from datetime import datetime
+from datetime import datetime, timedelta
 
 @app.post("/api/warehouse/classify")
-async def classify_item(data: dict):
+async def classify_item(data: dict, db: AsyncSession = Depends(get_lookup_db)):
     """Create a new warehouse classification."""
     if not data.get('style_number') or not data.get('color') or not data.get('status'):
         raise HTTPException(status_code=400, detail='style_number, color, and status are required')
@@ -599,7 +775,6 @@ async def classify_item(data: dict):
     if data['status'] not in ['keep', 'wait', 'drop']:
         raise HTTPException(status_code=400, detail='status must be keep, wait, or drop')
 
-    db = SessionLocal()
     try:
         classification = WarehouseClassification(
             style_number=data['style_number'],
@@ -612,8 +787,7 @@ async def classify_item(data: dict):
         )
 
         db.add(classification)
-        db.commit()
-        db.refresh(classification)
+        await db.commit()
 
         return JSONResponse(content={
             'classification_id': classification.id,
@@ -626,34 +800,86 @@ async def classify_item(data: dict):
     except Exception as e:
         logger.exception(f"Error creating classification: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 @app.get("/api/warehouse/pending")
-async def get_pending(limit: int = Query(100, description="Number of items to return")):
+async def get_pending(
+    limit: int = Query(100, description="Number of items to return"),
+    db: AsyncSession = Depends(get_lookup_db)
+):
     """Get pending classifications for manager approval."""
-    db = SessionLocal()
     try:
-        pending = get_pending_classifications(db, limit)
+        pending = await db.run_sync(get_pending_classifications, limit)
         return JSONResponse(content={'pending_classifications': pending})
     except Exception as e:
         logger.exception(f"Error getting pending classifications: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
+
+
+@app.get("/api/warehouse/classifications")
+async def get_classifications(
+    style_number: Optional[str] = Query(None),
+    include_archived: bool = Query(False, description="Also return archived classifications"),
+    page: int = Query(1),
+    limit: int = Query(50),
+    db: AsyncSession = Depends(get_lookup_db)
+):
+    """Get decided classifications, newest decision first."""
+    try:
+        if include_archived:
+            classifications = with_archive(WarehouseClassification, ArchivedClassification)
+        else:
+            classifications = WarehouseClassification.__table__
+        query = select(classifications).where(classifications.c.manager_approved == True)
+
+        if style_number:
+            query = query.where(classifications.c.style_number.ilike(f"%{style_number}%"))
+
+        total_count = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+        offset = (page - 1) * limit
+        rows = (await db.execute(
+            query.order_by(classifications.c.approval_timestamp.desc()).offset(offset).limit(limit)
+        )).all()
+
+        results = []
+        for c in rows:
+            classification = {
+                'classification_id': c.id,
+                'style_number': c.style_number,
+                'color': c.color,
+                'coordinator_assigned_status': c.status,
+                'coordinator_name': c.coordinator_name,
+                'final_status': c.final_status,
+                'submission_timestamp': c.submission_timestamp.isoformat(),
+                'approval_timestamp': c.approval_timestamp.isoformat() if c.approval_timestamp else None,
+                'notes': c.notes
+            }
+            if include_archived:
+                classification['archived'] = bool(c.archived)
+            results.append(classification)
+
+        return JSONResponse(content={
+            'classifications': results,
+            'total_count': total_count,
+            'page': page,
+            'limit': limit
+        })
+
+    except Exception as e:
+        logger.exception(f"Error getting classifications: {str(e)}")
+        raise HTTPException(status_code=500, detail='Internal server error')
 
 
 @app.post("/api/warehouse/approve")
-async def approve(data: dict):
+async def approve(data: dict, db: AsyncSession = Depends(get_lookup_db)):
     """Approve or reject a classification."""
     if not data.get('classification_id') or 'approved' not in data:
         raise HTTPException(status_code=400, detail='classification_id and approved are required')
 
-    db = SessionLocal()
     try:
-        result = approve_classification(
-            db,
+        result = await db.run_sync(
+            approve_classification,
             data['classification_id'],
             data['approved'],
             data.get('manager_user_id'),
@@ -670,20 +896,17 @@ async def approve(data: dict):
     except Exception as e:
         logger.exception(f"Error approving classification: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 @app.post("/api/warehouse/placement")
-async def create_placement_route(data: dict):
+async def create_placement_route(data: dict, db: AsyncSession = Depends(get_lookup_db)):
     """Create a showroom placement for an approved item."""
     if not data.get('classification_id') or not data.get('shelf_location'):
         raise HTTPException(status_code=400, detail='classification_id and shelf_location are required')
 
-    db = SessionLocal()
     try:
-        result = create_placement(
-            db,
+        result = await db.run_sync(
+            create_placement,
             data['classification_id'],
             data['shelf_location'],
             data.get('coordinator_user_id')
@@ -699,41 +922,55 @@ async def create_placement_route(data: dict):
     except Exception as e:
         logger.exception(f"Error creating placement: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 @app.get("/api/warehouse/placements")
 async def get_placements(
     style_number: Optional[str] = Query(None),
     shelf_location: Optional[str] = Query(None),
+    include_archived: bool = Query(False, description="Also return inactive and archived placements"),
     page: int = Query(1),
-    limit: int = Query(50)
+    limit: int = Query(50),
+    db: AsyncSession = Depends(get_lookup_db)
 ):
     """Get all showroom placements with optional filters."""
-    db = SessionLocal()
     try:
-        query = db.query(ShowroomPlacement).filter(ShowroomPlacement.is_active == True)
+        if include_archived:
+            placements_table = with_archive(ShowroomPlacement, ArchivedPlacement)
+            query = select(placements_table)
+        else:
+            placements_table = ShowroomPlacement.__table__
+            query = select(placements_table).where(placements_table.c.is_active == True)
 
         if style_number:
-            query = query.filter(ShowroomPlacement.style_number.ilike(f"%{style_number}%"))
+            query = query.where(placements_table.c.style_number.ilike(f"%{style_number}%"))
 
         if shelf_location:
-            query = query.filter(ShowroomPlacement.shelf_location == shelf_location)
+            query = query.where(placements_table.c.shelf_location == shelf_location)
 
-        total_count = query.count()
+        total_count = await db.scalar(select(func.count()).select_from(query.subquery()))
 
         offset = (page - 1) * limit
-        placements = query.order_by(ShowroomPlacement.placement_timestamp.desc()).offset(offset).limit(limit).all()
+        placements = (await db.execute(
+            query.order_by(placements_table.c.placement_timestamp.desc()).offset(offset).limit(limit)
+        )).all()
 
-        return JSONResponse(content={
-            'placements': [{
+        results = []
+        for p in placements:
+            placement = {
                 'id': p.id,
                 'style_number': p.style_number,
                 'color': p.color,
                 'shelf_location': p.shelf_location,
                 'placement_timestamp': p.placement_timestamp.isoformat()
-            } for p in placements],
+            }
+            if include_archived:
+                placement['is_active'] = bool(p.is_active)
+                placement['archived'] = bool(p.archived)
+            results.append(placement)
+
+        return JSONResponse(content={
+            'placements': results,
             'total_count': total_count,
             'page': page,
             'limit': limit
@@ -742,24 +979,25 @@ async def get_placements(
     except Exception as e:
         logger.exception(f"Error getting placements: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 # ============================================================================
 # SYNC ROUTES (from sync_routes.py)
 # ============================================================================
 
-from app.models.database_models import Style, Color, SyncLog
-import json
+from app.models.database_models import StyleReadModel, SyncLog
+from app.services.read_model import read_model_colors
 
 @app.get("/api/sync/")
-async def full_sync(device_id: str = Query("unknown")):
+async def full_sync(
+    device_id: str = Query("unknown"),
+    read_db: AsyncSession = Depends(get_sync_read_db),
+    db: AsyncSession = Depends(get_sync_db)
+):
     """Get complete data snapshot for offline sync."""
-    db = SessionLocal()
     try:
         # Get all active files
-        files = db.query(FileModel).filter(FileModel.is_active == True).all()
+        files = (await read_db.scalars(select(FileModel).where(FileModel.is_active == True))).all()
         files_data = [{
             'id': f.id,
             'filename': f.original_filename,
@@ -768,24 +1006,25 @@ async def full_sync(device_id: str = Query("unknown")):
             'upload_date': f.upload_date.isoformat()
         } for f in files]
 
-        # Get all styles with colors
-        styles = db.query(Style).all()
+        # Get all styles with colors and sources from the read model
+        styles = (await read_db.scalars(select(StyleReadModel))).all()
         styles_data = []
         for style in styles:
-            colors = db.query(Color).filter(Color.style_id == style.id).all()
             styles_data.append({
-                'id': style.id,
+                'id': style.style_id,
                 'style_number': style.style_number,
                 'division': style.division,
                 'gender': style.gender,
                 'outsole': style.outsole,
-                'source_file_ids': json.loads(style.source_file_ids or '[]'),
-                'colors': [c.color_name for c in colors],
-                'updated_at': style.updated_at.isoformat() if style.updated_at else style.created_at.isoformat()
+                'source_file_ids': [source['id'] for source in style.source_files],
+                'colors': read_model_colors(style),
+                'updated_at': style.updated_at.isoformat()
             })
 
         # Get all active placements
-        placements = db.query(ShowroomPlacement).filter(ShowroomPlacement.is_active == True).all()
+        placements = (await read_db.scalars(
+            select(ShowroomPlacement).where(ShowroomPlacement.is_active == True)
+        )).all()
         placements_data = [{
             'id': p.id,
             'style_number': p.style_number,
@@ -802,7 +1041,7 @@ async def full_sync(device_id: str = Query("unknown")):
             records_synced=len(styles_data) + len(placements_data)
         )
         db.add(sync_log)
-        db.commit()
+        await db.commit()
 
         return JSONResponse(content={
             'files': files_data,
@@ -818,14 +1057,14 @@ async def full_sync(device_id: str = Query("unknown")):
     except Exception as e:
         logger.exception(f"Error in full sync: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 @app.get("/api/sync/changes")
 async def incremental_sync(
     since: str = Query(..., description="ISO timestamp of last sync"),
-    device_id: str = Query("unknown")
+    device_id: str = Query("unknown"),
+    read_db: AsyncSession = Depends(get_sync_read_db),
+    db: AsyncSession = Depends(get_sync_db)
 ):
     """Get incremental changes since last sync."""
     try:
@@ -833,31 +1072,29 @@ async def incremental_sync(
     except ValueError:
         raise HTTPException(status_code=400, detail='Invalid since parameter format')
 
-    db = SessionLocal()
     try:
         # Get styles updated since timestamp
-        updated_styles = db.query(Style).filter(
-            Style.updated_at > since_datetime
-        ).all()
+        updated_styles = (await read_db.scalars(
+            select(StyleReadModel).where(StyleReadModel.updated_at > since_datetime)
+        )).all()
 
         styles_data = []
         for style in updated_styles:
-            colors = db.query(Color).filter(Color.style_id == style.id).all()
             styles_data.append({
-                'id': style.id,
+                'id': style.style_id,
                 'style_number': style.style_number,
                 'division': style.division,
                 'gender': style.gender,
                 'outsole': style.outsole,
-                'colors': [c.color_name for c in colors],
-                'updated_at': style.updated_at.isoformat() if style.updated_at else style.created_at.isoformat(),
+                'colors': read_model_colors(style),
+                'updated_at': style.updated_at.isoformat(),
                 'change_type': 'updated'
             })
 
         # Get recent placements
-        recent_placements = db.query(ShowroomPlacement).filter(
-            ShowroomPlacement.placement_timestamp > since_datetime
-        ).all()
+        recent_placements = (await read_db.scalars(
+            select(ShowroomPlacement).where(ShowroomPlacement.placement_timestamp > since_datetime)
+        )).all()
 
         placements_data = [{
             'id': p.id,
@@ -876,7 +1113,7 @@ async def incremental_sync(
             records_synced=len(styles_data) + len(placements_data)
         )
         db.add(sync_log)
-        db.commit()
+        await db.commit()
 
         return JSONResponse(content={
             'styles': styles_data,
@@ -890,29 +1127,84 @@ async def incremental_sync(
     except Exception as e:
         logger.exception(f"Error in incremental sync: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 # ============================================================================
 # LOOKUP ROUTES (from lookup_routes.py)
 # ============================================================================
 
-from app.services.database_service import lookup_style_color
-from sqlalchemy import func, or_, text
+from app.services.database_service import find_style_record, lookup_style_colors
+from app.services.style_index import lookup_result, style_index
+from app.services.response_cache import changed_within, data_version, response_cache
+from app.utils.style_keys import lookup_key
+from sqlalchemy import or_
+
+
+def _cacheable_read(db: AsyncSession) -> bool:
+    """
+    Whether a result read through db may be cached under the current data version.
+
+    The version moves when the primary commits, so a replica read is only
+    cached once the replica has had READ_YOUR_WRITES_SECONDS to replay the
+    latest write; otherwise pre-write rows would be cached as current.
+    """
+    return not is_replica(db) or not changed_within(settings.READ_YOUR_WRITES_SECONDS)
+
 
 @app.get("/api/lookup/")
-async def lookup(style: str = Query(...), color: Optional[str] = Query(None)):
-    """Lookup style and color in database."""
-    db = SessionLocal()
+async def lookup(
+    style: str = Query(...),
+    color: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_lookup_read_db)
+):
+    """Lookup style and color, from the in-memory style index once it is loaded, else the response cache."""
     try:
-        result = lookup_style_color(db, style, color)
+        result = style_index.lookup(style, color)
+        if result is None:
+            # The style's record is cached under the normalized key the scan
+            # resolves to; the response echoing the scanned style and color
+            # is built per request
+            key = ('lookup', *lookup_key(style))
+            entry = response_cache.get(key)
+            if entry is None:
+                version, cacheable = data_version(), _cacheable_read(db)
+                entry = await db.run_sync(find_style_record, style)
+                if cacheable:
+                    response_cache.put(key, entry, version)
+            record, is_kids = entry
+            result = lookup_result(style, color, record, is_kids)
         return JSONResponse(content=result)
     except Exception as e:
         logger.exception(f"Error in lookup: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
+
+
+# Largest scan burst accepted by /api/lookup/batch; keeps the IN list bounded
+LOOKUP_BATCH_MAX_ITEMS = 500
+
+@app.post("/api/lookup/batch")
+async def lookup_batch(data: dict, db: AsyncSession = Depends(get_lookup_read_db)):
+    """
+    Lookup many style/color pairs in one request.
+
+    Body: {"items": [{"style": "144083", "color": "BBK"}, ...]}. Returns one
+    lookup result per item, in order, using at most one database query.
+    """
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail='items must be a non-empty list')
+    if len(items) > LOOKUP_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f'At most {LOOKUP_BATCH_MAX_ITEMS} items per batch')
+    if not all(isinstance(item, dict) and isinstance(item.get('style'), str) and item['style'] for item in items):
+        raise HTTPException(status_code=400, detail='Each item requires a style')
+
+    try:
+        pairs = [(item['style'], item.get('color')) for item in items]
+        results = await db.run_sync(lookup_style_colors, pairs)
+        return JSONResponse(content={'results': results, 'count': len(results)})
+    except Exception as e:
+        logger.exception(f"Error in batch lookup: {str(e)}")
+        raise HTTPException(status_code=500, detail='Internal server error')
 
 
 @app.get("/api/lookup/search")
@@ -922,65 +1214,72 @@ async def search(
     division_filter: Optional[str] = Query(None, alias="division"),
     gender_filter: Optional[str] = Query(None, alias="gender"),
     page: int = Query(1),
-    limit: int = Query(50)
+    limit: int = Query(50),
+    db: AsyncSession = Depends(get_lookup_read_db)
 ):
     """Search styles by query string."""
     if not q and not status_filter and not division_filter and not gender_filter:
         raise HTTPException(status_code=400, detail='At least one search parameter required')
 
-    db = SessionLocal()
+    # Matching is case-insensitive, so the query string is cached lowercased
+    key = ('search', q.lower(), status_filter, division_filter, gender_filter, page, limit)
     try:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return JSONResponse(content=cached)
+        version, cacheable = data_version(), _cacheable_read(db)
+
         # Build query
-        styles_query = db.query(Style)
+        styles_query = select(StyleReadModel)
 
         if q:
             # Search in style number, division
             search_pattern = f"%{q}%"
-            styles_query = styles_query.filter(
+            styles_query = styles_query.where(
                 or_(
-                    Style.style_number.ilike(search_pattern),
-                    Style.division.ilike(search_pattern)
+                    StyleReadModel.style_number.ilike(search_pattern),
+                    StyleReadModel.division.ilike(search_pattern)
                 )
             )
 
         if division_filter:
-            styles_query = styles_query.filter(Style.division == division_filter)
+            styles_query = styles_query.where(StyleReadModel.division == division_filter)
 
         if gender_filter:
-            styles_query = styles_query.filter(Style.gender == gender_filter)
+            styles_query = styles_query.where(StyleReadModel.gender == gender_filter)
 
         # Get total count
-        total_count = styles_query.count()
+        total_count = await db.scalar(select(func.count()).select_from(styles_query.subquery()))
 
         # Paginate
         offset = (page - 1) * limit
-        styles = styles_query.offset(offset).limit(limit).all()
+        styles = (await db.scalars(styles_query.offset(offset).limit(limit))).all()
 
         # Format results
         results = []
         for style in styles:
-            colors = db.query(Color).filter(Color.style_id == style.id).all()
             results.append({
                 'style_number': style.style_number,
                 'division': style.division,
                 'gender': style.gender,
                 'outsole': style.outsole,
-                'colors': [c.color_name for c in colors]
+                'colors': read_model_colors(style)
             })
 
-        return JSONResponse(content={
+        response = {
             'results': results,
             'total_count': total_count,
             'page': page,
             'limit': limit,
             'total_pages': (total_count + limit - 1) // limit
-        })
+        }
+        if cacheable:
+            response_cache.put(key, response, version)
+        return JSONResponse(content=response)
 
     except Exception as e:
         logger.exception(f"Error in search: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 # ============================================================================
@@ -988,65 +1287,91 @@ async def search(
 # ============================================================================
 
 from app.services.database_service import get_statistics
-from app.models.database_models import RemovalTask
+from app.services.analytics import REPORTS, export_analytics, run_report
+from app.core.pools import pool_status
+from app.models.database_models import ArchivedRemovalTask, RemovalTask
 
 @app.get("/api/admin/stats")
-async def get_stats():
+async def get_stats(db: AsyncSession = Depends(get_admin_read_db)):
     """Get system statistics for dashboard."""
-    db = SessionLocal()
     try:
-        stats = get_statistics(db)
+        stats = await db.run_sync(get_statistics)
         return JSONResponse(content=stats)
     except Exception as e:
         logger.exception(f"Error getting statistics: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
+
+
+@app.get("/api/admin/pools")
+async def get_pool_metrics():
+    """Get utilization and wait-time metrics for each workload's connection pool."""
+    return JSONResponse(content={'pools': pool_status()})
+
+
+@app.get("/api/admin/queries")
+async def get_query_metrics():
+    """Get SQL statement counts and database time per endpoint."""
+    return JSONResponse(content={'endpoints': endpoint_query_stats.snapshot()})
+
+
+@app.get("/api/admin/cache")
+async def get_cache_stats():
+    """Get hit, miss and eviction counts of the lookup and search response cache."""
+    return JSONResponse(content=response_cache.stats())
 
 
 @app.get("/api/admin/removal-tasks")
-async def get_removal_tasks():
-    """Get pending removal tasks."""
-    db = SessionLocal()
+async def get_removal_tasks(
+    include_archived: bool = Query(False, description="Also return completed and archived tasks"),
+    db: AsyncSession = Depends(get_admin_db)
+):
+    """Get pending removal tasks, or all tasks including the archive."""
     try:
-        tasks = db.query(RemovalTask).filter(
-            RemovalTask.completed == False
-        ).order_by(RemovalTask.created_timestamp.desc()).all()
+        if include_archived:
+            tasks = with_archive(RemovalTask, ArchivedRemovalTask)
+            query = select(tasks)
+        else:
+            tasks = RemovalTask.__table__
+            query = select(tasks).where(tasks.c.completed == False)
+        rows = (await db.execute(query.order_by(tasks.c.created_timestamp.desc()))).all()
 
-        return JSONResponse(content={
-            'removal_tasks': [{
+        removal_tasks = []
+        for t in rows:
+            task = {
                 'task_id': t.id,
                 'style_number': t.style_number,
                 'color': t.color,
                 'shelf_location': t.shelf_location,
                 'reason': t.reason,
                 'created_timestamp': t.created_timestamp.isoformat()
-            } for t in tasks]
-        })
+            }
+            if include_archived:
+                task['completed'] = bool(t.completed)
+                task['completed_timestamp'] = t.completed_timestamp.isoformat() if t.completed_timestamp else None
+                task['archived'] = bool(t.archived)
+            removal_tasks.append(task)
+
+        return JSONResponse(content={'removal_tasks': removal_tasks})
 
     except Exception as e:
         logger.exception(f"Error getting removal tasks: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 @app.put("/api/admin/removal-tasks/{task_id}/complete")
-async def complete_removal_task(task_id: int):
+async def complete_removal_task(task_id: int, db: AsyncSession = Depends(get_admin_db)):
     """Mark a removal task as completed."""
-    db = SessionLocal()
     try:
-        task = db.query(RemovalTask).filter(RemovalTask.id == task_id).first()
+        task = await db.scalar(select(RemovalTask).where(RemovalTask.id == task_id))
 
         if not task:
             raise HTTPException(status_code=404, detail='Task not found')
 
         task.completed = True
         task.completed_timestamp = datetime.utcnow()
-        db.commit()
+        await db.commit()
 
         log_audit_action(
-            db,
             'removal_task_completed',
             affected_resources=f"Task ID: {task_id}",
             ip_address="127.0.0.1",
@@ -1063,8 +1388,6 @@ async def complete_removal_task(task_id: int):
     except Exception as e:
         logger.exception(f"Error completing removal task: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 @app.get("/api/admin/config")
@@ -1088,6 +1411,54 @@ async def update_system_config(data: dict):
     })
 
 
+@app.post("/api/admin/analytics/export")
+async def export_analytics_now():
+    """Export the analytics datasets to Parquet now instead of waiting for the next run."""
+    try:
+        exported = await run_in_threadpool(export_analytics)
+        return JSONResponse(content={'message': 'Analytics exported', 'rows': exported})
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Error exporting analytics: {str(e)}")
+        raise HTTPException(status_code=500, detail='Internal server error')
+
+
+@app.get("/api/admin/analytics/{report}")
+async def get_analytics_report(
+    report: str,
+    start: Optional[datetime] = Query(None, description="Start of the period (default: 30 days ago)"),
+    end: Optional[datetime] = Query(None, description="End of the period, exclusive (default: now)"),
+    bucket: str = Query('day', description="Time series bucket: day, week or month")
+):
+    """
+    Run an analytics report over the exported Parquet files.
+
+    Reports: keep_drop_rates, placement_churn, sync_volume. Runs on DuckDB
+    against the last export, so it never queries the operational database.
+    """
+    if report not in REPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown report, expected one of: {', '.join(REPORTS)}")
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    try:
+        rows = await run_in_threadpool(run_report, report, start, end, bucket)
+        return JSONResponse(content={
+            'report': report,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'bucket': bucket,
+            'rows': rows
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Error running analytics report: {str(e)}")
+        raise HTTPException(status_code=500, detail='Internal server error')
+
+
 # ============================================================================
 # CV ROUTES (from cv_routes.py)
 # ============================================================================
@@ -1120,12 +1491,18 @@ async def detect_tag(data: dict):
 # FILES ROUTES (additional endpoints not in main upload)
 # ============================================================================
 
+from app.models.database_models import Color, StyleSource
+from app.services.database_service import styles_only_in_file
+from app.services.read_model import refresh_style_read_model
+from sqlalchemy.orm import Session
+
 @app.get("/api/files/")
-async def list_files():
+async def list_files(db: AsyncSession = Depends(get_admin_db)):
     """List all uploaded files."""
-    db = SessionLocal()
     try:
-        files = db.query(FileModel).filter(FileModel.is_active == True).order_by(FileModel.upload_date.desc()).all()
+        files = (await db.scalars(
+            select(FileModel).where(FileModel.is_active == True).order_by(FileModel.upload_date.desc())
+        )).all()
 
         return JSONResponse(content={
             'files': [{
@@ -1141,106 +1518,94 @@ async def list_files():
     except Exception as e:
         logger.exception(f"Error listing files: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
-@app.delete("/api/files/{file_id}")
-async def delete_file(file_id: int):
-    """Delete a file and all associated data (styles, colors, images)."""
-    db = SessionLocal()
-    try:
-        file_record = db.query(FileModel).filter(FileModel.id == file_id).first()
+def _delete_file_data(db: Session, file_id: int) -> Dict[str, Any]:
+    """Delete a file record with its orphaned styles, colors and images, and commit."""
+    file_record = db.query(FileModel).filter(FileModel.id == file_id).first()
 
-        if not file_record:
-            raise HTTPException(status_code=404, detail='File not found')
+    if not file_record:
+        raise HTTPException(status_code=404, detail='File not found')
 
-        logger.info(f"🗑️ Deleting file: {file_record.original_filename} (ID: {file_id})")
-        
-        # Find all styles that ONLY reference this file
-        styles_to_delete = []
-        colors_deleted = 0
-        images_deleted = 0
-        
-        all_styles = db.query(Style).all()
-        for style in all_styles:
-            source_file_ids = json.loads(style.source_file_ids or '[]')
-            
-            if file_id in source_file_ids:
-                # Remove this file ID from the style's source files
-                source_file_ids.remove(file_id)
-                
-                if len(source_file_ids) == 0:
-                    # This style only exists in this file, delete it completely
-                    styles_to_delete.append(style)
-                    
-                    # Get all colors for this style to delete their images
-                    colors = db.query(Color).filter(Color.style_id == style.id).all()
-                    for color in colors:
-                        # Delete associated image file
-                        if color.image_url:
-                            image_path = Path(f".{color.image_url}")
-                            if image_path.exists():
-                                image_path.unlink()
-                                images_deleted += 1
-                                logger.info(f"   🖼️ Deleted image: {image_path}")
-                    
-                    colors_deleted += len(colors)
-                else:
-                    # Style exists in other files, just update the source_file_ids
-                    style.source_file_ids = json.dumps(source_file_ids)
-                    
-                    # Delete colors that only reference this file
-                    colors = db.query(Color).filter(
-                        Color.style_id == style.id,
-                        Color.source_file_id == file_id
-                    ).all()
-                    
-                    for color in colors:
-                        # Delete associated image file
-                        if color.image_url:
-                            image_path = Path(f".{color.image_url}")
-                            if image_path.exists():
-                                image_path.unlink()
-                                images_deleted += 1
-                                logger.info(f"   🖼️ Deleted image: {image_path}")
-                        db.delete(color)
-                        colors_deleted += 1
-        
-        # Delete the styles that only existed in this file
-        for style in styles_to_delete:
-            db.delete(style)
-        
-        # Delete the file record
-        db.delete(file_record)
-        db.commit()
-        
-        logger.info(f"✅ Deleted: {len(styles_to_delete)} styles, {colors_deleted} colors, {images_deleted} images")
+    logger.info(f"🗑️ Deleting file: {file_record.original_filename} (ID: {file_id})")
+    
+    # Find all styles that ONLY reference this file
+    styles_to_delete = styles_only_in_file(db, file_id).all()
+    orphaned_ids = [style.id for style in styles_to_delete]
+    colors_deleted = 0
+    images_deleted = 0
+    
+    # All colors of orphaned styles go with them; styles shared with other
+    # files only lose the colors that came from this file
+    shared_style_ids = [style_id for style_id, in db.query(StyleSource.style_id).filter(
+        StyleSource.file_id == file_id,
+        StyleSource.style_id.notin_(orphaned_ids)
+    )]
+    orphaned_colors = db.query(Color).filter(Color.style_id.in_(orphaned_ids)).all()
+    file_colors = db.query(Color).filter(
+        Color.style_id.in_(shared_style_ids),
+        Color.source_file_id == file_id
+    ).all()
+    
+    for color in orphaned_colors + file_colors:
+        # Delete associated image file
+        if color.image_url:
+            image_path = Path(f".{color.image_url}")
+            if image_path.exists():
+                image_path.unlink()
+                images_deleted += 1
+                logger.info(f"   🖼️ Deleted image: {image_path}")
+    colors_deleted = len(orphaned_colors) + len(file_colors)
+    
+    for color in file_colors:
+        db.delete(color)
+    
+    # Remove this file from the remaining styles' sources
+    db.query(StyleSource).filter(StyleSource.file_id == file_id).delete(synchronize_session=False)
+    
+    # Delete the styles that only existed in this file
+    for style in styles_to_delete:
+        db.delete(style)
+    
+    # Delete the file record
+    db.delete(file_record)
+    db.flush()
+    refresh_style_read_model(db, shared_style_ids + orphaned_ids)
+    db.commit()
+    
+    logger.info(f"✅ Deleted: {len(styles_to_delete)} styles, {colors_deleted} colors, {images_deleted} images")
+
+    # Log audit action
+    log_audit_action(
+        'file_deleted',
+        affected_resources=f"File ID: {file_id}",
+        ip_address="127.0.0.1",
+        details=f"File deleted: {file_record.original_filename}, Styles: {len(styles_to_delete)}, Colors: {colors_deleted}, Images: {images_deleted}"
+    )
 
-        # Log audit action
-        log_audit_action(
-            db,
-            'file_deleted',
-            affected_resources=f"File ID: {file_id}",
-            ip_address="127.0.0.1",
-            details=f"File deleted: {file_record.original_filename}, Styles: {len(styles_to_delete)}, Colors: {colors_deleted}, Images: {images_deleted}"
-        )
+    return {
+        'styles_deleted': len(styles_to_delete),
+        'colors_deleted': colors_deleted,
+        'images_deleted': images_deleted
+    }
 
+
+@app.delete("/api/files/{file_id}")
+async def delete_file(file_id: int, db: AsyncSession = Depends(get_admin_db)):
+    """Delete a file and all associated data (styles, colors, images)."""
+    try:
+        result = await db.run_sync(_delete_file_data, file_id)
         return JSONResponse(content={
             'message': 'File and all associated data deleted successfully',
-            'styles_deleted': len(styles_to_delete),
-            'colors_deleted': colors_deleted,
-            'images_deleted': images_deleted
+            **result
         })
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error deleting file: {str(e)}")
         raise HTTPException(status_code=500, detail='Internal server error')
-    finally:
-        db.close()
 
 
 if __name__ == "__main__":
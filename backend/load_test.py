@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the FastAPI database routes
+
+Usage: python3 load_test.py [base_url] [requests_per_level]
+
+Sends lookup requests at increasing concurrency and reports throughput per
+level. With request-scoped async sessions, requests/second should grow with
+concurrency instead of staying flat behind a blocked event loop.
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+SAMPLE_QUERY = "1"
+
+
+async def sample_styles(client: httpx.AsyncClient) -> list:
+    """Fetch style numbers to look up"""
+    response = await client.get("/api/lookup/search", params={"q": SAMPLE_QUERY, "limit": 200})
+    response.raise_for_status()
+    return [r["style_number"] for r in response.json()["results"]]
+
+
+async def run_level(client: httpx.AsyncClient, styles: list, concurrency: int, total: int) -> dict:
+    """Send total lookups with at most concurrency in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.get("/api/lookup/", params={"style": styles[i % len(styles)]})
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors
+    }
+
+
+async def main(base_url: str, total: int) -> int:
+    print("=" * 60)
+    print("Skechers Inventory FastAPI Server - Load Test")
+    print("=" * 60)
+    print(f"Base URL: {base_url}")
+
+    limits = httpx.Limits(max_connections=max(CONCURRENCY_LEVELS))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        styles = await sample_styles(client)
+        if not styles:
+            print(f"❌ No styles matched '{SAMPLE_QUERY}' - upload a file first")
+            return 1
+        print(f"Sampled {len(styles)} styles, {total} lookups per level\n")
+
+        results = []
+        for concurrency in CONCURRENCY_LEVELS:
+            result = await run_level(client, styles, concurrency, total)
+            results.append(result)
+            print(f"  concurrency {result['concurrency']:>3}: "
+                  f"{result['requests_per_second']:8.1f} req/s  "
+                  f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                  f"errors {result['errors']}")
+
+    speedup = results[-1]["requests_per_second"] / results[0]["requests_per_second"]
+    print("\n" + "=" * 60)
+    print(f"Throughput at concurrency {CONCURRENCY_LEVELS[-1]}: {speedup:.1f}x concurrency 1")
+    print("=" * 60)
+
+    if any(r["errors"] for r in results):
+        print("\n⚠️  Some requests failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    sys.exit(asyncio.run(main(url, count)))
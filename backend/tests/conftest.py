@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a scratch SQLite database before anything imports it
+_scratch = tempfile.mkdtemp(prefix="skechers_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/test.db"
+os.environ["READ_REPLICA_URL"] = ""
+os.environ["UPLOAD_FOLDER"] = os.path.join(_scratch, "uploads")
+os.environ["ANALYTICS_PATH"] = os.path.join(_scratch, "analytics")
+os.environ["STYLE_INDEX_ENABLED"] = "False"
+os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+from sqlalchemy import inspect, text  # noqa: E402
+
+from app.core.database import SessionLocal, engine, init_db  # noqa: E402
+from app.models.database_models import Base  # noqa: E402
+
+init_db()
+
+
+@pytest.fixture
+def db():
+    """A session on an emptied database; tables created by the test (e.g. log archives) are dropped after it."""
+    tables = set(inspect(engine).get_table_names())
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        SessionLocal.remove()
+        with engine.begin() as conn:
+            for name in set(inspect(conn).get_table_names()) - tables:
+                conn.execute(text(f"DROP TABLE {name}"))
+            for model_table in reversed(Base.metadata.sorted_tables):
+                conn.execute(model_table.delete())
+            if 'sqlite_sequence' in inspect(conn).get_table_names():
+                conn.execute(text("DELETE FROM sqlite_sequence"))
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.log_partitions import sqlite_rotate_table
+from app.models.database_models import ShowroomPlacement, SyncLog, WarehouseClassification
+from app.services import analytics
+
+pytestmark = pytest.mark.skipif(analytics.duckdb is None, reason="duckdb not installed")
+
+
+@pytest.fixture
+def analytics_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'ANALYTICS_PATH', str(tmp_path / "analytics"))
+    return tmp_path / "analytics"
+
+
+def test_export_empty_tables(db, analytics_path):
+    assert analytics.export_analytics() == {'classifications': 0, 'placements': 0, 'sync_log': 0}
+    assert analytics.run_report('sync_volume', datetime(2000, 1, 1), datetime(2100, 1, 1)) == []
+
+
+def test_export_removes_partitions_of_emptied_dataset(db, analytics_path):
+    db.add(WarehouseClassification(style_number='100', color='BLK', status='keep'))
+    db.add(ShowroomPlacement(style_number='100', color='BLK', shelf_location='A1'))
+    db.commit()
+    assert analytics.export_analytics() == {'classifications': 1, 'placements': 1, 'sync_log': 0}
+    assert list((analytics_path / 'placements').glob('*/*/data.parquet'))
+
+    db.query(ShowroomPlacement).delete()
+    db.commit()
+    assert analytics.export_analytics()['placements'] == 0
+    assert not list((analytics_path / 'placements').glob('*/*/data.parquet'))
+    assert list((analytics_path / 'classifications').glob('*/*/data.parquet'))
+
+
+def test_sync_log_export_includes_sqlite_archives(db, analytics_path):
+    db.add_all([
+        SyncLog(device_id='old', sync_status='success', sync_type='full', records_synced=5,
+                last_sync_timestamp=datetime(2026, 9, 15)),
+        SyncLog(device_id='new', sync_status='success', sync_type='incremental', records_synced=2,
+                last_sync_timestamp=datetime(2026, 10, 2)),
+    ])
+    db.commit()
+    with engine.begin() as conn:
+        assert sqlite_rotate_table(conn, 'sync_log', datetime(2026, 10, 5)) == 'sync_log_p2026_09'
+
+    assert analytics.export_analytics()['sync_log'] == 2
+    rows = analytics.run_report('sync_volume', datetime(2026, 9, 1), datetime(2026, 11, 1), 'month')
+    assert [(row['period'], row['syncs'], row['records_synced']) for row in rows] == [
+        ('2026-09-01', 1, 5), ('2026-10-01', 1, 2)
+    ]
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateTable
+
+from app.core.migrations import sqlite_autoincrement_tables
+from app.models.database_models import (
+    ArchivedPlacement, ArchivedRemovalTask, Base, RemovalTask, ShowroomPlacement, WarehouseClassification
+)
+from app.services.archival import archive_records
+
+OLD = datetime.utcnow() - timedelta(days=90)
+
+
+def _completed_task(db, style_number):
+    task = RemovalTask(style_number=style_number, color='BLK', reason='test', created_timestamp=OLD,
+                       completed=True, completed_timestamp=OLD)
+    db.add(task)
+    db.commit()
+    return task.id
+
+
+def test_archived_ids_are_not_reused(db):
+    first = _completed_task(db, '100')
+    assert archive_records()['removal_tasks'] == 1
+
+    second = _completed_task(db, '200')
+    assert second != first
+    assert archive_records()['removal_tasks'] == 1
+    assert sorted(db.query(ArchivedRemovalTask.id).all()) == [(first,), (second,)]
+
+
+def test_new_keep_classification_does_not_match_archived_placement(db):
+    # Archive a placed 'keep' classification together with its placement
+    classification = WarehouseClassification(style_number='100', color='BLK', status='keep', manager_approved=True,
+                                              final_status='keep', approval_timestamp=OLD)
+    db.add(classification)
+    db.flush()
+    db.add(ShowroomPlacement(style_number='100', color='BLK', classification_id=classification.id,
+                             placement_timestamp=OLD, is_active=False))
+    db.commit()
+    assert archive_records()['warehouse_classifications'] == 1
+    archived_id = db.query(ArchivedPlacement.classification_id).scalar()
+
+    # A new, unplaced keep stays hot even once it is old enough
+    fresh = WarehouseClassification(style_number='200', color='BLK', status='keep', manager_approved=True,
+                                    final_status='keep', approval_timestamp=OLD)
+    db.add(fresh)
+    db.commit()
+    assert fresh.id != archived_id
+    assert archive_records()['warehouse_classifications'] == 0
+
+
+def test_migration_rebuilds_tables_with_autoincrement(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Recreate removal_tasks and showroom_placements the way they were before AUTOINCREMENT
+        for table in (ShowroomPlacement.__table__, RemovalTask.__table__):
+            conn.execute(text(f"DROP TABLE {table.name}"))
+            conn.execute(text(str(CreateTable(table).compile(engine)).replace(' AUTOINCREMENT', '')))
+        conn.execute(text("INSERT INTO warehouse_classifications (id, style_number, color, status) VALUES (7, '1', 'BLK', 'keep')"))
+        conn.execute(text("INSERT INTO showroom_placements (id, style_number, color, classification_id) VALUES (3, '1', 'BLK', 7)"))
+        conn.execute(text("INSERT INTO removal_tasks (id, style_number, color, reason) VALUES (1, '1', 'BLK', 'x')"))
+        conn.execute(text(
+            "INSERT INTO removal_tasks_archive (id, style_number, color, reason, archived_at) "
+            "VALUES (5, '2', 'BLK', 'x', '2026-01-01')"
+        ))
+
+    sqlite_autoincrement_tables(engine)
+    sqlite_autoincrement_tables(engine)
+
+    with engine.begin() as conn:
+        schemas = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'table'")).all())
+        assert 'AUTOINCREMENT' in schemas['removal_tasks']
+        assert 'AUTOINCREMENT' in schemas['showroom_placements']
+        assert 'REFERENCES warehouse_classifications' in schemas['showroom_placements']
+        assert conn.execute(text("SELECT classification_id FROM showroom_placements WHERE id = 3")).scalar() == 7
+        indexes = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE tbl_name = 'removal_tasks'"))}
+        assert 'idx_removal_completed' in indexes
+        conn.execute(text("INSERT INTO removal_tasks (style_number, color, reason) VALUES ('3', 'BLK', 'x')"))
+        assert conn.execute(text("SELECT max(id) FROM removal_tasks")).scalar() == 6
@@ -0,0 +1,16 @@
+import pytest
+
+from app.core.async_database import async_database_url, create_async_db_engine
+
+
+def test_async_driver_urls():
+    assert async_database_url("sqlite:///./data/inventory.db").drivername == "sqlite+aiosqlite"
+    url = async_database_url("postgresql://user@host/db?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg"
+    assert dict(url.query) == {"ssl": "require"}
+
+
+@pytest.mark.parametrize("database_url", ["sqlite:///:memory:", "sqlite://"])
+def test_in_memory_sqlite_is_rejected(database_url):
+    with pytest.raises(ValueError, match="In-memory SQLite"):
+        create_async_db_engine(database_url, "lookup")
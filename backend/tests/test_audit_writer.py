@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from app.models.database_models import AuditLog
+from app.services.audit_writer import AuditWriter
+
+
+def event(action_type):
+    return {
+        'admin_user_id': None, 'action_type': action_type, 'affected_resources': None,
+        'timestamp': datetime.utcnow(), 'ip_address': None, 'details': None
+    }
+
+
+def test_rejected_event_is_dropped_and_the_rest_saved(db):
+    writer = AuditWriter(batch_size=10, flush_seconds=0.05)
+    for action_type in ('upload', None, 'delete_file'):
+        writer.put(event(action_type))
+    writer.stop()
+
+    assert sorted(row.action_type for row in db.query(AuditLog)) == ['delete_file', 'upload']
+
+    # The writer is not stuck on the bad event
+    writer.put(event('complete_removal_task'))
+    writer.stop()
+    assert db.query(AuditLog).count() == 3
+
+
+def test_unavailable_database_keeps_at_most_max_pending_events(db, monkeypatch):
+    writer = AuditWriter(batch_size=2, flush_seconds=0.05, max_retries=100, max_pending=3)
+
+    def unavailable(events):
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(writer, '_insert', unavailable)
+    batch = []
+    for n in range(5):
+        batch = writer._write(writer._trim(batch + [event(f'action-{n}')]))
+
+    assert [e['action_type'] for e in batch] == ['action-2', 'action-3', 'action-4']
+    monkeypatch.undo()
+    assert writer._write(batch) == []
+    assert db.query(AuditLog).count() == 3
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.models.database_models import File
+from app.services import hot_folder
+from app.services.hot_folder import LOCK_FILENAME, HotFolderWatcher
+from app.services.ingestion_service import shutdown_parse_pool
+
+pytestmark = pytest.mark.skipif(hot_folder.Observer is None or hot_folder.fcntl is None,
+                                reason="needs watchdog and fcntl")
+
+# Another server process watching the folder
+HOLD_LOCK = """
+import fcntl, sys, time
+lock_file = open(sys.argv[1], 'a')
+fcntl.lockf(lock_file, fcntl.LOCK_EX)
+print('locked', flush=True)
+time.sleep(60)
+"""
+
+
+def wait_for(condition, timeout=15):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_watcher_stands_by_while_another_process_watches(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(hot_folder, 'LOCK_RETRY_SECONDS', 0.05)
+    (tmp_path / "export.csv").write_text("Style,Color,Division\n100001,BLK,WOMENS\n")
+    other = subprocess.Popen([sys.executable, "-c", HOLD_LOCK, str(tmp_path / LOCK_FILENAME)],
+                             stdout=subprocess.PIPE, text=True)
+    watcher = HotFolderWatcher(str(tmp_path), category="all_bought", settle_seconds=0)
+    try:
+        assert other.stdout.readline().strip() == 'locked'
+        watcher.start()
+        assert not watcher.watching.wait(1.5)
+        assert db.query(File).count() == 0
+
+        # Takes over when the other process exits
+        other.kill()
+        other.wait()
+        assert watcher.watching.wait(5)
+        assert wait_for(lambda: db.query(File).filter(File.status == 'success').count() == 1)
+    finally:
+        other.kill()
+        other.wait()
+        watcher.stop()
+        shutdown_parse_pool()
+
+
+def test_restarted_watcher_skips_ingested_files(db, tmp_path):
+    (tmp_path / "export.csv").write_text("Style,Color,Division\n100001,BLK,WOMENS\n")
+    for _ in range(2):
+        watcher = HotFolderWatcher(str(tmp_path), category="all_bought", settle_seconds=0)
+        watcher.start()
+        try:
+            assert watcher.watching.wait(5)
+            assert wait_for(lambda: db.query(File).filter(File.status == 'success').count() == 1)
+            time.sleep(1.5)
+        finally:
+            watcher.stop()
+            shutdown_parse_pool()
+    db.expire_all()
+    assert db.query(File).count() == 1
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.database_models import File, IngestionCheckpoint, Style
+from app.models.parsed_item import ParsedItem
+from app.services.ingestion_service import claim_checkpoint, resume_pending_ingestions, start_ingestion
+
+
+@pytest.fixture
+def ingestion(db, tmp_path, monkeypatch):
+    """An ingestion of three styles that has not committed its first chunk yet."""
+    monkeypatch.setattr(settings, 'PARSE_CACHE_FOLDER', str(tmp_path))
+    record = File(filename="items.xlsx", original_filename="items.xlsx", file_type="xlsx",
+                  category="all_bought", status="processing")
+    db.add(record)
+    db.commit()
+    items = [ParsedItem(style=f"10000{n}", color="BLK", division="WOMENS") for n in range(3)]
+    return start_ingestion(db, record.id, items)
+
+
+def stall(db, checkpoint):
+    """Age the checkpoint past INGEST_RESUME_AFTER_SECONDS, as if its process had died."""
+    db.query(IngestionCheckpoint).filter(IngestionCheckpoint.id == checkpoint.id).update({
+        'updated_at': datetime.utcnow() - timedelta(seconds=settings.INGEST_RESUME_AFTER_SECONDS + 60)
+    })
+    db.commit()
+
+
+def test_live_ingestion_is_not_resumed(db, ingestion):
+    assert not claim_checkpoint(db, ingestion.id)
+    assert resume_pending_ingestions(db) == 0
+    db.refresh(ingestion)
+    assert ingestion.status == 'in_progress'
+    assert db.query(Style).count() == 0
+
+
+def test_interrupted_ingestion_is_claimed_once(db, ingestion):
+    stall(db, ingestion)
+    assert claim_checkpoint(db, ingestion.id)
+    assert not claim_checkpoint(db, ingestion.id)
+
+    # Another worker looking now leaves the claimed ingestion alone
+    assert resume_pending_ingestions(db) == 0
+    assert db.query(Style).count() == 0
+
+
+def test_stale_claim_is_resumed(db, ingestion):
+    stall(db, ingestion)
+    assert claim_checkpoint(db, ingestion.id)
+    stall(db, ingestion)
+
+    assert resume_pending_ingestions(db) == 1
+    db.refresh(ingestion)
+    assert ingestion.status == 'completed'
+    assert db.query(Style).count() == 3
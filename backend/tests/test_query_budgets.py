@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import fastapi_server
+from app.models.database_models import File, ShowroomPlacement, SyncLog, WarehouseClassification
+from app.services.database_service import save_excel_data
+
+STYLES = 200
+COLORS = ["BLK", "BBK", "NVY", "WHT"]
+CLASSIFICATIONS = 60
+
+# (method, path, request arguments, SQL statement budget). Budgets do not depend
+# on the catalog size, so a query per style, color or classification (N+1)
+# shows up as an overrun.
+BUDGETS = [
+    ("GET", "/api/lookup/", {"params": {"style": "100005", "color": "BBK"}}, 1),
+    ("GET", "/api/lookup/", {"params": {"style": "100005W"}}, 1),
+    ("POST", "/api/lookup/batch", {"json": {"items": [{"style": f"1{i:05d}", "color": "NVY"} for i in range(50)]}}, 1),
+    ("GET", "/api/lookup/search", {"params": {"q": "10"}}, 2),
+    ("GET", "/api/sync/", {"params": {"device_id": "budget"}}, 4),
+    ("GET", "/api/sync/changes", {"params": {"since": "2000-01-01T00:00:00", "device_id": "budget"}}, 3),
+    ("GET", "/api/warehouse/pending", {}, 2),
+    ("GET", "/api/warehouse/classifications", {"params": {"include_archived": "true"}}, 2),
+    ("GET", "/api/warehouse/placements", {"params": {"include_archived": "true"}}, 2),
+    ("GET", "/api/admin/stats", {}, 5),
+    ("GET", "/api/admin/removal-tasks", {}, 1),
+    ("GET", "/api/files/", {}, 1),
+]
+
+
+@pytest.fixture
+def client(db):
+    """
+    The app over two overlapping files of styles with several colors, plus classifications, placements and syncs.
+
+    Used without its context manager, so the startup jobs (ingestion resume,
+    log retention, ...) do not run against the scratch database.
+    """
+    for index, (start, end) in enumerate([(0, STYLES), (STYLES // 2, STYLES + STYLES // 2)]):
+        record = File(
+            filename=f"synthetic_{index}.xlsx", original_filename=f"synthetic_{index}.xlsx",
+            file_type="xlsx", category="all_bought", status="completed"
+        )
+        db.add(record)
+        db.commit()
+        save_excel_data(db, record.id, [{
+            "style_number": f"1{n:05d}",
+            "division": "WOMENS",
+            "outsole": "SOLE",
+            "colors": [{"color_name": color} for color in COLORS[n % 2:n % 2 + 3]]
+        } for n in range(start, end)])
+
+    for n in range(CLASSIFICATIONS):
+        decided = n % 2 == 0
+        classification = WarehouseClassification(
+            style_number=f"1{n:05d}", color=COLORS[n % len(COLORS)], status="keep",
+            coordinator_name="budget", manager_approved=decided, final_status="keep" if decided else None
+        )
+        db.add(classification)
+        db.flush()
+        if decided:
+            db.add(ShowroomPlacement(
+                style_number=classification.style_number, color=classification.color,
+                shelf_location=f"A{n}", classification_id=classification.id
+            ))
+        db.add(SyncLog(device_id=f"device-{n % 5}", sync_status="success", sync_type="full", records_synced=n))
+    db.commit()
+
+    return TestClient(fastapi_server.app)
+
+
+@pytest.mark.parametrize(
+    "method, path, kwargs, budget", BUDGETS,
+    ids=[f"{method} {path} {kwargs.get('params', '')}" for method, path, kwargs, _ in BUDGETS]
+)
+def test_endpoint_within_query_budget(client, method, path, kwargs, budget):
+    response = client.request(method, path, **kwargs)
+
+    assert response.status_code == 200
+    # Counted by the query metrics middleware
+    assert 0 <= int(response.headers["X-DB-Statements"]) <= budget
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import async_database
+from app.core import replica as replica_module
+from app.core.async_database import create_async_db_engine, get_lookup_read_db
+from app.core.replica import RecentWrites, track_device_writes
+from app.models.database_models import Base, WarehouseClassification
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    """An app with the read-your-writes middleware whose lookup reads can go to an empty replica."""
+    replica_url = f"sqlite:///{tmp_path}/replica.db"
+    sync_engine = create_engine(replica_url)
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    replica = create_async_db_engine(replica_url, 'lookup', 'lookup_replica')
+    writes = RecentWrites(60)
+    monkeypatch.setattr(replica_module, 'recent_writes', writes)
+    monkeypatch.setattr(async_database, 'recent_writes', writes)
+    monkeypatch.setattr(async_database, 'replica_sessions', {
+        'lookup': async_sessionmaker(replica, autoflush=False, expire_on_commit=False)
+    })
+
+    app = FastAPI()
+    app.middleware("http")(track_device_writes)
+
+    @app.post("/classify")
+    def classify():
+        db.add(WarehouseClassification(style_number="100005", color="BBK", status="keep"))
+        db.commit()
+        return {"success": True}
+
+    @app.get("/count")
+    async def count(read_db=Depends(get_lookup_read_db)):
+        return {"count": (await read_db.execute(select(func.count(WarehouseClassification.id)))).scalar()}
+
+    with TestClient(app) as test_client:
+        yield test_client
+    asyncio.run(replica.dispose())
+
+
+def test_reads_after_a_write_go_to_the_primary(client):
+    headers = {"X-Device-ID": "scanner-1"}
+    assert client.post("/classify", headers=headers).status_code == 200
+
+    # The writing device sees its classification; the replica has not caught up
+    assert client.get("/count", headers=headers).json() == {"count": 1}
+    assert client.get("/count", params={"device_id": "scanner-1"}).json() == {"count": 1}
+    assert client.get("/count", headers={"X-Device-ID": "scanner-2"}).json() == {"count": 0}
+    assert client.get("/count").json() == {"count": 0}
+
+
+def test_writes_without_a_device_id_keep_reads_on_the_replica(client):
+    assert client.post("/classify").status_code == 200
+    assert client.get("/count", headers={"X-Device-ID": "scanner-1"}).json() == {"count": 0}
@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import fastapi_server
+from app.models.database_models import File
+from app.services import response_cache as response_cache_module
+from app.services.database_service import save_excel_data
+from app.services.response_cache import response_cache
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """The app with the response cache enabled, over one style with two colors."""
+    monkeypatch.setattr(response_cache, 'max_entries', 100)
+    response_cache.clear()
+    record = File(filename="a.xlsx", original_filename="a.xlsx", file_type="xlsx", category="all_bought", status="completed")
+    db.add(record)
+    db.commit()
+    save_excel_data(db, record.id, [{"style_number": "144083", "colors": [{"color_name": "BBK"}, {"color_name": "NVY"}]}])
+    yield TestClient(fastapi_server.app)
+    response_cache.clear()
+
+
+def test_lookup_variants_share_one_entry_and_echo_the_scan(client):
+    for style, color in [("144083", "BBK"), (" 144083w ", "nvy"), ("144083W", None)]:
+        result = client.get("/api/lookup/", params={"style": style, "color": color}).json()
+        assert (result["style_number"], result["status"], result.get("color")) == ("144083", "keep", color)
+
+    stats = response_cache.stats()
+    assert (stats['entries'], stats['hits']) == (1, 2)
+
+    # Misses echo the scanned style number
+    for style in ["999999w", "999999"]:
+        assert client.get("/api/lookup/", params={"style": style}).json()["style_number"] == style
+    stats = response_cache.stats()
+    assert (stats['entries'], stats['hits']) == (2, 3)
+
+
+def test_replica_reads_are_cached_only_once_the_replica_caught_up(client, monkeypatch):
+    monkeypatch.setattr(fastapi_server, 'is_replica', lambda db: True)
+    response_cache_module.bump_data_version()
+
+    # Within READ_YOUR_WRITES_SECONDS of the write the replica may still lag
+    client.get("/api/lookup/search", params={"q": "1440"})
+    client.get("/api/lookup/", params={"style": "144083"})
+    assert response_cache.stats()['entries'] == 0
+
+    monkeypatch.setattr(response_cache_module, '_changed_at', float('-inf'))
+    client.get("/api/lookup/search", params={"q": "1440"})
+    client.get("/api/lookup/", params={"style": "144083"})
+    assert response_cache.stats()['entries'] == 2
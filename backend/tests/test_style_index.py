@@ -0,0 +1,54 @@
+import threading
+
+from app.services.style_index import StyleIndex
+
+
+def row(style_id, style_number, *colors):
+    return {
+        'style_id': style_id, 'style_number': style_number, 'style_key': style_number.upper(),
+        'division': 'WOMENS', 'gender': None, 'outsole': None,
+        'colors': [{'name': color, 'key': color.upper(), 'image_url': None} for color in colors],
+        'source_files': []
+    }
+
+
+def loaded_index(*rows):
+    index = StyleIndex()
+    index._entries, index._keys = {}, {}
+    index._apply(index._entries, index._keys, {r['style_id']: r for r in rows})
+    return index
+
+
+def test_apply_updates_the_live_index_in_place():
+    index = loaded_index(row(1, '144083', 'BLK'), row(2, '150000L', 'NVY'))
+    entries = index._entries
+
+    index.apply({1: row(1, '144083', 'BLK', 'WHT'), 2: None, 3: row(3, '160000', 'RED')})
+
+    assert index._entries is entries
+    assert index.lookup('144083W', 'WHT')['status'] == 'keep'
+    assert index.lookup('150000L')['status'] == 'drop'
+    assert index.lookup('160000', 'RED')['status'] == 'keep'
+    assert len(index) == 2
+    assert set(entries) == {'144083', '144083W', '144083WW', '160000', '160000W', '160000WW'}
+
+
+def test_readers_never_miss_a_style_being_replaced():
+    index = loaded_index(row(1, '144083', 'BLK'))
+    stop = threading.Event()
+    missing = []
+
+    def read():
+        while not stop.is_set():
+            if index.lookup('144083')['status'] != 'keep':
+                missing.append(True)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for n in range(2000):
+            index.apply({1: row(1, '144083', 'BLK', f'C{n}')})
+    finally:
+        stop.set()
+        reader.join()
+    assert not missing
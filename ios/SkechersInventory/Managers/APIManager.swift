@@ -5,6 +5,7 @@ class APIManager {
 
     private var baseURL: String
     private let session: URLSession
+    let deviceId: String
 
     private init() {
         // Check UserDefaults for custom backend URL first
@@ -17,7 +18,17 @@ class APIManager {
             baseURL = "http://api.obinnachukwu.org"
         }
 
+        if let savedDeviceId = UserDefaults.standard.string(forKey: "deviceId") {
+            deviceId = savedDeviceId
+        } else {
+            deviceId = UUID().uuidString
+            UserDefaults.standard.set(deviceId, forKey: "deviceId")
+        }
+
         let config = URLSessionConfiguration.default
+        // Sent on every request so the server routes this device's reads to the
+        // primary right after its own writes (read-your-writes)
+        config.httpAdditionalHeaders = ["X-Device-ID": deviceId]
         config.timeoutIntervalForRequest = 30
         config.timeoutIntervalForResource = 60
         config.waitsForConnectivity = true
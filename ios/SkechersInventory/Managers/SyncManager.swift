@@ -30,12 +30,7 @@ class SyncManager: ObservableObject {
     private let pendingChangesKey = "pendingChanges"
 
     private init() {
-        if let savedDeviceId = UserDefaults.standard.string(forKey: "deviceId") {
-            deviceId = savedDeviceId
-        } else {
-            deviceId = UUID().uuidString
-            UserDefaults.standard.set(deviceId, forKey: "deviceId")
-        }
+        deviceId = APIManager.shared.deviceId
 
         loadLastSyncDate()
         loadPendingChanges()
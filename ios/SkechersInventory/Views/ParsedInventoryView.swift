@@ -155,7 +155,7 @@ struct ParsedInventoryView: View {
     private func loadInventory() {
         Task {
             do {
-                let syncData = try await APIManager.shared.fullSync(deviceId: UIDevice.current.identifierForVendor?.uuidString ?? "unknown")
+                let syncData = try await APIManager.shared.fullSync(deviceId: APIManager.shared.deviceId)
 
                 // Get the list of currently uploaded file IDs from UserDefaults
                 let uploadedFileIds = getUploadedFileIds()